@@ -8,6 +8,8 @@ from .compiler import (
     DEFAULT_TEAL_VERSION,
     CompileOptions,
     compileTeal,
+    OptimizeOptions,
+    OptimizeReport,
 )
 from .types import TealType
 from .errors import TealInternalError, TealTypeError, TealInputError, TealCompileError
@@ -23,6 +25,8 @@ __all__ = (
         "DEFAULT_TEAL_VERSION",
         "CompileOptions",
         "compileTeal",
+        "OptimizeOptions",
+        "OptimizeReport",
         "TealType",
         "TealInternalError",
         "TealTypeError",
@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING
 
 from ..types import TealType, require_type
-from ..ir import TealOp, Op, TealBlock, TealSimpleBlock, TealConditionalBlock
+from ..ir import TealOp, Op, TealBlock, TealSimpleBlock
 from .expr import Expr
+from .naryexpr import NaryExpr, compileCondition
 
 if TYPE_CHECKING:
     from ..compiler import CompileOptions
@@ -22,21 +23,36 @@ class Assert(Expr):
         self.cond = cond
 
     def __teal__(self, options: "CompileOptions"):
+        conds = [self.cond]
+        if (
+            options.optimize.shortCircuit
+            and isinstance(self.cond, NaryExpr)
+            and self.cond.op == Op.logic_and
+        ):
+            # asserting each operand of an And separately costs the same as asserting their
+            # combined value, and stops the program as soon as one of them is false
+            conds = list(self.cond.args)
+
         if options.version >= Op.assert_.min_version:
             # use assert op if available
-            return TealBlock.FromOp(options, TealOp(self, Op.assert_), self.cond)
+            start, end = TealBlock.FromOp(options, TealOp(self, Op.assert_), conds[0])
+            for cond in conds[1:]:
+                argStart, argEnd = TealBlock.FromOp(
+                    options, TealOp(self, Op.assert_), cond
+                )
+                end.setNextBlock(argStart)
+                end = argEnd
+            return start, end
 
         # if assert op is not available, use branches and err
-        condStart, condEnd = self.cond.__teal__(options)
+        compiledConds = [compileCondition(options, cond) for cond in conds]
 
         end = TealSimpleBlock([])
         errBlock = TealSimpleBlock([TealOp(self, Op.err)])
 
-        branchBlock = TealConditionalBlock([])
-        branchBlock.setTrueBlock(end)
-        branchBlock.setFalseBlock(errBlock)
-
-        condEnd.setNextBlock(branchBlock)
+        condStart: TealBlock = end
+        for compiledCond in reversed(compiledConds):
+            condStart = compiledCond.toBranch(condStart, errBlock)
 
         return condStart, end
 
@@ -43,3 +43,52 @@ def test_teal_3_assert():
 def test_assert_invalid():
     with pytest.raises(TealTypeError):
         Assert(Txn.receiver())
+
+
+def test_assert_short_circuit():
+    shortCircuitOptions = CompileOptions(
+        version=3, optimize=OptimizeOptions(shortCircuit=True)
+    )
+    args = [Int(1), Int(2)]
+    expr = Assert(And(args[0], args[1]))
+
+    # each operand of the And is asserted separately
+    expected = TealSimpleBlock(
+        [
+            TealOp(args[0], Op.int, 1),
+            TealOp(expr, Op.assert_),
+            TealOp(args[1], Op.int, 2),
+            TealOp(expr, Op.assert_),
+        ]
+    )
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    assert actual == expected
+
+
+def test_teal_2_assert_short_circuit():
+    shortCircuitOptions = CompileOptions(
+        version=2, optimize=OptimizeOptions(shortCircuit=True)
+    )
+    args = [Int(1), Int(2)]
+    expr = Assert(And(args[0], args[1]))
+
+    end = TealSimpleBlock([])
+    errBlock = TealSimpleBlock([TealOp(expr, Op.err)])
+
+    secondBranch = TealConditionalBlock([TealOp(args[1], Op.int, 2)])
+    secondBranch.setTrueBlock(end)
+    secondBranch.setFalseBlock(errBlock)
+
+    expected = TealConditionalBlock([TealOp(args[0], Op.int, 1)])
+    expected.setTrueBlock(secondBranch)
+    expected.setFalseBlock(errBlock)
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    assert actual == expected
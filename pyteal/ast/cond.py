@@ -1,9 +1,10 @@
-from typing import List, cast, TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 
 from ..types import TealType, require_type
-from ..ir import TealOp, Op, TealSimpleBlock, TealConditionalBlock
+from ..ir import TealOp, Op, TealBlock, TealSimpleBlock
 from ..errors import TealInputError
 from .expr import Expr
+from .naryexpr import compileCondition
 from .err import Err
 from .if_ import If
 
@@ -57,26 +58,19 @@ class Cond(Expr):
         self.args = argv
 
     def __teal__(self, options: "CompileOptions"):
-        start = None
         end = TealSimpleBlock([])
-        prevBranch = None
-        for i, (cond, pred) in enumerate(self.args):
-            condStart, condEnd = cond.__teal__(options)
+        branches = []
+        for cond, pred in self.args:
+            compiledCond = compileCondition(options, cond)
             predStart, predEnd = pred.__teal__(options)
 
-            branchBlock = TealConditionalBlock([])
-            branchBlock.setTrueBlock(predStart)
-
-            condEnd.setNextBlock(branchBlock)
             predEnd.setNextBlock(end)
-            if i == 0:
-                start = condStart
-            else:
-                cast(TealConditionalBlock, prevBranch).setFalseBlock(condStart)
-            prevBranch = branchBlock
+            branches.append((compiledCond, predStart))
 
-        errBlock = TealSimpleBlock([TealOp(self, Op.err)])
-        cast(TealConditionalBlock, prevBranch).setFalseBlock(errBlock)
+        # each condition continues to the next one if it is false
+        start: TealBlock = TealSimpleBlock([TealOp(self, Op.err)])
+        for compiledCond, predStart in reversed(branches):
+            start = compiledCond.toBranch(predStart, start)
 
         return start, end
 
@@ -1,15 +1,53 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
 from ..types import TealType, require_type
-from ..ir import TealSimpleBlock, TealConditionalBlock
+from ..ir import TealOp, Op, TealBlock, TealSimpleBlock, TealConditionalBlock
 from ..errors import TealCompileError
 from .expr import Expr
 from .seq import Seq
 from .int import Int
+from .binaryexpr import BinaryExpr
+from .scratch import ScratchSlot, ScratchLoad, ScratchStore, ScratchStackStore
+from .subroutine import SubroutineCall
 
 if TYPE_CHECKING:
     from ..compiler import CompileOptions
 
+# The comparisons a For loop condition may use to be unrolled, and how each compares the counter to
+# its bound.
+unrollableComparisons = {
+    Op.lt: lambda counter, bound: counter < bound,
+    Op.le: lambda counter, bound: counter <= bound,
+    Op.gt: lambda counter, bound: counter > bound,
+    Op.ge: lambda counter, bound: counter >= bound,
+    Op.neq: lambda counter, bound: counter != bound,
+}
+
+
+def isCounterLoad(expr: Expr, slot: ScratchSlot) -> bool:
+    return isinstance(expr, ScratchLoad) and expr.slot is slot
+
+
+def writesSlot(value: Any, slot: ScratchSlot) -> bool:
+    """Check if an expression may store a value in a scratch slot.
+
+    Subroutine calls are assumed to write every slot, since a subroutine may use a ScratchVar that
+    is defined outside of it.
+    """
+    if isinstance(value, (list, tuple)):
+        return any(writesSlot(item, slot) for item in value)
+    if not isinstance(value, Expr):
+        return False
+    if isinstance(value, (ScratchStore, ScratchStackStore)) and value.slot is slot:
+        return True
+    if isinstance(value, SubroutineCall):
+        return True
+    return any(
+        writesSlot(child, slot)
+        for name, child in vars(value).items()
+        if name != "trace"
+    )
+
 
 class For(Expr):
     """For expression."""
@@ -36,10 +74,133 @@ class For(Expr):
         self.step = step
         self.doBlock: Optional[Expr] = None
 
+    def getUnrolledCounters(
+        self, limit: int
+    ) -> Optional[Tuple[ScratchSlot, List[int], int]]:
+        """Find the values of the counter of this loop on each iteration, if the loop can be unrolled.
+
+        The loop can be unrolled if its start stores a constant in a scratch slot, its condition
+        compares that slot to a constant, its step adds a constant to or subtracts a constant from
+        the slot, and its body never writes the slot.
+
+        Args:
+            limit: The maximum number of iterations to unroll.
+
+        Returns:
+            A tuple of the counter's slot, the value of the counter during each iteration, and the
+            value of the counter after the loop, or None if the loop cannot be unrolled or runs
+            more than limit iterations.
+        """
+        start, cond, step = self.start, self.cond, self.step
+        if not (isinstance(start, ScratchStore) and isinstance(start.value, Int)):
+            return None
+        slot = start.slot
+
+        if not (
+            isinstance(cond, BinaryExpr)
+            and cond.op in unrollableComparisons
+            and isCounterLoad(cond.argLeft, slot)
+            and isinstance(cond.argRight, Int)
+        ):
+            return None
+        compare = unrollableComparisons[cond.op]
+        bound = cond.argRight.value
+
+        if not (
+            isinstance(step, ScratchStore)
+            and step.slot is slot
+            and isinstance(step.value, BinaryExpr)
+            and step.value.op in (Op.add, Op.minus)
+            and isCounterLoad(step.value.argLeft, slot)
+            and isinstance(step.value.argRight, Int)
+        ):
+            return None
+        increment = step.value.argRight.value
+        if step.value.op == Op.minus:
+            increment = -increment
+
+        if writesSlot(self.doBlock, slot) or writesSlot(cond, slot):
+            return None
+
+        counters: List[int] = []
+        counter = start.value.value
+        while compare(counter, bound):
+            if len(counters) == limit:
+                return None
+            counters.append(counter)
+            counter += increment
+            if not 0 <= counter < 2 ** 64:
+                # the step fails at runtime
+                return None
+
+        return slot, counters, counter
+
+    def unroll(
+        self,
+        options: "CompileOptions",
+        slot: ScratchSlot,
+        counters: List[int],
+        final: int,
+    ):
+        """Compile a copy of the body of this loop for each value of its counter, in sequence.
+
+        Each load of the counter in a copy is replaced by the counter's value in that iteration.
+        The counter is only stored when the loop ends, so that code after the loop can use it.
+        """
+
+        def storeCounter(value: int) -> TealSimpleBlock:
+            return TealSimpleBlock(
+                [TealOp(self.start, Op.int, value), TealOp(self.start, Op.store, slot)]
+            )
+
+        start = TealSimpleBlock([])
+        end = TealSimpleBlock([])
+        last = storeCounter(final)
+        last.setNextBlock(end)
+
+        previousEnd = start
+        for i, counter in enumerate(counters):
+            options.enterLoop()
+            doStart, doEnd = self.doBlock.__teal__(options)  # type: ignore
+            breakBlocks, continueBlocks = options.exitLoop()
+
+            for block in TealBlock.Iterate(doStart):
+                block.ops = [
+                    TealOp(op.expr, Op.int, counter)
+                    if op.getOp() == Op.load and op.args[0] is slot
+                    else op
+                    for op in block.ops
+                ]
+
+            previousEnd.setNextBlock(doStart)
+
+            if len(breakBlocks) != 0:
+                breakStart = storeCounter(counter)
+                breakStart.setNextBlock(end)
+                for block in breakBlocks:
+                    block.setNextBlock(breakStart)
+
+            nextStart = TealSimpleBlock([])
+            doEnd.setNextBlock(nextStart)
+            for block in continueBlocks:
+                block.setNextBlock(nextStart)
+            previousEnd = nextStart
+
+        previousEnd.setNextBlock(last)
+
+        options.optimize.report.record("loopUnrolling.loops")
+        options.optimize.report.record("loopUnrolling.iterations", len(counters))
+        return start, end
+
     def __teal__(self, options: "CompileOptions"):
         if self.doBlock is None:
             raise TealCompileError("For expression must have a doBlock", self)
 
+        if options.optimize.loopUnrolling > 0:
+            unrolled = self.getUnrolledCounters(options.optimize.loopUnrolling)
+            if unrolled is not None:
+                return self.unroll(options, *unrolled)
+
         options.enterLoop()
 
         end = TealSimpleBlock([])
@@ -48,7 +209,6 @@ class For(Expr):
         doStart, doEnd = self.doBlock.__teal__(options)
 
         stepStart, stepEnd = self.step.__teal__(options)
-        stepEnd.setNextBlock(condStart)
         doEnd.setNextBlock(stepStart)
 
         branchBlock = TealConditionalBlock([])
@@ -57,6 +217,19 @@ class For(Expr):
 
         condEnd.setNextBlock(branchBlock)
 
+        if options.optimize.loopRotation:
+            # test the condition again after the step, so that each iteration branches back to
+            # the body directly instead of jumping to the test at the top
+            bottomStart, bottomEnd = self.cond.__teal__(options)
+            bottomBranch = TealConditionalBlock([])
+            bottomBranch.setTrueBlock(doStart)
+            bottomBranch.setFalseBlock(end)
+            bottomEnd.setNextBlock(bottomBranch)
+            stepEnd.setNextBlock(bottomStart)
+            options.optimize.report.record("loopRotation.loops")
+        else:
+            stepEnd.setNextBlock(condStart)
+
         startEnd.setNextBlock(condStart)
 
         breakBlocks, continueBlocks = options.exitLoop()
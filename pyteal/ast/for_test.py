@@ -159,6 +159,149 @@ def test_for_break():
     assert actual == expected
 
 
+def test_for_rotated():
+    i = ScratchVar()
+    items = [
+        (i.store(Int(0))),
+        i.load() < Int(10),
+        i.store(i.load() + Int(1)),
+        If(i.load() < Int(4), Continue()),
+        If(i.load() == Int(8), Break()),
+    ]
+    expr = For(items[0], items[1], items[2]).Do(Seq([items[3], items[4]]))
+
+    rotatedOptions = CompileOptions(optimize=OptimizeOptions(loopRotation=True))
+    rotatedOptions.enterLoop()
+
+    expected, varEnd = items[0].__teal__(rotatedOptions)
+    condStart, condEnd = items[1].__teal__(rotatedOptions)
+    stepStart, stepEnd = items[2].__teal__(rotatedOptions)
+    do, doEnd = Seq([items[3], items[4]]).__teal__(rotatedOptions)
+    bottomStart, bottomEnd = items[1].__teal__(rotatedOptions)
+    end = TealSimpleBlock([])
+
+    varEnd.setNextBlock(condStart)
+    expectedBranch = TealConditionalBlock([])
+    expectedBranch.setTrueBlock(do)
+    expectedBranch.setFalseBlock(end)
+    condEnd.setNextBlock(expectedBranch)
+
+    # the step is followed by a second test which branches back to the body
+    doEnd.setNextBlock(stepStart)
+    stepEnd.setNextBlock(bottomStart)
+    bottomBranch = TealConditionalBlock([])
+    bottomBranch.setTrueBlock(do)
+    bottomBranch.setFalseBlock(end)
+    bottomEnd.setNextBlock(bottomBranch)
+
+    breakBlocks, continueBlocks = rotatedOptions.exitLoop()
+
+    for block in breakBlocks:
+        block.setNextBlock(end)
+
+    for block in continueBlocks:
+        block.setNextBlock(stepStart)
+
+    actual, _ = expr.__teal__(rotatedOptions)
+
+    assert actual == expected
+    assert rotatedOptions.optimize.report["loopRotation.loops"] == 1
+
+
+def test_for_unrolled_counters():
+    i = ScratchVar()
+    other = ScratchVar()
+
+    def loop(start, cond, step, body=Pop(i.load())):
+        return For(i.store(Int(start)), cond, i.store(step)).Do(body)
+
+    assert loop(0, i.load() < Int(3), i.load() + Int(1)).getUnrolledCounters(8) == (
+        i.slot,
+        [0, 1, 2],
+        3,
+    )
+    assert loop(10, i.load() >= Int(4), i.load() - Int(3)).getUnrolledCounters(8) == (
+        i.slot,
+        [10, 7, 4],
+        1,
+    )
+    assert loop(5, i.load() != Int(5), i.load() + Int(1)).getUnrolledCounters(8) == (
+        i.slot,
+        [],
+        5,
+    )
+
+    # too many iterations
+    assert loop(0, i.load() <= Int(8), i.load() + Int(1)).getUnrolledCounters(8) is None
+    assert loop(0, i.load() > Int(8), i.load() + Int(1)).getUnrolledCounters(0) == (
+        i.slot,
+        [],
+        0,
+    )
+    # the step underflows
+    assert loop(2, i.load() >= Int(0), i.load() - Int(1)).getUnrolledCounters(8) is None
+    # the bounds are not constant
+    assert loop(0, i.load() < Txn.fee(), i.load() + Int(1)).getUnrolledCounters(8) is None
+    assert loop(0, i.load() < Int(3), i.load() * Int(2)).getUnrolledCounters(8) is None
+    assert loop(0, other.load() < Int(3), i.load() + Int(1)).getUnrolledCounters(8) is None
+    # the body writes the counter
+    assert (
+        loop(0, i.load() < Int(3), i.load() + Int(1), i.store(Int(5))).getUnrolledCounters(
+            8
+        )
+        is None
+    )
+
+    def subImpl():
+        return i.store(Int(5))
+
+    sub = SubroutineDefinition(subImpl, TealType.none)
+    assert (
+        loop(
+            0, i.load() < Int(3), i.load() + Int(1), SubroutineCall(sub, [])
+        ).getUnrolledCounters(8)
+        is None
+    )
+
+
+def test_for_unrolled():
+    i = ScratchVar()
+    body = If(i.load() == Int(1), Break(), Pop(i.load()))
+    expr = For(i.store(Int(0)), i.load() < Int(2), i.store(i.load() + Int(1))).Do(body)
+
+    options = CompileOptions(optimize=OptimizeOptions(loopUnrolling=2))
+    actual, _ = expr.__teal__(options)
+
+    def copy(counter):
+        # the body with the counter replaced, where breaking stores the counter's current value
+        return [
+            TealOp(None, Op.int, counter),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.eq),
+            TealOp(None, Op.int, counter),
+            TealOp(None, Op.int, counter),
+            TealOp(None, Op.store, i.slot),
+            TealOp(None, Op.pop),
+        ]
+
+    with TealComponent.Context.ignoreExprEquality():
+        ops = [op for block in TealBlock.Iterate(actual) for op in block.ops]
+        assert ops == copy(0) + copy(1) + [
+            TealOp(None, Op.int, 2),
+            TealOp(None, Op.store, i.slot),
+        ]
+    assert options.optimize.report["loopUnrolling.loops"] == 1
+    assert options.optimize.report["loopUnrolling.iterations"] == 2
+
+    # the loop is too long to unroll
+    options = CompileOptions(optimize=OptimizeOptions(loopUnrolling=1))
+    actual, _ = expr.__teal__(options)
+    assert any(
+        op.getOp() == Op.load for block in TealBlock.Iterate(actual) for op in block.ops
+    )
+    assert "loopUnrolling.loops" not in options.optimize.report
+
+
 def test_invalid_for():
     with pytest.raises(TypeError):
         expr = For()
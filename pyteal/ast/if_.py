@@ -2,8 +2,9 @@ from typing import TYPE_CHECKING
 
 from ..errors import TealCompileError, TealInputError
 from ..types import TealType, require_type, types_match
-from ..ir import TealSimpleBlock, TealConditionalBlock
+from ..ir import TealSimpleBlock
 from .expr import Expr
+from .naryexpr import compileCondition
 
 if TYPE_CHECKING:
     from ..compiler import CompileOptions
@@ -49,21 +50,17 @@ class If(Expr):
         if self.thenBranch is None:
             raise TealCompileError("If expression must have a thenBranch", self)
 
-        condStart, condEnd = self.cond.__teal__(options)
+        cond = compileCondition(options, self.cond)
         thenStart, thenEnd = self.thenBranch.__teal__(options)
         end = TealSimpleBlock([])
 
-        branchBlock = TealConditionalBlock([])
-        branchBlock.setTrueBlock(thenStart)
-
-        condEnd.setNextBlock(branchBlock)
         thenEnd.setNextBlock(end)
 
         if self.elseBranch is None:
-            branchBlock.setFalseBlock(end)
+            condStart = cond.toBranch(thenStart, end)
         else:
             elseStart, elseEnd = self.elseBranch.__teal__(options)
-            branchBlock.setFalseBlock(elseStart)
+            condStart = cond.toBranch(thenStart, elseStart)
             elseEnd.setNextBlock(end)
 
         return condStart, end
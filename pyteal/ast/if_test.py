@@ -265,3 +265,37 @@ def test_if_invalid_alt_syntax():
 
     with pytest.raises(TealInputError):
         expr = If(Int(0), Pop(Int(1))).Else(Int(2))
+
+
+def test_if_short_circuit():
+    shortCircuitOptions = CompileOptions(optimize=OptimizeOptions(shortCircuit=True))
+    args = [Int(0), Len(Sha256(Txn.note())), Pop(Int(1)), Pop(Int(2))]
+    expr = If(Or(args[0], args[1]), args[2], args[3])
+
+    end = TealSimpleBlock([])
+    thenBlock = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.pop)])
+    thenBlock.setNextBlock(end)
+    elseBlock = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.pop)])
+    elseBlock.setNextBlock(end)
+
+    secondBranch = TealConditionalBlock(
+        [
+            TealOp(None, Op.txn, "Note"),
+            TealOp(None, Op.sha256),
+            TealOp(None, Op.len),
+        ]
+    )
+    secondBranch.setTrueBlock(thenBlock)
+    secondBranch.setFalseBlock(elseBlock)
+
+    # the condition branches on each operand instead of computing their combined value
+    expected = TealConditionalBlock([TealOp(None, Op.int, 0)])
+    expected.setTrueBlock(thenBlock)
+    expected.setFalseBlock(secondBranch)
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    with TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
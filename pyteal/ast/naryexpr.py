@@ -1,9 +1,10 @@
-from typing import Sequence, cast, TYPE_CHECKING
+from typing import List, Sequence, Tuple, cast, TYPE_CHECKING
 
 from ..types import TealType, require_type
 from ..errors import TealInputError
-from ..ir import TealOp, Op, TealSimpleBlock
+from ..ir import TealOp, Op, TealBlock, TealSimpleBlock, TealConditionalBlock
 from .expr import Expr
+from .unaryexpr import UnaryExpr
 
 if TYPE_CHECKING:
     from ..compiler import CompileOptions
@@ -32,6 +33,9 @@ class NaryExpr(Expr):
         self.args = args
 
     def __teal__(self, options: "CompileOptions"):
+        if options.optimize.shortCircuit and self.op in (Op.logic_and, Op.logic_or):
+            return compileCondition(options, self).toValue()
+
         start = None
         end = None
         for i, arg in enumerate(self.args):
@@ -64,6 +68,176 @@ class NaryExpr(Expr):
 NaryExpr.__module__ = "pyteal"
 
 
+class Condition:
+    """A compiled uint64 expression, which can either produce its value or branch on it."""
+
+    def getCost(self) -> int:
+        """Get the opcode budget used to produce the value of the expression.
+
+        This must be called before the expression is connected to any other blocks.
+        """
+        raise NotImplementedError
+
+    def toValue(self) -> Tuple[TealBlock, TealSimpleBlock]:
+        """Get the starting and ending block of a path which produces the value of the expression."""
+        raise NotImplementedError
+
+    def toBranch(self, trueBlock: TealBlock, falseBlock: TealBlock) -> TealBlock:
+        """Get the starting block of a path which continues to trueBlock if the expression is true,
+        and to falseBlock otherwise.
+
+        Only one of toValue and toBranch may be called on each Condition.
+        """
+        start, end = self.toValue()
+
+        branchBlock = TealConditionalBlock([])
+        branchBlock.setTrueBlock(trueBlock)
+        branchBlock.setFalseBlock(falseBlock)
+
+        end.setNextBlock(branchBlock)
+
+        return start
+
+
+class ValueCondition(Condition):
+    """An expression whose value is always produced before branching on it."""
+
+    def __init__(self, start: TealBlock, end: TealSimpleBlock) -> None:
+        self.start = start
+        self.end = end
+
+    def getCost(self) -> int:
+        # imported here to avoid a circular import, since the compiler depends on the AST
+        from ..compiler.optimizer.cost import getOpCost
+
+        return sum(
+            getOpCost(op) for block in TealBlock.Iterate(self.start) for op in block.ops
+        )
+
+    def toValue(self) -> Tuple[TealBlock, TealSimpleBlock]:
+        return self.start, self.end
+
+
+class NotCondition(Condition):
+    """The logical inverse of an expression, which is branched on by swapping the targets."""
+
+    def __init__(self, expr: UnaryExpr, arg: Condition) -> None:
+        self.expr = expr
+        self.arg = arg
+
+    def getCost(self) -> int:
+        return self.arg.getCost() + 1
+
+    def toValue(self) -> Tuple[TealBlock, TealSimpleBlock]:
+        start, end = self.arg.toValue()
+        opBlock = TealSimpleBlock([TealOp(self.expr, Op.logic_not)])
+        end.setNextBlock(opBlock)
+        return start, opBlock
+
+    def toBranch(self, trueBlock: TealBlock, falseBlock: TealBlock) -> TealBlock:
+        return self.arg.toBranch(falseBlock, trueBlock)
+
+
+class LogicCondition(Condition):
+    """An And or Or expression, which may skip its remaining operands once its value is known."""
+
+    # The assumed probability that an operand decides the value of the expression, i.e. that it is
+    # false for an And or true for an Or. Conditions are usually checks which valid transactions
+    # pass, so this is low.
+    DECIDING_PROBABILITY = 0.05
+
+    # The number of additional ops executed when the value of a short-circuited expression is
+    # produced: a branch for the last operand, a push of the result, and a jump past the other
+    # result.
+    VALUE_OVERHEAD = 3
+
+    def __init__(
+        self, options: "CompileOptions", expr: NaryExpr, args: List[Condition]
+    ) -> None:
+        self.options = options
+        self.expr = expr
+        self.args = args
+        self.argCosts = [arg.getCost() for arg in args]
+
+    def getCost(self) -> int:
+        return sum(self.argCosts) + len(self.args) - 1
+
+    def expectedSavings(self) -> float:
+        """Get the expected opcode budget saved by skipping the remaining operands once the value
+        of the expression is known."""
+        savings = 0.0
+        reached = 1.0
+        for i in range(len(self.args) - 1):
+            savings += reached * self.DECIDING_PROBABILITY * sum(self.argCosts[i + 1 :])
+            reached *= 1 - self.DECIDING_PROBABILITY
+        return savings
+
+    def toValue(self) -> Tuple[TealBlock, TealSimpleBlock]:
+        if self.expectedSavings() <= self.VALUE_OVERHEAD:
+            start, end = self.args[0].toValue()
+            for arg in self.args[1:]:
+                argStart, argEnd = arg.toValue()
+                end.setNextBlock(argStart)
+                opBlock = TealSimpleBlock([TealOp(self.expr, self.expr.op)])
+                argEnd.setNextBlock(opBlock)
+                end = opBlock
+            return start, end
+
+        end = TealSimpleBlock([])
+        trueBlock = TealSimpleBlock([TealOp(self.expr, Op.int, 1)])
+        falseBlock = TealSimpleBlock([TealOp(self.expr, Op.int, 0)])
+        trueBlock.setNextBlock(end)
+        falseBlock.setNextBlock(end)
+
+        return self.shortCircuit(trueBlock, falseBlock), end
+
+    def toBranch(self, trueBlock: TealBlock, falseBlock: TealBlock) -> TealBlock:
+        # Branching on each operand uses as many ops as combining them and branching on the result,
+        # but the blocks may require up to one extra jump per operand.
+        if self.expectedSavings() <= len(self.args) - 1:
+            return super().toBranch(trueBlock, falseBlock)
+
+        return self.shortCircuit(trueBlock, falseBlock)
+
+    def shortCircuit(self, trueBlock: TealBlock, falseBlock: TealBlock) -> TealBlock:
+        self.options.optimize.report.record("shortCircuit.expressions")
+
+        isAnd = self.expr.op == Op.logic_and
+        start = trueBlock if isAnd else falseBlock
+        for arg in reversed(self.args):
+            if isAnd:
+                start = arg.toBranch(start, falseBlock)
+            else:
+                start = arg.toBranch(trueBlock, start)
+        return start
+
+
+def compileCondition(options: "CompileOptions", expr: Expr) -> Condition:
+    """Compile an expression whose value is used as a condition.
+
+    When the shortCircuit optimization is enabled, And and Or expressions within the condition may
+    be lowered to branches which skip their remaining operands, and Not expressions may be lowered
+    by swapping the targets of a branch. Otherwise the expression is compiled as usual.
+
+    Args:
+        options: The compilation options.
+        expr: The expression to compile. Must evaluate to uint64.
+
+    Returns:
+        The compiled expression. The caller must use either its value or branch on it.
+    """
+    if options.optimize.shortCircuit:
+        if isinstance(expr, NaryExpr) and expr.op in (Op.logic_and, Op.logic_or):
+            return LogicCondition(
+                options, expr, [compileCondition(options, arg) for arg in expr.args]
+            )
+        if isinstance(expr, UnaryExpr) and expr.op == Op.logic_not:
+            return NotCondition(expr, compileCondition(options, expr.arg))
+
+    start, end = expr.__teal__(options)
+    return ValueCondition(start, end)
+
+
 def And(*args: Expr) -> NaryExpr:
     """Logical and expression.
 
@@ -250,3 +250,92 @@ def test_concat_invalid():
 
     with pytest.raises(TealTypeError):
         Concat(Int(1), Int(2))
+
+
+def test_and_short_circuit_cheap():
+    shortCircuitOptions = CompileOptions(optimize=OptimizeOptions(shortCircuit=True))
+    args = [Int(1), Int(2)]
+    expr = And(args[0], args[1])
+
+    expected = TealSimpleBlock(
+        [
+            TealOp(args[0], Op.int, 1),
+            TealOp(args[1], Op.int, 2),
+            TealOp(expr, Op.logic_and),
+        ]
+    )
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    assert actual == expected
+    assert shortCircuitOptions.optimize.report["shortCircuit.expressions"] == 0
+
+
+def test_and_short_circuit():
+    shortCircuitOptions = CompileOptions(optimize=OptimizeOptions(shortCircuit=True))
+    args = [Int(1), Len(Keccak256(Txn.note()))]
+    expr = And(args[0], args[1])
+
+    end = TealSimpleBlock([])
+    trueBlock = TealSimpleBlock([TealOp(expr, Op.int, 1)])
+    trueBlock.setNextBlock(end)
+    falseBlock = TealSimpleBlock([TealOp(expr, Op.int, 0)])
+    falseBlock.setNextBlock(end)
+
+    secondBranch = TealConditionalBlock(
+        [
+            TealOp(None, Op.txn, "Note"),
+            TealOp(None, Op.keccak256),
+            TealOp(None, Op.len),
+        ]
+    )
+    secondBranch.setTrueBlock(trueBlock)
+    secondBranch.setFalseBlock(falseBlock)
+
+    expected = TealConditionalBlock([TealOp(args[0], Op.int, 1)])
+    expected.setTrueBlock(secondBranch)
+    expected.setFalseBlock(falseBlock)
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    with TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
+    assert shortCircuitOptions.optimize.report["shortCircuit.expressions"] == 1
+
+
+def test_or_short_circuit_not():
+    shortCircuitOptions = CompileOptions(optimize=OptimizeOptions(shortCircuit=True))
+    args = [Not(Int(0)), Len(Keccak256(Txn.note()))]
+    expr = Or(args[0], args[1])
+
+    end = TealSimpleBlock([])
+    trueBlock = TealSimpleBlock([TealOp(expr, Op.int, 1)])
+    trueBlock.setNextBlock(end)
+    falseBlock = TealSimpleBlock([TealOp(expr, Op.int, 0)])
+    falseBlock.setNextBlock(end)
+
+    secondBranch = TealConditionalBlock(
+        [
+            TealOp(None, Op.txn, "Note"),
+            TealOp(None, Op.keccak256),
+            TealOp(None, Op.len),
+        ]
+    )
+    secondBranch.setTrueBlock(trueBlock)
+    secondBranch.setFalseBlock(falseBlock)
+
+    # the Not is removed by swapping the targets of the first branch
+    expected = TealConditionalBlock([TealOp(None, Op.int, 0)])
+    expected.setTrueBlock(secondBranch)
+    expected.setFalseBlock(trueBlock)
+
+    actual, _ = expr.__teal__(shortCircuitOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    with TealComponent.Context.ignoreExprEquality():
+        assert actual == expected
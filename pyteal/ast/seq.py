@@ -58,6 +58,9 @@ class Seq(Expr):
             argStart, argEnd = arg.__teal__(options)
             end.setNextBlock(argStart)
             end = argEnd
+            if options.optimize.deadCode and arg.has_return():
+                # all expressions after this one can never be executed
+                break
         return start, end
 
     def __str__(self):
@@ -76,7 +79,8 @@ class Seq(Expr):
         # this expression declares it has a return op only if its final expression has a return op
         # TODO: technically if ANY expression, not just the final one, returns true for has_return,
         # this could return true as well. But in that case all expressions after the one that
-        # returns true for has_return is dead code, so it could be optimized away
+        # returns true for has_return is dead code, which is not compiled when the deadCode
+        # optimization is enabled
         if len(self.args) == 0:
             return False
         return self.args[-1].has_return()
@@ -108,3 +108,31 @@ def test_seq_overloads_equivalence():
     actual = expr2.__teal__(options)
 
     assert actual == expected
+
+
+def test_seq_dead_code():
+    items = [Pop(Int(1)), Return(Int(2)), Pop(Int(3)), Int(4)]
+    expr = Seq(items)
+
+    optimizeOptions = CompileOptions(optimize=OptimizeOptions(deadCode=True))
+
+    expected = TealSimpleBlock(
+        [
+            TealOp(items[0].arg, Op.int, 1),
+            TealOp(items[0], Op.pop),
+            TealOp(items[1].value, Op.int, 2),
+            TealOp(items[1], Op.return_),
+        ]
+    )
+
+    actual, _ = expr.__teal__(optimizeOptions)
+    actual.addIncoming()
+    actual = TealBlock.NormalizeBlocks(actual)
+
+    assert actual == expected
+
+    unoptimized, _ = expr.__teal__(options)
+    unoptimized.addIncoming()
+    unoptimized = TealBlock.NormalizeBlocks(unoptimized)
+
+    assert len(unoptimized.ops) == 7
@@ -21,6 +21,7 @@ class SubroutineDefinition:
         implementation: Callable[..., Expr],
         returnType: TealType,
         nameStr: str = None,
+        inline: bool = None,
     ) -> None:
         super().__init__()
         self.id = SubroutineDefinition.nextSubroutineId
@@ -62,6 +63,7 @@ class SubroutineDefinition:
         self.implementation = implementation
         self.implementationParams = sig.parameters
         self.returnType = returnType
+        self.inline = inline
 
         self.declaration: Optional["SubroutineDeclaration"] = None
         self.__name = self.implementation.__name__ if nameStr is None else nameStr
@@ -182,9 +184,10 @@ class SubroutineFnWrapper:
         fnImplementation: Callable[..., Expr],
         returnType: TealType,
         name: str = None,
+        inline: bool = None,
     ) -> None:
         self.subroutine = SubroutineDefinition(
-            fnImplementation, returnType=returnType, nameStr=name
+            fnImplementation, returnType=returnType, nameStr=name, inline=inline
         )
 
     def __call__(self, *args: Expr, **kwargs) -> Expr:
@@ -226,21 +229,30 @@ class Subroutine:
             ])
     """
 
-    def __init__(self, returnType: TealType, name: str = None) -> None:
+    def __init__(
+        self, returnType: TealType, name: str = None, inline: bool = None
+    ) -> None:
         """Define a new subroutine with the given return type.
 
         Args:
             returnType: The type that the return value of this subroutine must conform to.
                 TealType.none indicates that this subroutine does not return any value.
+            name (optional): The name of the subroutine. Defaults to the name of the function.
+            inline (optional): If true, every call to this subroutine is replaced with a copy of its
+                code, which is not possible for recursive subroutines. If false, calls to this
+                subroutine are never inlined. Defaults to None, in which case calls are inlined
+                only if the inlining optimization is enabled and decides to.
         """
         self.returnType = returnType
         self.name = name
+        self.inline = inline
 
     def __call__(self, fnImplementation: Callable[..., Expr]) -> SubroutineFnWrapper:
         return SubroutineFnWrapper(
             fnImplementation=fnImplementation,
             returnType=self.returnType,
             name=self.name,
+            inline=self.inline,
         )
 
 
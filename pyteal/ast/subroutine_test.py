@@ -210,6 +210,24 @@ def test_decorator():
         mySubroutine(a=Int(1))
 
 
+def test_decorator_inline():
+    @Subroutine(TealType.none)
+    def defaultSubroutine(a):
+        return Return()
+
+    @Subroutine(TealType.none, inline=True)
+    def inlinedSubroutine(a):
+        return Return()
+
+    @Subroutine(TealType.none, inline=False)
+    def notInlinedSubroutine(a):
+        return Return()
+
+    assert defaultSubroutine.subroutine.inline is None
+    assert inlinedSubroutine.subroutine.inline is True
+    assert notInlinedSubroutine.subroutine.inline is False
+
+
 def test_evaluate_subroutine_no_args():
     cases = (
         (TealType.none, Return()),
@@ -2,9 +2,10 @@ from typing import TYPE_CHECKING, Optional
 
 from ..errors import TealCompileError
 from ..types import TealType, require_type
-from ..ir import TealSimpleBlock, TealConditionalBlock
+from ..ir import TealSimpleBlock
 from .expr import Expr
 from .seq import Seq
+from .naryexpr import compileCondition
 
 if TYPE_CHECKING:
     from ..compiler import CompileOptions
@@ -35,17 +36,20 @@ class While(Expr):
 
         options.enterLoop()
 
-        condStart, condEnd = self.cond.__teal__(options)
+        cond = compileCondition(options, self.cond)
         doStart, doEnd = self.doBlock.__teal__(options)
         end = TealSimpleBlock([])
 
-        doEnd.setNextBlock(condStart)
+        condStart = cond.toBranch(doStart, end)
 
-        branchBlock = TealConditionalBlock([])
-        branchBlock.setTrueBlock(doStart)
-        branchBlock.setFalseBlock(end)
-
-        condEnd.setNextBlock(branchBlock)
+        if options.optimize.loopRotation:
+            # test the condition again at the end of the body, so that each iteration branches
+            # back to the body directly instead of jumping to the test at the top
+            bottomStart = compileCondition(options, self.cond).toBranch(doStart, end)
+            doEnd.setNextBlock(bottomStart)
+            options.optimize.report.record("loopRotation.loops")
+        else:
+            doEnd.setNextBlock(condStart)
 
         breakBlocks, continueBlocks = options.exitLoop()
 
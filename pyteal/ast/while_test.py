@@ -121,6 +121,50 @@ def test_while_break():
     assert actual == expected
 
 
+def test_while_rotated():
+    i = ScratchVar()
+    items = [
+        i.load() < Int(2),
+        i.store(i.load() + Int(1)),
+        If(i.load() == Int(1), Continue()),
+        If(i.load() == Int(3), Break()),
+    ]
+    expr = While(items[0]).Do(Seq(items[1], items[2], items[3]))
+
+    rotatedOptions = CompileOptions(optimize=OptimizeOptions(loopRotation=True))
+    rotatedOptions.enterLoop()
+
+    expected, condEnd = items[0].__teal__(rotatedOptions)
+    do, doEnd = Seq([items[1], items[2], items[3]]).__teal__(rotatedOptions)
+    bottomStart, bottomEnd = items[0].__teal__(rotatedOptions)
+    end = TealSimpleBlock([])
+
+    expectedBranch = TealConditionalBlock([])
+    expectedBranch.setTrueBlock(do)
+    expectedBranch.setFalseBlock(end)
+    condEnd.setNextBlock(expectedBranch)
+
+    # the end of the body tests the condition again and branches back to the body
+    doEnd.setNextBlock(bottomStart)
+    bottomBranch = TealConditionalBlock([])
+    bottomBranch.setTrueBlock(do)
+    bottomBranch.setFalseBlock(end)
+    bottomEnd.setNextBlock(bottomBranch)
+
+    breakBlocks, continueBlocks = rotatedOptions.exitLoop()
+
+    for block in breakBlocks:
+        block.setNextBlock(end)
+
+    for block in continueBlocks:
+        block.setNextBlock(do)
+
+    actual, _ = expr.__teal__(rotatedOptions)
+
+    assert actual == expected
+    assert rotatedOptions.optimize.report["loopRotation.loops"] == 1
+
+
 def test_while_invalid():
 
     with pytest.raises(TypeError):
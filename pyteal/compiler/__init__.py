@@ -5,6 +5,7 @@ from .compiler import (
     CompileOptions,
     compileTeal,
 )
+from .optimizer import OptimizeOptions, OptimizeReport
 
 __all__ = [
     "MAX_TEAL_VERSION",
@@ -12,4 +13,6 @@ __all__ = [
     "DEFAULT_TEAL_VERSION",
     "CompileOptions",
     "compileTeal",
+    "OptimizeOptions",
+    "OptimizeReport",
 ]
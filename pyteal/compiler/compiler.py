@@ -9,10 +9,10 @@ from ..ast import (
     SubroutineDefinition,
     SubroutineDeclaration,
 )
-from ..ir import Mode, TealComponent, TealOp, TealBlock, TealSimpleBlock
+from ..ir import Mode, Op, TealComponent, TealOp, TealBlock, TealSimpleBlock
 from ..errors import TealInputError, TealInternalError
 
-from .sort import sortBlocks
+from .sort import sortBlocks, layoutBlocks, countJumps
 from .flatten import flattenBlocks, flattenSubroutines
 from .scratchslots import assignScratchSlotsToSubroutines
 from .subroutines import (
@@ -20,7 +20,22 @@ from .subroutines import (
     spillLocalSlotsDuringRecursion,
     resolveSubroutines,
 )
-from .constants import createConstantBlocks
+from .constants import createConstantBlocks, getConstantsSize
+from .optimizer import (
+    OptimizeOptions,
+    OptimizeReport,
+    foldConstants,
+    removeUnreachableCode,
+    passArgumentsOnStackForSubroutines,
+    keepMultiValuesOnStack,
+    eliminateCommonSubexpressions,
+    inlineSubroutines,
+    outlineRepeatedSequences,
+    selectInstructions,
+    reduceStrength,
+    simplifyExpr,
+    hoistLoopInvariants,
+)
 
 MAX_TEAL_VERSION = 6
 MIN_TEAL_VERSION = 2
@@ -33,9 +48,11 @@ class CompileOptions:
         *,
         mode: Mode = Mode.Signature,
         version: int = DEFAULT_TEAL_VERSION,
+        optimize: OptimizeOptions = None,
     ) -> None:
         self.mode = mode
         self.version = version
+        self.optimize = optimize if optimize is not None else OptimizeOptions()
 
         self.currentSubroutine: Optional[SubroutineDefinition] = None
 
@@ -121,6 +138,14 @@ def compileSubroutine(
         else None
     )
 
+    if options.optimize.algebraicSimplification:
+        ast, rewrites = simplifyExpr(ast)
+        for rule, count in rewrites.items():
+            options.optimize.report.record("algebraicSimplification." + rule, count)
+        options.optimize.report.record(
+            "algebraicSimplification.rewrites", sum(rewrites.values())
+        )
+
     if not ast.has_return():
         if ast.type_of() == TealType.none:
             ast = Seq([ast, Return()])
@@ -135,9 +160,47 @@ def compileSubroutine(
     start = TealBlock.NormalizeBlocks(start)
     start.validateTree()
 
-    order = sortBlocks(start, end)
+    if options.optimize.constantFolding:
+        foldConstants(start)
+
+    if options.optimize.strengthReduction:
+        replaced = reduceStrength(start, options.version)
+        options.optimize.report.record("strengthReduction.replaced", replaced)
+
+    if options.optimize.instructionSelection:
+        replaced = selectInstructions(start, options.version)
+        options.optimize.report.record("instructionSelection.replaced", replaced)
+
+    lastBlock: TealBlock = end
+    if options.optimize.deadCode:
+        removedOps = removeUnreachableCode(start)
+        options.optimize.report.record("deadCode.ops", removedOps)
+
+        start = TealBlock.NormalizeBlocks(start)
+        start.validateTree()
+
+        reachable = list(TealBlock.Iterate(start))
+        if all(block is not lastBlock for block in reachable):
+            # every path returns before reaching the end block, so no block needs to be last
+            lastBlock = reachable[-1]
+
+    order = sortBlocks(start, lastBlock)
+    if options.optimize.blockLayout:
+        jumpsBefore = countJumps(order)
+        order = layoutBlocks(start, lastBlock)
+        options.optimize.report.record(
+            "blockLayout.jumps", jumpsBefore - countJumps(order)
+        )
     teal = flattenBlocks(order)
 
+    if options.optimize.commonSubexpressions:
+        replaced = eliminateCommonSubexpressions(teal)
+        options.optimize.report.record("commonSubexpressions.replaced", replaced)
+
+    if options.optimize.loopInvariantMotion:
+        hoisted = hoistLoopInvariants(teal)
+        options.optimize.report.record("loopInvariantMotion.hoisted", hoisted)
+
     verifyOpsForVersion(teal, options.version)
     verifyOpsForMode(teal, options.mode)
 
@@ -169,6 +232,7 @@ def compileTeal(
     *,
     version: int = DEFAULT_TEAL_VERSION,
     assembleConstants: bool = False,
+    optimize: OptimizeOptions = None,
 ) -> str:
     """Compile a PyTeal expression into TEAL assembly.
 
@@ -183,6 +247,8 @@ def compileTeal(
             constants will be assembled in the most space-efficient way, so enabling this may reduce
             the compiled program's size. Enabling this option requires a minimum TEAL version of 3.
             Defaults to false.
+        optimize (optional): An OptimizeOptions object which specifies the optimizations the
+            compiler should perform. If not provided, no optimizations are performed.
 
     Returns:
         A TEAL assembly program compiled from the input expression.
@@ -201,7 +267,8 @@ def compileTeal(
             )
         )
 
-    options = CompileOptions(mode=mode, version=version)
+    options = CompileOptions(mode=mode, version=version, optimize=optimize)
+    options.optimize.report = OptimizeReport()
 
     subroutineMapping: Dict[
         Optional[SubroutineDefinition], List[TealComponent]
@@ -212,13 +279,47 @@ def compileTeal(
         ast, options, subroutineMapping, subroutineGraph, subroutineBlocks
     )
 
+    if options.optimize.inlining or any(
+        subroutine.inline for subroutine in subroutineGraph
+    ):
+        inlined = inlineSubroutines(
+            subroutineMapping, subroutineGraph, options.optimize.inlining
+        )
+        options.optimize.report.record("inlining.calls", inlined)
+
+    if options.optimize.multiValueStack:
+        removedOps = keepMultiValuesOnStack(subroutineMapping, version)
+        options.optimize.report.record("multiValueStack.ops", removedOps)
+
+    if options.optimize.stackArguments and version >= Op.cover.min_version:
+        rewritten = passArgumentsOnStackForSubroutines(
+            subroutineMapping, subroutineGraph
+        )
+        options.optimize.report.record("stackArguments.subroutines", rewritten)
+
+    if options.optimize.outlining and version >= Op.callsub.min_version:
+        outlined, savedBytes = outlineRepeatedSequences(
+            subroutineMapping, subroutineGraph
+        )
+        options.optimize.report.record("outlining.subroutines", outlined)
+        options.optimize.report.record("outlining.bytes", savedBytes)
+
     localSlotAssignments = assignScratchSlotsToSubroutines(
-        subroutineMapping, subroutineBlocks
+        subroutineMapping,
+        subroutineBlocks,
+        reuseSlots=options.optimize.slotReuse,
+        subroutineGraph=subroutineGraph,
     )
 
-    spillLocalSlotsDuringRecursion(
-        version, subroutineMapping, subroutineGraph, localSlotAssignments
+    skippedSpills = spillLocalSlotsDuringRecursion(
+        version,
+        subroutineMapping,
+        subroutineGraph,
+        localSlotAssignments,
+        onlyLiveSlots=options.optimize.liveSlotSpilling,
     )
+    if options.optimize.liveSlotSpilling:
+        options.optimize.report.record("liveSlotSpilling.slots", skippedSpills)
 
     subroutineLabels = resolveSubroutines(subroutineMapping)
     teal = flattenSubroutines(subroutineMapping, subroutineLabels)
@@ -230,7 +331,15 @@ def compileTeal(
                     version
                 )
             )
-        teal = createConstantBlocks(teal)
+        if options.optimize.constantPacking:
+            packed = createConstantBlocks(teal, optimizeSize=True)
+            options.optimize.report.record(
+                "constantPacking.bytes",
+                getConstantsSize(createConstantBlocks(teal)) - getConstantsSize(packed),
+            )
+            teal = packed
+        else:
+            teal = createConstantBlocks(teal)
 
     lines = ["#pragma version {}".format(version)]
     lines += [i.assemble() for i in teal]
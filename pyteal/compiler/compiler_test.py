@@ -1,3 +1,4 @@
+import hashlib
 import pytest
 
 from .. import *
@@ -1559,3 +1560,960 @@ return
             program, Mode.Application, version=5, assembleConstants=False
         )
         assert actual == expected.strip()
+
+
+def test_compile_optimize_constant_folding():
+    program = Seq(
+        [
+            Assert(Txn.note() == Sha256(Concat(Bytes("prefix"), Itob(Int(1))))),
+            Assert(Txn.lease() == Keccak256(Txn.note())),
+            Int(1),
+        ]
+    )
+
+    digest = hashlib.sha256(b"prefix" + (1).to_bytes(8, "big")).hexdigest()
+
+    expected = """
+#pragma version 3
+txn Note
+byte 0x{}
+==
+assert
+txn Lease
+txn Note
+keccak256
+==
+assert
+int 1
+return
+""".format(
+        digest
+    ).strip()
+    actual = compileTeal(
+        program,
+        Mode.Application,
+        version=3,
+        optimize=OptimizeOptions(constantFolding=True),
+    )
+    assert actual == expected
+
+    unoptimized = compileTeal(program, Mode.Application, version=3)
+    assert "sha256" in unoptimized
+    assert unoptimized == compileTeal(
+        program, Mode.Application, version=3, optimize=OptimizeOptions()
+    )
+
+
+def test_compile_optimize_dead_code():
+    program = Seq(
+        [
+            If(Txn.fee() > Int(10))
+            .Then(Seq([Reject(), App.globalPut(Bytes("a"), Int(1))]))
+            .Else(Err()),
+            App.globalPut(Bytes("b"), Int(2)),
+            Approve(),
+        ]
+    )
+
+    expected = """
+#pragma version 5
+txn Fee
+int 10
+>
+bz main_l2
+int 0
+return
+main_l2:
+err
+""".strip()
+
+    optimize = OptimizeOptions(deadCode=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=optimize)
+    assert actual == expected
+    assert optimize.report["deadCode.ops"] == 5
+
+    unoptimized = compileTeal(program, Mode.Application, version=5)
+    assert "app_global_put" in unoptimized
+
+
+def test_compile_optimize_dead_code_subroutine():
+    @Subroutine(TealType.uint64)
+    def unreachable() -> Expr:
+        return Int(1)
+
+    @Subroutine(TealType.uint64)
+    def early(x: Expr) -> Expr:
+        return Seq([Return(x), unreachable()])
+
+    program = early(Int(1))
+
+    expected = """
+#pragma version 4
+int 1
+callsub early_0
+return
+
+// early
+early_0:
+store 0
+load 0
+retsub
+""".strip()
+
+    actual = compileTeal(
+        program,
+        Mode.Application,
+        version=4,
+        optimize=OptimizeOptions(deadCode=True),
+    )
+    assert actual == expected
+
+
+def test_compile_optimize_slot_reuse():
+    counter = ScratchVar(TealType.uint64)
+    variables = [ScratchVar(TealType.uint64) for _ in range(20)]
+    program = Seq(
+        [
+            For(
+                counter.store(Int(0)),
+                counter.load() < Int(3),
+                counter.store(counter.load() + Int(1)),
+            ).Do(
+                Seq(
+                    [
+                        Seq([var.store(Int(i)), Pop(var.load())])
+                        for i, var in enumerate(variables[:10])
+                    ]
+                )
+            ),
+        ]
+        + [
+            Seq([var.store(Int(i)), Pop(var.load())])
+            for i, var in enumerate(variables[10:])
+        ]
+        + [Int(1)]
+    )
+
+    def usedSlotIds(teal):
+        return {
+            line.split()[1]
+            for line in teal.splitlines()
+            if line.startswith("store ") or line.startswith("load ")
+        }
+
+    unoptimized = compileTeal(program, Mode.Application, version=4)
+    assert len(usedSlotIds(unoptimized)) == 21
+
+    options = OptimizeOptions(slotReuse=True)
+    optimized = compileTeal(program, Mode.Application, version=4, optimize=options)
+    # the loop counter is live during the loop body, so the body needs a second slot
+    assert usedSlotIds(optimized) == {"0", "1"}
+
+
+def test_compile_optimize_slot_reuse_subroutines():
+    @Subroutine(TealType.uint64)
+    def double(value: Expr) -> Expr:
+        result = ScratchVar(TealType.uint64)
+        return Seq([result.store(value + value), result.load()])
+
+    @Subroutine(TealType.uint64)
+    def square(value: Expr) -> Expr:
+        result = ScratchVar(TealType.uint64)
+        return Seq([result.store(value * value), result.load()])
+
+    @Subroutine(TealType.uint64)
+    def isEven(i: Expr) -> Expr:
+        counter = ScratchVar(TealType.uint64)
+        return Seq(
+            [
+                counter.store(i),
+                If(counter.load() < Int(2))
+                .Then(counter.load() == Int(0))
+                .Else(isEven(counter.load() - Int(2))),
+            ]
+        )
+
+    program = Return(double(Int(2)) + square(Int(3)) + isEven(Int(4)))
+
+    options = OptimizeOptions(slotReuse=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+
+    def subroutineSlotIds(name):
+        body = actual.split("{}:\n".format(name))[1].split("retsub")[0]
+        return {
+            line.split()[1]
+            for line in body.splitlines()
+            if line.startswith("store ") or line.startswith("load ")
+        }
+
+    # the subroutines are never executing at the same time, so they share slot 0 for all
+    # subroutine arguments and local variables
+    assert subroutineSlotIds("double_0") == {"0"}
+    assert subroutineSlotIds("square_1") == {"0"}
+    assert subroutineSlotIds("isEven_2") == {"0"}
+
+    # the recursive subroutine still spills its slot before calling itself
+    assert "load 0\nswap\ncallsub isEven_2\nswap\nstore 0" in actual
+
+
+def test_compile_optimize_stack_arguments():
+    @Subroutine(TealType.uint64)
+    def difference(a: Expr, b: Expr) -> Expr:
+        return a - b
+
+    @Subroutine(TealType.uint64)
+    def isEven(i: Expr) -> Expr:
+        return If(i < Int(2)).Then(i == Int(0)).Else(isEven(i - Int(2)))
+
+    program = Return(difference(Int(5), Int(3)) + isEven(Int(4)))
+
+    expected = """#pragma version 5
+int 5
+int 3
+callsub difference_0
+int 4
+callsub isEven_1
++
+return
+
+// difference
+difference_0:
+-
+retsub
+
+// isEven
+isEven_1:
+store 0
+load 0
+int 2
+<
+bnz isEven_1_l2
+load 0
+int 2
+-
+load 0
+swap
+callsub isEven_1
+swap
+store 0
+b isEven_1_l3
+isEven_1_l2:
+load 0
+int 0
+==
+isEven_1_l3:
+retsub
+    """.strip()
+
+    options = OptimizeOptions(stackArguments=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["stackArguments.subroutines"] == 1
+
+    # cover and uncover are not available before version 5
+    actual = compileTeal(program, Mode.Application, version=4, optimize=options)
+    assert "store 1\nstore 0\nload 0\nload 1\n-\nretsub" in actual
+    assert options.report["stackArguments.subroutines"] == 0
+
+
+def test_compile_optimize_multi_value_stack():
+    balance = AssetHolding.balance(Int(0), Int(1))
+    optedIn = App.localGetEx(Int(0), Int(0), Bytes("key"))
+    program = Seq(
+        [
+            balance,
+            Assert(balance.hasValue()),
+            optedIn,
+            If(optedIn.hasValue(), optedIn.value(), balance.value()),
+        ]
+    )
+
+    expected = """#pragma version 5
+int 0
+int 1
+asset_holding_get AssetBalance
+swap
+store 0
+assert
+int 0
+int 0
+byte "key"
+app_local_get_ex
+swap
+store 1
+bnz main_l2
+load 0
+b main_l3
+main_l2:
+load 1
+main_l3:
+return
+    """.strip()
+
+    options = OptimizeOptions(multiValueStack=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["multiValueStack.ops"] == 2
+
+
+def test_compile_optimize_common_subexpressions():
+    previous = Gtxn[Txn.group_index() - Int(1)]
+    program = Seq(
+        [
+            Assert(previous.amount() > Int(5)),
+            If(Txn.fee() > Int(1000)).Then(Assert(previous.amount() < Int(100))),
+            Return(previous.amount() < Int(10)),
+        ]
+    )
+
+    expected = """#pragma version 5
+txn GroupIndex
+int 1
+-
+gtxns Amount
+store 0
+load 0
+int 5
+>
+assert
+txn Fee
+int 1000
+>
+bz main_l2
+load 0
+int 100
+<
+assert
+main_l2:
+load 0
+int 10
+<
+return
+    """.strip()
+
+    options = OptimizeOptions(commonSubexpressions=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["commonSubexpressions.replaced"] == 2
+
+
+def test_compile_optimize_block_layout():
+    program = Seq(
+        [
+            If(Txn.fee() > Int(1000)).Then(Err()),
+            If(Txn.amount() > Int(1)).Then(Pop(Int(1))).Else(Pop(Int(2))),
+            Approve(),
+        ]
+    )
+
+    expected = """#pragma version 5
+txn Fee
+int 1000
+>
+bnz main_l5
+txn Amount
+int 1
+>
+bnz main_l4
+int 2
+pop
+main_l3:
+int 1
+return
+main_l4:
+int 1
+pop
+b main_l3
+main_l5:
+err
+    """.strip()
+
+    options = OptimizeOptions(blockLayout=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["blockLayout.jumps"] == 1
+
+    # without the optimization, both branches of the second If jump past the Err block
+    unoptimized = compileTeal(program, Mode.Application, version=5)
+    assert unoptimized.count("\nb main_l5") == 2
+
+
+def test_compile_optimize_short_circuit():
+    i = ScratchVar()
+    program = Seq(
+        [
+            i.store(Int(0)),
+            While(And(i.load() < Int(3), Len(Sha256(Txn.note())) > Int(0))).Do(
+                i.store(i.load() + Int(1))
+            ),
+            Cond(
+                [Or(Txn.fee() == Int(0), Sha256(Txn.note()) == Bytes("x")), Approve()],
+                [Int(1), Reject()],
+            ),
+        ]
+    )
+
+    expected = """#pragma version 5
+int 0
+store 0
+main_l1:
+load 0
+int 3
+<
+bnz main_l8
+main_l2:
+txn Fee
+int 0
+==
+bnz main_l7
+txn Note
+sha256
+byte "x"
+==
+bnz main_l7
+int 1
+bnz main_l6
+err
+main_l6:
+int 0
+return
+main_l7:
+int 1
+return
+main_l8:
+txn Note
+sha256
+len
+int 0
+>
+bz main_l2
+load 0
+int 1
++
+store 0
+b main_l1
+    """.strip()
+
+    options = OptimizeOptions(shortCircuit=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["shortCircuit.expressions"] == 2
+
+    unoptimized = compileTeal(program, Mode.Application, version=5)
+    assert "&&" in unoptimized and "||" in unoptimized
+
+
+def test_compile_optimize_constant_packing():
+    program = Seq(
+        [
+            Assert(Txn.fee() > Int(1)),
+            Assert(Txn.amount() > Int(1)),
+            Return(Txn.note() == Bytes("abcdef")),
+        ]
+    )
+
+    expected = """#pragma version 5
+txn Fee
+pushint 1 // 1
+>
+assert
+txn Amount
+pushint 1 // 1
+>
+assert
+txn Note
+pushbytes 0x616263646566 // "abcdef"
+==
+return
+    """.strip()
+
+    options = OptimizeOptions(constantPacking=True)
+    actual = compileTeal(
+        program,
+        Mode.Application,
+        version=5,
+        assembleConstants=True,
+        optimize=options,
+    )
+    assert actual == expected
+    # "intcblock 1" uses 3 bytes, and saves 1 byte for each use of 1
+    assert options.report["constantPacking.bytes"] == 1
+
+    # without assembled constants, the optimization has no effect
+    options = OptimizeOptions(constantPacking=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == compileTeal(program, Mode.Application, version=5)
+
+
+def test_compile_optimize_inlining():
+    @Subroutine(TealType.uint64, inline=True)
+    def double(x: Expr) -> Expr:
+        return x + x
+
+    @Subroutine(TealType.uint64)
+    def clamp(x: Expr) -> Expr:
+        return If(x > Int(10)).Then(Int(10)).Else(x)
+
+    @Subroutine(TealType.uint64, inline=False)
+    def square(x: Expr) -> Expr:
+        return x * x
+
+    program = Seq(
+        [
+            Pop(double(Int(1))),
+            Pop(square(Int(2))),
+            Return(clamp(double(Txn.fee()))),
+        ]
+    )
+
+    expected = """#pragma version 5
+int 1
+store 1
+load 1
+load 1
++
+pop
+int 2
+callsub square_0
+pop
+txn Fee
+store 2
+load 2
+load 2
++
+store 3
+load 3
+int 10
+>
+bnz main_l0
+load 3
+b main_l1
+main_l0:
+int 10
+main_l1:
+return
+
+// square
+square_0:
+store 0
+load 0
+load 0
+*
+retsub
+    """.strip()
+
+    options = OptimizeOptions(inlining=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["inlining.calls"] == 3
+
+    # subroutines defined with inline=True are inlined even without the optimization
+    actual = compileTeal(program, Mode.Application, version=5)
+    assert "callsub clamp_0" in actual
+    assert "double" not in actual
+
+
+def test_compile_optimize_inlining_recursive():
+    @Subroutine(TealType.uint64)
+    def fact(n: Expr) -> Expr:
+        return If(n == Int(0)).Then(Int(1)).Else(n * fact(n - Int(1)))
+
+    program = Return(fact(Int(5)))
+
+    # recursive subroutines are never inlined
+    options = OptimizeOptions(inlining=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == compileTeal(program, Mode.Application, version=5)
+    assert options.report["inlining.calls"] == 0
+
+    @Subroutine(TealType.uint64, inline=True)
+    def forcedFact(n: Expr) -> Expr:
+        return If(n == Int(0)).Then(Int(1)).Else(n * forcedFact(n - Int(1)))
+
+    with pytest.raises(TealInputError):
+        compileTeal(Return(forcedFact(Int(5))), Mode.Application, version=5)
+
+
+def test_compile_optimize_outlining():
+    def isCreator():
+        return And(Txn.sender() == Global.creator_address(), Txn.fee() <= Int(1000))
+
+    program = Seq(
+        [
+            Assert(isCreator()),
+            If(Txn.application_args.length() == Int(0)).Then(Assert(isCreator())),
+            Return(isCreator()),
+        ]
+    )
+
+    expected = """#pragma version 4
+callsub outlined_0
+assert
+txn NumAppArgs
+int 0
+==
+bz main_l2
+callsub outlined_0
+assert
+main_l2:
+callsub outlined_0
+return
+
+// outlined
+outlined_0:
+txn Sender
+global CreatorAddress
+==
+txn Fee
+int 1000
+<=
+&&
+retsub
+    """.strip()
+
+    options = OptimizeOptions(outlining=True)
+    actual = compileTeal(program, Mode.Application, version=4, optimize=options)
+    assert actual == expected
+    assert options.report["outlining.subroutines"] == 1
+    assert options.report["outlining.bytes"] == 3 * (11 - 3) - 12
+
+    # callsub is not available before TEAL version 4
+    options = OptimizeOptions(outlining=True)
+    actual = compileTeal(program, Mode.Application, version=3, optimize=options)
+    assert actual == compileTeal(program, Mode.Application, version=3)
+    assert options.report["outlining.subroutines"] == 0
+
+
+def test_compile_optimize_live_slot_spilling():
+    @Subroutine(TealType.uint64)
+    def fib(n):
+        a = ScratchVar(TealType.uint64)
+        b = ScratchVar(TealType.uint64)
+        return Seq(
+            [
+                If(n <= Int(1)).Then(Return(n)),
+                a.store(fib(n - Int(1))),
+                b.store(fib(n - Int(2))),
+                Return(a.load() + b.load()),
+            ]
+        )
+
+    program = Return(fib(Int(10)))
+
+    expected = """#pragma version 5
+int 10
+callsub fib_0
+return
+
+// fib
+fib_0:
+store 0
+load 0
+int 1
+<=
+bz fib_0_l2
+load 0
+retsub
+fib_0_l2:
+load 0
+int 1
+-
+load 0
+swap
+callsub fib_0
+swap
+store 0
+store 1
+load 0
+int 2
+-
+load 1
+swap
+callsub fib_0
+swap
+store 1
+store 2
+load 1
+load 2
++
+retsub
+    """.strip()
+
+    options = OptimizeOptions(liveSlotSpilling=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["liveSlotSpilling.slots"] == 4
+
+
+def test_compile_optimize_instruction_selection():
+    arg = Txn.application_args[0]
+    program = Seq(
+        [
+            Assert(Btoi(Extract(arg, Txn.fee(), Int(8))) > Int(0)),
+            Assert(Btoi(Substring(arg, Int(0), Int(2))) > Int(0)),
+            Return(Txn.accounts[Txn.group_index() * Int(0) + Int(1)] == Txn.sender()),
+        ]
+    )
+
+    expected = """#pragma version 5
+txna ApplicationArgs 0
+txn Fee
+extract_uint64
+int 0
+>
+assert
+txna ApplicationArgs 0
+int 0
+extract_uint16
+int 0
+>
+assert
+txn GroupIndex
+int 0
+*
+int 1
++
+txnas Accounts
+txn Sender
+==
+return
+    """.strip()
+
+    options = OptimizeOptions(instructionSelection=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["instructionSelection.replaced"] == 2
+
+    program = Return(Txn.accounts[Int(1)] == Txn.sender())
+
+    expected = """#pragma version 5
+txna Accounts 1
+txn Sender
+==
+return
+    """.strip()
+
+    options = OptimizeOptions(instructionSelection=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["instructionSelection.replaced"] == 1
+
+
+def test_compile_optimize_strength_reduction():
+    program = Return(
+        And(
+            Txn.fee() / Int(2 ** 40) == Int(0),
+            Txn.fee() % Int(128) == Int(1),
+            Exp(Txn.amount(), Int(2)) > Txn.fee() * Int(1),
+            Txn.amount() * Int(1024) > Int(0),
+        )
+    )
+
+    expected = """#pragma version 4
+txn Fee
+int 40
+shr
+int 0
+==
+txn Fee
+int 127
+&
+int 1
+==
+&&
+txn Amount
+dup
+*
+txn Fee
+>
+&&
+txn Amount
+int 1024
+*
+int 0
+>
+&&
+return
+    """.strip()
+
+    options = OptimizeOptions(strengthReduction=True)
+    actual = compileTeal(program, Mode.Application, version=4, optimize=options)
+    assert actual == expected
+    assert options.report["strengthReduction.replaced"] == 4
+
+
+def test_compile_optimize_algebraic_simplification():
+    program = Seq(
+        [
+            If(
+                Not(Txn.fee() > Int(1000)),
+                App.globalPut(Bytes("fee"), Txn.fee()),
+                App.globalPut(Bytes("fee"), Int(0)),
+            ),
+            Assert(And(Txn.amount() == Int(0), Int(1))),
+            Return(Btoi(Itob(Txn.fee())) > Len(Itob(Int(7)))),
+        ]
+    )
+
+    expected = """#pragma version 4
+txn Fee
+int 1000
+>
+bnz main_l2
+byte "fee"
+txn Fee
+app_global_put
+b main_l3
+main_l2:
+byte "fee"
+int 0
+app_global_put
+main_l3:
+txn Amount
+!
+assert
+txn Fee
+int 8
+>
+return
+    """.strip()
+
+    options = OptimizeOptions(algebraicSimplification=True)
+    actual = compileTeal(program, Mode.Application, version=4, optimize=options)
+    assert actual == expected
+    assert options.report["algebraicSimplification.ifNot"] == 1
+    assert options.report["algebraicSimplification.eqZero"] == 1
+    assert options.report["algebraicSimplification.andOne"] == 1
+    assert options.report["algebraicSimplification.btoiItob"] == 1
+    assert options.report["algebraicSimplification.lenItob"] == 1
+    assert options.report["algebraicSimplification.rewrites"] == 5
+
+    # the program is not modified
+    assert compileTeal(program, Mode.Application, version=4) != expected
+
+
+def test_compile_optimize_loop_invariant_motion():
+    i = ScratchVar(TealType.uint64)
+    total = ScratchVar(TealType.uint64)
+    program = Seq(
+        [
+            total.store(Int(0)),
+            For(
+                i.store(Int(0)),
+                i.load() < Global.group_size() - Int(1),
+                i.store(i.load() + Int(1)),
+            ).Do(
+                total.store(
+                    total.load()
+                    + App.globalGet(Bytes("cfg"))
+                    + Len(Txn.application_args[0])
+                )
+            ),
+            Return(total.load()),
+        ]
+    )
+
+    expected = """#pragma version 5
+int 0
+store 1
+int 0
+store 0
+global GroupSize
+int 1
+-
+store 2
+byte "cfg"
+app_global_get
+store 3
+main_l1:
+load 0
+load 2
+<
+bz main_l3
+load 1
+load 3
++
+txna ApplicationArgs 0
+len
++
+store 1
+load 0
+int 1
++
+store 0
+b main_l1
+main_l3:
+load 1
+return
+    """.strip()
+
+    options = OptimizeOptions(loopInvariantMotion=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["loopInvariantMotion.hoisted"] == 2
+
+
+def test_compile_optimize_loop_rotation():
+    i = ScratchVar(TealType.uint64)
+    total = ScratchVar(TealType.uint64)
+    program = Seq(
+        [
+            total.store(Int(0)),
+            For(i.store(Int(0)), i.load() < Int(10), i.store(i.load() + Int(1))).Do(
+                Seq(
+                    [
+                        If(i.load() == Int(3), Continue()),
+                        If(i.load() == Int(8), Break()),
+                        total.store(total.load() + i.load()),
+                    ]
+                )
+            ),
+            Return(total.load()),
+        ]
+    )
+
+    expected = """#pragma version 5
+int 0
+store 1
+int 0
+store 0
+load 0
+int 10
+<
+bz main_l5
+main_l1:
+load 0
+int 3
+==
+bnz main_l4
+load 0
+int 8
+==
+bnz main_l5
+load 1
+load 0
++
+store 1
+main_l4:
+load 0
+int 1
++
+store 0
+load 0
+int 10
+<
+bnz main_l1
+main_l5:
+load 1
+return
+    """.strip()
+
+    options = OptimizeOptions(loopRotation=True)
+    actual = compileTeal(program, Mode.Application, version=5, optimize=options)
+    assert actual == expected
+    assert options.report["loopRotation.loops"] == 1
+
+    # without rotation, each iteration also jumps back to the test at the top
+    unrotated = compileTeal(program, Mode.Application, version=5)
+    assert unrotated.count("\nb main_l1\n") == 1
+    assert "\nb " not in actual
@@ -1,6 +1,6 @@
 import base64
 
-from typing import Union, List, Dict, cast
+from typing import Callable, Union, List, Dict, TypeVar, cast
 from collections import OrderedDict
 from algosdk import encoding
 
@@ -112,13 +112,160 @@ def extractMethodSigValue(op: TealOp) -> bytes:
     return methodSelector
 
 
-def createConstantBlocks(ops: List[TealComponent]) -> List[TealComponent]:
+# The assumed encoded size of template variables, whose values are not known at compile time: the
+# largest possible varuint for ints, and a length prefix and 32 bytes, e.g. an address, for bytes.
+TEMPLATE_INT_SIZE = 10
+TEMPLATE_BYTES_SIZE = 33
+
+
+def varuintSize(value: int) -> int:
+    """Get the number of bytes needed to encode an integer as a varuint."""
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+def intConstantSize(value: Union[str, int]) -> int:
+    """Get the number of bytes needed to encode an int constant."""
+    if type(value) is str:
+        return TEMPLATE_INT_SIZE
+    return varuintSize(cast(int, value))
+
+
+def bytesConstantSize(value: Union[str, bytes]) -> int:
+    """Get the number of bytes needed to encode a byte constant, including its length."""
+    if type(value) is str:
+        return TEMPLATE_BYTES_SIZE
+    return varuintSize(len(value)) + len(value)
+
+
+def encodeBytesValue(value: Union[str, bytes]) -> str:
+    return ("0x" + value.hex()) if type(value) is bytes else cast(str, value)
+
+
+Constant = TypeVar("Constant", bound=Union[str, int, bytes])
+
+# The maximum number of entries in a constant block, since intc and bytec take a 1 byte index.
+MAX_CONSTANT_BLOCK_SIZE = 256
+
+
+def chooseConstantBlock(
+    freqs: Dict[Constant, int], sizeOf: Callable[[Constant], int]
+) -> List[Constant]:
+    """Choose the constants to store in a constant block so that the program is as small as possible.
+
+    Each constant in the block is encoded once, and each use of it costs 1 byte if it is one of the
+    first 4 constants in the block, or 2 bytes otherwise. Each constant which is not in the block is
+    pushed with an op that costs 1 byte plus the size of the constant. The block itself costs 1 byte
+    plus the size of the number of constants it contains.
+
+    Args:
+        freqs: The number of times each constant is used. Constants which are used the same number
+            of times keep the order of this dict.
+        sizeOf: A function which returns the encoded size of a constant.
+
+    Returns:
+        The constants in the block, in order. This is empty if using a block would not make the
+        program smaller.
+    """
+
+    def savings(value: Constant, referenceSize: int) -> int:
+        # the bytes saved by storing the value in the block instead of pushing it every time
+        size = sizeOf(value)
+        return freqs[value] * (1 + size) - size - freqs[value] * referenceSize
+
+    # a 1 byte reference always saves more than a 2 byte one, so give the first 4 entries of the
+    # block to the constants which gain the most from it
+    shortCandidates = [value for value in freqs if savings(value, 1) > 0]
+    shortCandidates.sort(
+        key=lambda value: savings(value, 1) - max(savings(value, 2), 0), reverse=True
+    )
+    shortBlock = shortCandidates[:4]
+
+    longCandidates = [
+        value for value in freqs if value not in shortBlock and savings(value, 2) > 0
+    ]
+    longCandidates.sort(key=lambda value: savings(value, 2), reverse=True)
+    longBlock = longCandidates[: MAX_CONSTANT_BLOCK_SIZE - len(shortBlock)]
+
+    block = [value for value in freqs if value in shortBlock] + [
+        value for value in freqs if value in longBlock
+    ]
+
+    totalSavings = sum(savings(value, 1) for value in shortBlock) + sum(
+        savings(value, 2) for value in longBlock
+    )
+    if totalSavings <= 1 + varuintSize(len(block)):
+        return []
+
+    return block
+
+
+def getConstantsSize(ops: List[TealComponent]) -> int:
+    """Get the number of bytes used by the assembled constant ops in a program.
+
+    This includes constant blocks and all ops which load constants. Template variables are assumed
+    to have the sizes TEMPLATE_INT_SIZE and TEMPLATE_BYTES_SIZE.
+
+    Args:
+        ops: A list of TealComponents, as produced by createConstantBlocks.
+    """
+
+    def argIntSize(arg) -> int:
+        return intConstantSize(cast(Union[str, int], arg))
+
+    def argBytesSize(arg) -> int:
+        value = cast(str, arg)
+        if value.startswith("0x"):
+            return bytesConstantSize(bytes.fromhex(value[2:]))
+        return bytesConstantSize(value)
+
+    size = 0
+    for op in ops:
+        if not isinstance(op, TealOp):
+            continue
+
+        basicOp = op.getOp()
+        if basicOp == Op.intcblock:
+            size += 1 + varuintSize(len(op.args))
+            size += sum(argIntSize(arg) for arg in op.args)
+        elif basicOp == Op.bytecblock:
+            size += 1 + varuintSize(len(op.args))
+            size += sum(argBytesSize(arg) for arg in op.args)
+        elif basicOp in (
+            Op.intc_0,
+            Op.intc_1,
+            Op.intc_2,
+            Op.intc_3,
+            Op.bytec_0,
+            Op.bytec_1,
+            Op.bytec_2,
+            Op.bytec_3,
+        ):
+            size += 1
+        elif basicOp in (Op.intc, Op.bytec):
+            size += 2
+        elif basicOp == Op.pushint:
+            size += 1 + argIntSize(op.args[0])
+        elif basicOp == Op.pushbytes:
+            size += 1 + argBytesSize(op.args[0])
+
+    return size
+
+
+def createConstantBlocks(
+    ops: List[TealComponent], optimizeSize: bool = False
+) -> List[TealComponent]:
     """Convert TEAL code from using pseudo-ops for constants to using assembled constant blocks.
 
     This conversion will assemble constants to be as space-efficient as possible.
 
     Args:
         ops: A list of TealComponents to convert.
+        optimizeSize (optional): When true, the constants in each block and their order are chosen
+            by chooseConstantBlock, which takes the encoded size of each constant into account, so
+            that the constants use as few bytes as possible. Otherwise, ints which are used more
+            than once are stored in the block if they are among the 4 most used or are at least
+            2**7, and byte strings which are used more than once are always stored in the block.
+            Defaults to false.
 
     Returns:
         A list of TealComponent that are functionally the same as the input, but with all constants
@@ -153,25 +300,27 @@ def createConstantBlocks(ops: List[TealComponent]) -> List[TealComponent]:
     sortedInts = sorted(intFreqs, key=lambda x: intFreqs[x], reverse=True)
     sortedBytes = sorted(byteFreqs, key=lambda x: byteFreqs[x], reverse=True)
 
-    # Use Op.pushint if the constant does not occur in the top 4 most frequent and is smaller than
-    # 2 ** 7 to improve performance and save block space.
-    intBlock = [
-        val
-        for i, val in enumerate(sortedInts)
-        if intFreqs[val] > 1 and (i < 4 or isinstance(val, str) or val >= 2 ** 7)
-    ]
+    if optimizeSize:
+        intBlock = chooseConstantBlock(intFreqs, intConstantSize)
+        byteBlock = chooseConstantBlock(byteFreqs, bytesConstantSize)
+    else:
+        # Use Op.pushint if the constant does not occur in the top 4 most frequent and is smaller
+        # than 2 ** 7 to improve performance and save block space.
+        intBlock = [
+            val
+            for i, val in enumerate(sortedInts)
+            if intFreqs[val] > 1 and (i < 4 or isinstance(val, str) or val >= 2 ** 7)
+        ]
 
-    byteBlock = [
-        ("0x" + b.hex()) if type(b) is bytes else cast(str, b)
-        for b in sortedBytes
-        if byteFreqs[b] > 1
-    ]
+        byteBlock = [b for b in sortedBytes if byteFreqs[b] > 1]
 
     if len(intBlock) != 0:
         assembled.append(TealOp(None, Op.intcblock, *intBlock))
 
     if len(byteBlock) != 0:
-        assembled.append(TealOp(None, Op.bytecblock, *byteBlock))
+        assembled.append(
+            TealOp(None, Op.bytecblock, *[encodeBytesValue(b) for b in byteBlock])
+        )
 
     for op in ops:
         if isinstance(op, TealOp):
@@ -214,18 +363,19 @@ def createConstantBlocks(ops: List[TealComponent]) -> List[TealComponent]:
                         "Expect a byte-like constant opcode, get {}".format(op)
                     )
 
-                if byteFreqs[byteValue] == 1:
-                    encodedValue = (
-                        ("0x" + byteValue.hex())
-                        if type(byteValue) is bytes
-                        else cast(str, byteValue)
-                    )
+                if byteValue not in byteBlock:
                     assembled.append(
-                        TealOp(op.expr, Op.pushbytes, encodedValue, "//", *op.args)
+                        TealOp(
+                            op.expr,
+                            Op.pushbytes,
+                            encodeBytesValue(byteValue),
+                            "//",
+                            *op.args
+                        )
                     )
                     continue
 
-                index = sortedBytes.index(byteValue)
+                index = byteBlock.index(byteValue)
                 if index == 0:
                     assembled.append(TealOp(op.expr, Op.bytec_0, "//", *op.args))
                 elif index == 1:
@@ -6,6 +6,11 @@ from .constants import (
     extractAddrValue,
     createConstantBlocks,
     extractMethodSigValue,
+    varuintSize,
+    intConstantSize,
+    bytesConstantSize,
+    chooseConstantBlock,
+    getConstantsSize,
 )
 
 
@@ -667,3 +672,107 @@ def test_createConstantBlocks_small_constant():
 
         actual = createConstantBlocks(ops)
         assert actual == expected
+
+
+def test_varuintSize():
+    tests = [
+        (0, 1),
+        (1, 1),
+        (2 ** 7 - 1, 1),
+        (2 ** 7, 2),
+        (2 ** 14 - 1, 2),
+        (2 ** 14, 3),
+        (2 ** 64 - 1, 10),
+    ]
+
+    for value, expected in tests:
+        assert varuintSize(value) == expected
+
+
+def test_chooseConstantBlock():
+    tests = [
+        # empty
+        ({}, []),
+        # pushing a small int twice is smaller than a block
+        ({1: 2}, []),
+        # a small int used 3 times takes the same space either way
+        ({1: 3}, []),
+        ({1: 4}, [1]),
+        # a large int used twice is worth a block
+        ({2 ** 20: 2}, [2 ** 20]),
+        # the ints which gain the most from a 1 byte reference come first
+        (
+            {5: 2, 2 ** 20: 2, 2 ** 30: 4, 2 ** 40: 3, 2 ** 50: 2, 2 ** 60: 2},
+            [2 ** 20, 2 ** 30, 2 ** 40, 2 ** 50, 2 ** 60],
+        ),
+        # template variables are assumed to be large, and once there is a block, storing 1 in it
+        # saves a byte
+        ({"TMPL_A": 2, 1: 2}, ["TMPL_A", 1]),
+    ]
+
+    for freqs, expected in tests:
+        assert chooseConstantBlock(freqs, intConstantSize) == expected
+
+    # "a" takes 2 bytes to encode, so storing it in a block saves nothing when it is used twice
+    assert chooseConstantBlock({b"a": 2}, bytesConstantSize) == []
+    assert chooseConstantBlock({b"a": 3}, bytesConstantSize) == [b"a"]
+
+
+def test_getConstantsSize():
+    ops = [
+        TealOp(None, Op.intcblock, 1, 2 ** 7),
+        TealOp(None, Op.bytecblock, "0x0102", "TMPL_A"),
+        TealOp(None, Op.intc_0, "//", 1),
+        TealOp(None, Op.intc, 1, "//", 2 ** 7),
+        TealOp(None, Op.bytec_1, "//", "TMPL_A"),
+        TealOp(None, Op.pushint, 2 ** 14, "//", 2 ** 14),
+        TealOp(None, Op.pushbytes, "0x01", "//", "0x01"),
+        TealOp(None, Op.add),
+    ]
+
+    # intcblock: 1 + 1 + 1 + 2, bytecblock: 1 + 1 + 3 + 33, intc_0: 1, intc 1: 2, bytec_1: 1,
+    # pushint: 1 + 3, pushbytes: 1 + 2
+    assert getConstantsSize(ops) == 5 + 38 + 1 + 2 + 1 + 4 + 3
+
+
+def test_createConstantBlocks_optimizeSize():
+    ops = [TealOp(None, Op.int, value) for value in (0, 1, 2, 3, 2 ** 40) * 3]
+
+    # 2**40 gains the most from a 1 byte reference, and 3 is cheaper to push than to reference
+    # with intc 4
+    expected = [TealOp(None, Op.intcblock, 0, 1, 2, 2 ** 40)]
+    expected += [
+        TealOp(None, Op.intc_0, "//", 0),
+        TealOp(None, Op.intc_1, "//", 1),
+        TealOp(None, Op.intc_2, "//", 2),
+        TealOp(None, Op.pushint, 3, "//", 3),
+        TealOp(None, Op.intc_3, "//", 2 ** 40),
+    ] * 3
+
+    actual = createConstantBlocks(ops, optimizeSize=True)
+    assert actual == expected
+
+    unoptimized = createConstantBlocks(ops)
+    assert getConstantsSize(unoptimized) - getConstantsSize(actual) == 1
+
+
+def test_createConstantBlocks_optimizeSize_pushes():
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.byte, '"a"'),
+        TealOp(None, Op.byte, '"a"'),
+    ]
+
+    expected = [
+        TealOp(None, Op.pushint, 1, "//", 1),
+        TealOp(None, Op.pushint, 1, "//", 1),
+        TealOp(None, Op.pushbytes, "0x61", "//", '"a"'),
+        TealOp(None, Op.pushbytes, "0x61", "//", '"a"'),
+    ]
+
+    actual = createConstantBlocks(ops, optimizeSize=True)
+    assert actual == expected
+
+    unoptimized = createConstantBlocks(ops)
+    assert getConstantsSize(unoptimized) - getConstantsSize(actual) == 1
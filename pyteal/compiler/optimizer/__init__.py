@@ -0,0 +1,12 @@
+from .optimizer import OptimizeOptions, OptimizeReport
+from .folding import foldConstants
+from .reachability import removeUnreachableCode
+from .stackargs import passArgumentsOnStackForSubroutines
+from .multivalue import keepMultiValuesOnStack
+from .cse import eliminateCommonSubexpressions
+from .inline import inlineSubroutines
+from .outline import outlineRepeatedSequences
+from .select import selectInstructions
+from .strength import reduceStrength
+from .simplify import simplifyExpr
+from .invariant import hoistLoopInvariants
@@ -0,0 +1,31 @@
+from typing import Dict
+
+from ...ir import Op, TealOp
+
+# The opcode budget cost of ops which cost more than 1.
+opCosts: Dict[Op, int] = {
+    Op.sha256: 35,
+    Op.keccak256: 130,
+    Op.sha512_256: 45,
+    Op.ed25519verify: 1900,
+    Op.sqrt: 4,
+    Op.divmodw: 20,
+    Op.b_add: 10,
+    Op.b_minus: 10,
+    Op.b_div: 20,
+    Op.b_mul: 20,
+    Op.b_mod: 20,
+    Op.b_or: 6,
+    Op.b_and: 6,
+    Op.b_xor: 6,
+    Op.b_not: 4,
+    Op.ecdsa_verify: 1700,
+    Op.ecdsa_pk_decompress: 650,
+    Op.ecdsa_pk_recover: 2000,
+    Op.bsqrt: 40,
+}
+
+
+def getOpCost(stmt: TealOp) -> int:
+    """Get the amount of opcode budget an op consumes when it executes."""
+    return opCosts.get(stmt.getOp(), 1)
@@ -0,0 +1,232 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ...ast import ScratchSlot
+from ...ir import Op, TealOp, TealComponent
+from .cost import getOpCost
+from .dominance import findDominators, dominates
+from .stack import getStackEffect
+
+# Ops which always produce the same single value from the same stack arguments during an execution
+# of a program, and have no side effects other than possibly failing.
+pureOps = {
+    Op.int,
+    Op.byte,
+    Op.addr,
+    Op.method_signature,
+    Op.pushint,
+    Op.pushbytes,
+    Op.arg,
+    Op.args,
+    Op.txn,
+    Op.txna,
+    Op.txnas,
+    Op.gtxn,
+    Op.gtxna,
+    Op.gtxnas,
+    Op.gtxns,
+    Op.gtxnsa,
+    Op.gtxnsas,
+    Op.global_,
+    Op.sha256,
+    Op.keccak256,
+    Op.sha512_256,
+    Op.add,
+    Op.minus,
+    Op.div,
+    Op.mul,
+    Op.mod,
+    Op.exp,
+    Op.shl,
+    Op.shr,
+    Op.sqrt,
+    Op.bitlen,
+    Op.lt,
+    Op.gt,
+    Op.le,
+    Op.ge,
+    Op.eq,
+    Op.neq,
+    Op.logic_and,
+    Op.logic_or,
+    Op.logic_not,
+    Op.bitwise_and,
+    Op.bitwise_or,
+    Op.bitwise_xor,
+    Op.bitwise_not,
+    Op.len,
+    Op.itob,
+    Op.btoi,
+    Op.concat,
+    Op.substring,
+    Op.substring3,
+    Op.extract,
+    Op.extract3,
+    Op.extract_uint16,
+    Op.extract_uint32,
+    Op.extract_uint64,
+    Op.getbit,
+    Op.getbyte,
+    Op.b_add,
+    Op.b_minus,
+    Op.b_div,
+    Op.b_mul,
+    Op.b_mod,
+    Op.b_lt,
+    Op.b_gt,
+    Op.b_le,
+    Op.b_ge,
+    Op.b_eq,
+    Op.b_neq,
+    Op.b_or,
+    Op.b_and,
+    Op.b_xor,
+    Op.b_not,
+    Op.bzero,
+}
+
+# Fields whose values may change while a program executes, or which describe the results of
+# transactions.
+impureFields = {
+    "OpcodeBudget",
+    "Logs",
+    "NumLogs",
+    "CreatedAssetID",
+    "CreatedApplicationID",
+}
+
+# An occurrence of an expression, as the indexes of its first and last ops.
+Span = Tuple[int, int]
+
+
+def isPure(stmt: TealComponent) -> bool:
+    return (
+        isinstance(stmt, TealOp)
+        and stmt.getOp() in pureOps
+        and not any(arg in impureFields for arg in stmt.args)
+    )
+
+
+def findExpression(
+    ops: List[TealComponent],
+    end: int,
+    canInclude: Callable[[TealComponent], bool] = isPure,
+) -> Optional[int]:
+    """Find the start of the pure expression whose result is computed by an op.
+
+    Args:
+        ops: A list of TealComponents.
+        end: The index of the op which computes the result of the expression.
+        canInclude (optional): A function which checks if an op may be part of the expression.
+            Every op it accepts must push exactly one value. Defaults to isPure.
+
+    Returns:
+        The index of the first op of the expression, or None if the op at end does not compute the
+        result of a pure expression, i.e. if any op which contributes to its result is not pure.
+    """
+    needed = 1
+    start = end + 1
+    while needed > 0:
+        start -= 1
+        if start < 0 or not canInclude(ops[start]):
+            return None
+        # every included op pushes exactly one value
+        pops, _ = getStackEffect(ops[start])  # type: ignore
+        needed += pops - 1
+
+    return start
+
+
+def eliminateCommonSubexpressions(ops: List[TealComponent]) -> int:
+    """Compute the value of repeated pure expressions in a subroutine once.
+
+    When an expression is computed at a point in the subroutine which every path to another
+    computation of the same expression passes through, the first computation can store its value in
+    a new scratch slot and the others can load that slot instead. This is only done when it reduces
+    the opcode budget used: storing and loading a value costs 1 each, so a single txn field read
+    is never replaced, but hashes and arithmetic over fields often are.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks. This list will be modified in place.
+
+    Returns:
+        The number of computations which were replaced by a load.
+    """
+    blockOf, dominators = findDominators(ops)
+
+    occurrences: Dict[Tuple[str, ...], List[Span]] = dict()
+    costs: Dict[Tuple[str, ...], int] = dict()
+    for end, stmt in enumerate(ops):
+        if len(dominators[blockOf[end]]) == 0:
+            # unreachable
+            continue
+        start = findExpression(ops, end)
+        if start is None or start == end:
+            continue
+        key = tuple(op.assemble() for op in ops[start : end + 1])
+        occurrences.setdefault(key, []).append((start, end))
+        costs[key] = sum(getOpCost(op) for op in ops[start : end + 1])  # type: ignore
+
+    # indexes of ops which will be replaced by a load
+    replaced: Set[int] = set()
+    # a mapping from the start index of each replaced occurrence to its end and new slot
+    replacements: Dict[int, Tuple[int, ScratchSlot]] = dict()
+    # a mapping from the end index of each first occurrence to its new slot
+    materialized: Dict[int, ScratchSlot] = dict()
+
+    # visit the most expensive expressions first, since they contain cheaper ones
+    for key in sorted(occurrences.keys(), key=lambda key: -costs[key]):
+        spans = [
+            span
+            for span in occurrences[key]
+            if all(i not in replaced for i in range(span[0], span[1] + 1))
+        ]
+
+        for first in spans:
+            if any(
+                other != first and dominates(blockOf, dominators, other[1], first[0])
+                for other in spans
+            ):
+                # first is not the earliest occurrence
+                continue
+
+            dominated = [
+                other
+                for other in spans
+                if other != first
+                and dominates(blockOf, dominators, first[1], other[0])
+                and all(i not in replaced for i in range(other[0], other[1] + 1))
+            ]
+
+            # storing the value costs a store and a load, and each occurrence is replaced by a load
+            savings = len(dominated) * (costs[key] - 1) - 2
+            if savings <= 0:
+                continue
+
+            slot = ScratchSlot()
+            materialized[first[1]] = slot
+            for start, end in dominated:
+                replacements[start] = (end, slot)
+                replaced.update(range(start, end + 1))
+
+    if len(replacements) == 0:
+        return 0
+
+    newOps: List[TealComponent] = []
+    i = 0
+    while i < len(ops):
+        if i in replacements:
+            end, slot = replacements[i]
+            newOps.append(TealOp(ops[end].expr, Op.load, slot))
+            i = end + 1
+            continue
+
+        newOps.append(ops[i])
+        if i in materialized:
+            slot = materialized[i]
+            newOps.append(TealOp(ops[i].expr, Op.store, slot))
+            newOps.append(TealOp(ops[i].expr, Op.load, slot))
+        i += 1
+
+    ops[:] = newOps
+    return len(replacements)
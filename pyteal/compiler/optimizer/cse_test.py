@@ -0,0 +1,134 @@
+from ... import *
+
+from .cse import findExpression, eliminateCommonSubexpressions
+
+
+def test_findExpression():
+    ops = [
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Amount"),
+        TealOp(None, Op.load, ScratchSlot()),
+        TealOp(None, Op.add),
+        TealOp(None, Op.global_, "OpcodeBudget"),
+    ]
+
+    assert findExpression(ops, 0) == 0
+    assert findExpression(ops, 2) == 0
+    assert findExpression(ops, 3) == 0
+    assert findExpression(ops, 4) is None
+    assert findExpression(ops, 5) is None
+    assert findExpression(ops, 6) is None
+
+
+def test_eliminateCommonSubexpressions():
+    ops = [
+        TealOp(None, Op.txna, "ApplicationArgs", 0),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.byte, '"a"'),
+        TealOp(None, Op.eq),
+        TealOp(None, Op.assert_),
+        TealOp(None, Op.txna, "ApplicationArgs", 0),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.byte, '"b"'),
+        TealOp(None, Op.neq),
+        TealOp(None, Op.return_),
+    ]
+
+    assert eliminateCommonSubexpressions(ops) == 1
+
+    slot = ops[2].args[0]
+    assert isinstance(slot, ScratchSlot)
+    assert ops == [
+        TealOp(None, Op.txna, "ApplicationArgs", 0),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.store, slot),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.byte, '"a"'),
+        TealOp(None, Op.eq),
+        TealOp(None, Op.assert_),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.byte, '"b"'),
+        TealOp(None, Op.neq),
+        TealOp(None, Op.return_),
+    ]
+
+
+def test_eliminateCommonSubexpressions_cheap():
+    # a single field read is no more expensive than a load
+    ops = [
+        TealOp(None, Op.txn, "Sender"),
+        TealOp(None, Op.txn, "Sender"),
+        TealOp(None, Op.eq),
+        TealOp(None, Op.txn, "Sender"),
+        TealOp(None, Op.len),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+    expected = list(ops)
+
+    assert eliminateCommonSubexpressions(ops) == 0
+    assert ops == expected
+
+
+def test_eliminateCommonSubexpressions_not_dominating():
+    l1 = LabelReference("l1")
+    ops = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.bz, l1),
+        TealOp(None, Op.txna, "ApplicationArgs", 0),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.pop),
+        TealLabel(None, l1),
+        TealOp(None, Op.txna, "ApplicationArgs", 0),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.return_),
+    ]
+    expected = list(ops)
+
+    # the first hash is not computed on every path to the second
+    assert eliminateCommonSubexpressions(ops) == 0
+    assert ops == expected
+
+
+def test_eliminateCommonSubexpressions_nested():
+    ops = [
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Amount"),
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Amount"),
+        TealOp(None, Op.add),
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Fee"),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+
+    # the whole gtxns expression is replaced first, leaving only two occurrences of the index
+    # expression, which is not enough to be worth storing
+    assert eliminateCommonSubexpressions(ops) == 1
+
+    slot = ops[4].args[0]
+    assert ops == [
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Amount"),
+        TealOp(None, Op.store, slot),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.txn, "GroupIndex"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.gtxns, "Fee"),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
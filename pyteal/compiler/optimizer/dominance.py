@@ -0,0 +1,113 @@
+from typing import List, Set, Tuple
+
+from ...ir import TealOp, TealLabel, TealComponent
+from .liveness import findSuccessors
+
+
+def findBasicBlocks(ops: List[TealComponent]) -> List[Tuple[int, int]]:
+    """Split a flattened subroutine into basic blocks.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+
+    Returns:
+        A list of (start, end) index pairs, in order, such that ops[start:end] is a basic block.
+        Only the first component of a basic block may be a label, and only the last component may
+        be an op which branches or ends the subroutine.
+    """
+    successors = findSuccessors(ops)
+
+    leaders = {0} if len(ops) != 0 else set()
+    for i, stmt in enumerate(ops):
+        if isinstance(stmt, TealLabel):
+            leaders.add(i)
+        elif successors[i] != [i + 1] and i + 1 < len(ops):
+            leaders.add(i + 1)
+
+    starts = sorted(leaders)
+    return [
+        (start, starts[i + 1] if i + 1 < len(starts) else len(ops))
+        for i, start in enumerate(starts)
+    ]
+
+
+def findDominators(ops: List[TealComponent]) -> Tuple[List[int], List[Set[int]]]:
+    """Find the dominators of each basic block in a flattened subroutine.
+
+    A block dominates another block if every path from the start of the subroutine to the other
+    block passes through it. Every block dominates itself.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+
+    Returns:
+        A tuple of two lists. The first maps the index of each component to the index of the
+        basic block containing it, as returned by findBasicBlocks. The second contains the set of
+        blocks which dominate each block. Blocks which can never be reached have an empty set of
+        dominators.
+    """
+    blocks = findBasicBlocks(ops)
+    successors = findSuccessors(ops)
+
+    blockOf: List[int] = [0 for _ in ops]
+    for index, (start, end) in enumerate(blocks):
+        for i in range(start, end):
+            blockOf[i] = index
+
+    predecessors: List[Set[int]] = [set() for _ in blocks]
+    for index, (start, end) in enumerate(blocks):
+        for successor in successors[end - 1]:
+            predecessors[blockOf[successor]].add(index)
+
+    # find reachable blocks, since unreachable blocks would otherwise be dominated by every block
+    reachable = {0} if len(blocks) != 0 else set()
+    stack = [0] if len(blocks) != 0 else []
+    while len(stack) != 0:
+        index = stack.pop()
+        start, end = blocks[index]
+        for successor in successors[end - 1]:
+            if blockOf[successor] not in reachable:
+                reachable.add(blockOf[successor])
+                stack.append(blockOf[successor])
+
+    allBlocks = set(reachable)
+    dominators: List[Set[int]] = [
+        set(allBlocks) if index in reachable else set() for index in range(len(blocks))
+    ]
+    if len(blocks) != 0:
+        dominators[0] = {0}
+
+    changed = True
+    while changed:
+        changed = False
+        for index in range(1, len(blocks)):
+            if index not in reachable:
+                continue
+            newDominators = set(allBlocks)
+            for predecessor in predecessors[index]:
+                if predecessor in reachable:
+                    newDominators &= dominators[predecessor]
+            newDominators.add(index)
+            if newDominators != dominators[index]:
+                dominators[index] = newDominators
+                changed = True
+
+    return blockOf, dominators
+
+
+def dominates(
+    blockOf: List[int], dominators: List[Set[int]], first: int, second: int
+) -> bool:
+    """Check whether every path to the component at index second passes through index first.
+
+    Args:
+        blockOf: The first list returned by findDominators.
+        dominators: The second list returned by findDominators.
+        first: The index of a component.
+        second: The index of another component.
+    """
+    if blockOf[first] == blockOf[second]:
+        return first <= second
+    return blockOf[first] in dominators[blockOf[second]]
@@ -0,0 +1,70 @@
+from ... import *
+
+from .dominance import findBasicBlocks, findDominators, dominates
+
+
+def test_findBasicBlocks():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 3),
+        TealLabel(None, l2),
+        TealOp(None, Op.return_),
+    ]
+
+    assert findBasicBlocks(ops) == [(0, 2), (2, 4), (4, 6), (6, 8)]
+    assert findBasicBlocks([]) == []
+
+
+def test_findDominators():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    l3 = LabelReference("l3")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 3),
+        TealLabel(None, l2),
+        TealOp(None, Op.return_),
+        TealLabel(None, l3),
+        TealOp(None, Op.err),
+    ]
+
+    blockOf, dominators = findDominators(ops)
+
+    assert blockOf == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert dominators == [{0}, {0, 1}, {0, 2}, {0, 3}, set()]
+
+    assert dominates(blockOf, dominators, 0, 7)
+    assert dominates(blockOf, dominators, 2, 3)
+    assert not dominates(blockOf, dominators, 3, 2)
+    assert not dominates(blockOf, dominators, 2, 7)
+    assert not dominates(blockOf, dominators, 5, 7)
+
+
+def test_findDominators_loop():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bz, l2),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l2),
+        TealOp(None, Op.return_),
+    ]
+
+    blockOf, dominators = findDominators(ops)
+
+    assert blockOf == [0, 1, 1, 1, 2, 2, 3, 3]
+    assert dominators == [{0}, {0, 1}, {0, 1, 2}, {0, 1, 3}]
@@ -0,0 +1,115 @@
+import hashlib
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from algosdk import encoding
+
+from ...ir import Op, TealOp, TealBlock
+from ..constants import (
+    extractIntValue,
+    extractBytesValue,
+    extractAddrValue,
+    extractMethodSigValue,
+)
+from .keccak import keccak256
+
+# The maximum length of a byte string on the TEAL stack.
+MAX_BYTES_LENGTH = 4096
+
+
+def extractConstantValue(op: TealOp) -> Optional[Union[int, bytes]]:
+    """Get the value loaded by a constant op, if it is known at compile time.
+
+    Returns:
+        The integer or byte string that op loads. If op does not load a constant, or if it loads a
+        template variable whose value is not known at compile time, None is returned.
+    """
+    basicOp = op.getOp()
+
+    value: Union[str, int, bytes]
+    if basicOp == Op.int:
+        value = extractIntValue(op)
+    elif basicOp == Op.byte:
+        value = extractBytesValue(op)
+    elif basicOp == Op.addr:
+        value = extractAddrValue(op)
+    elif basicOp == Op.method_signature:
+        value = extractMethodSigValue(op)
+    else:
+        return None
+
+    if type(value) is str:
+        # template variable
+        return None
+
+    return value  # type: ignore
+
+
+def concatConstants(first: bytes, second: bytes) -> Optional[bytes]:
+    result = first + second
+    if len(result) > MAX_BYTES_LENGTH:
+        # leave the concat op in place so that it still fails at runtime
+        return None
+    return result
+
+
+# A mapping from each op which can be evaluated at compile time to the types of its stack arguments
+# and a function which evaluates it. The function may return None to indicate that the op should
+# not be folded.
+foldableOps: Dict[Op, Tuple[Tuple[type, ...], Callable[..., Optional[bytes]]]] = {
+    Op.sha256: ((bytes,), lambda data: hashlib.sha256(data).digest()),
+    Op.sha512_256: ((bytes,), lambda data: encoding.checksum(data)),
+    Op.keccak256: ((bytes,), keccak256),
+    Op.concat: ((bytes, bytes), concatConstants),
+    Op.itob: ((int,), lambda value: value.to_bytes(8, "big")),
+}
+
+
+def foldConstantOps(ops: List[TealOp]) -> List[TealOp]:
+    """Evaluate ops whose arguments are all constants at compile time.
+
+    Folding is performed from the beginning of ops to the end, so the result of one folded op can
+    be used as the argument to another, e.g. the hash of a concatenation of literals is folded into
+    a single constant.
+
+    Args:
+        ops: A list of ops that are executed sequentially, i.e. the ops of a single basic block.
+
+    Returns:
+        A list of ops with the same behavior as the input, where every foldable op whose arguments
+        are constants has been replaced, along with the ops that load its arguments, by a single op
+        loading its result.
+    """
+    folded: List[TealOp] = []
+
+    for op in ops:
+        spec = foldableOps.get(op.getOp())
+        if spec is not None and len(op.args) == 0:
+            argTypes, evaluate = spec
+            numArgs = len(argTypes)
+
+            if len(folded) >= numArgs:
+                argOps = folded[len(folded) - numArgs :]
+                args: List[Any] = [extractConstantValue(argOp) for argOp in argOps]
+
+                if all(type(arg) is argType for arg, argType in zip(args, argTypes)):
+                    result = evaluate(*args)
+                    if result is not None:
+                        del folded[len(folded) - numArgs :]
+                        folded.append(TealOp(op.expr, Op.byte, "0x" + result.hex()))
+                        continue
+
+        folded.append(op)
+
+    return folded
+
+
+def foldConstants(start: TealBlock) -> None:
+    """Evaluate constant operations at compile time in every block of a graph.
+
+    This function modifies the ops of the blocks in the graph in place.
+
+    Args:
+        start: The starting block of the graph.
+    """
+    for block in TealBlock.Iterate(start):
+        block.ops = foldConstantOps(block.ops)
@@ -0,0 +1,109 @@
+import hashlib
+
+from ... import *
+
+from .folding import extractConstantValue, foldConstantOps, foldConstants
+from .keccak import keccak256
+
+
+def test_extractConstantValue():
+    tests = [
+        (TealOp(None, Op.int, 5), 5),
+        (TealOp(None, Op.int, "pay"), 1),
+        (TealOp(None, Op.int, "TMPL_NAME"), None),
+        (TealOp(None, Op.byte, '"test"'), b"test"),
+        (TealOp(None, Op.byte, "0xff00"), b"\xff\x00"),
+        (TealOp(None, Op.byte, "TMPL_NAME"), None),
+        (TealOp(None, Op.addr, "TMPL_NAME"), None),
+        (TealOp(None, Op.txn, "Sender"), None),
+    ]
+
+    for op, expected in tests:
+        assert extractConstantValue(op) == expected
+
+
+def test_foldConstantOps_hashes():
+    data = b"test"
+    tests = [
+        (Op.sha256, hashlib.sha256(data).digest()),
+        (Op.sha512_256, hashlib.new("sha512_256", data).digest()),
+        (Op.keccak256, keccak256(data)),
+    ]
+
+    for hashOp, digest in tests:
+        ops = [TealOp(None, Op.byte, '"test"'), TealOp(None, hashOp)]
+        expected = [TealOp(None, Op.byte, "0x" + digest.hex())]
+        assert foldConstantOps(ops) == expected
+
+
+def test_foldConstantOps_nested():
+    ops = [
+        TealOp(None, Op.byte, '"a"'),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.itob),
+        TealOp(None, Op.concat),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.keccak256),
+    ]
+
+    digest = keccak256(hashlib.sha256(b"a" + (1).to_bytes(8, "big")).digest())
+    expected = [TealOp(None, Op.byte, "0x" + digest.hex())]
+
+    assert foldConstantOps(ops) == expected
+
+
+def test_foldConstantOps_not_constant():
+    tests = [
+        [TealOp(None, Op.txn, "Sender"), TealOp(None, Op.sha256)],
+        [TealOp(None, Op.byte, "TMPL_NAME"), TealOp(None, Op.sha256)],
+        [TealOp(None, Op.sha256)],
+        [
+            TealOp(None, Op.txn, "Sender"),
+            TealOp(None, Op.byte, '"a"'),
+            TealOp(None, Op.concat),
+        ],
+        [
+            TealOp(None, Op.byte, "0x" + "00" * 4000),
+            TealOp(None, Op.byte, "0x" + "00" * 100),
+            TealOp(None, Op.concat),
+        ],
+    ]
+
+    for ops in tests:
+        assert foldConstantOps(list(ops)) == ops
+
+
+def test_foldConstantOps_partial():
+    ops = [
+        TealOp(None, Op.txn, "Sender"),
+        TealOp(None, Op.byte, '"a"'),
+        TealOp(None, Op.sha256),
+        TealOp(None, Op.concat),
+    ]
+
+    expected = [
+        TealOp(None, Op.txn, "Sender"),
+        TealOp(None, Op.byte, "0x" + hashlib.sha256(b"a").hexdigest()),
+        TealOp(None, Op.concat),
+    ]
+
+    assert foldConstantOps(ops) == expected
+
+
+def test_foldConstants():
+    start = TealSimpleBlock(
+        [TealOp(None, Op.byte, '"a"'), TealOp(None, Op.sha256), TealOp(None, Op.len)]
+    )
+    branch = TealConditionalBlock([])
+    end = TealSimpleBlock([TealOp(None, Op.byte, '"b"'), TealOp(None, Op.sha256)])
+    start.setNextBlock(branch)
+    branch.setTrueBlock(end)
+    branch.setFalseBlock(end)
+
+    foldConstants(start)
+
+    assert start.ops == [
+        TealOp(None, Op.byte, "0x" + hashlib.sha256(b"a").hexdigest()),
+        TealOp(None, Op.len),
+    ]
+    assert end.ops == [TealOp(None, Op.byte, "0x" + hashlib.sha256(b"b").hexdigest())]
@@ -0,0 +1,245 @@
+import re
+from typing import Dict, List, Optional, Set, Union
+
+from ...ast import ScratchSlot, SubroutineDefinition
+from ...errors import TealInputError
+from ...ir import Op, TealOp, TealLabel, TealComponent, LabelReference
+from ..subroutines import findRecursionPoints
+from .liveness import hasDynamicSlotAccess
+
+
+def shouldInline(ops: List[TealComponent], calls: int) -> bool:
+    """Decide whether to inline a subroutine which has not been forced or forbidden from inlining.
+
+    A subroutine with a single call site is always inlined, since this removes its callsub and
+    retsub without making the program larger. Otherwise the subroutine is inlined if doing so adds
+    at most one op to the program for each call site, which saves the 2 ops of opcode budget that
+    each call uses for callsub and retsub.
+
+    Args:
+        ops: The TealComponents of the subroutine.
+        calls: The number of times the subroutine is called in the program.
+    """
+    if calls == 1:
+        return True
+
+    size = sum(1 for stmt in ops if isinstance(stmt, TealOp))
+    # each copy of the subroutine does not need its retsub, but each call needs a callsub
+    growth = calls * (size - 1) - (size + calls)
+    return growth <= calls
+
+
+def nextLabelIndex(ops: List[TealComponent]) -> int:
+    """Get an index which is greater than the index of every label in a subroutine."""
+    index = 0
+    for stmt in ops:
+        if isinstance(stmt, TealLabel):
+            match = re.fullmatch(r"l(\d+)", stmt.getLabelRef().getLabel())
+            if match is not None:
+                index = max(index, int(match.group(1)) + 1)
+    return index
+
+
+def copySubroutine(
+    ops: List[TealComponent],
+    renamedSlots: Set[ScratchSlot],
+    labelIndex: int,
+) -> List[TealComponent]:
+    """Create a copy of a subroutine which can replace a callsub op that invokes it.
+
+    The copy begins by storing the arguments of the subroutine, which the caller has already placed
+    on the stack, exactly like the subroutine does. Each retsub is replaced with a jump to the end
+    of the copy.
+
+    Args:
+        ops: The TealComponents of the subroutine. This list is not modified.
+        renamedSlots: The slots of the subroutine which should be replaced with new slots in the
+            copy.
+        labelIndex: The index of the first label to create in the copy. Labels in the copy are
+            named l<index>, and must not conflict with the labels of the caller.
+
+    Returns:
+        The TealComponents of the copy.
+    """
+    slotMapping: Dict[ScratchSlot, ScratchSlot] = {
+        slot: ScratchSlot() for slot in renamedSlots
+    }
+    labelMapping: Dict[str, LabelReference] = dict()
+
+    def renameLabel(label: LabelReference) -> LabelReference:
+        nonlocal labelIndex
+        if label.getLabel() not in labelMapping:
+            labelMapping[label.getLabel()] = LabelReference("l{}".format(labelIndex))
+            labelIndex += 1
+        return labelMapping[label.getLabel()]
+
+    endLabel: Optional[LabelReference] = None
+
+    copy: List[TealComponent] = []
+    for i, stmt in enumerate(ops):
+        if isinstance(stmt, TealLabel):
+            copy.append(
+                TealLabel(stmt.expr, renameLabel(stmt.getLabelRef()), stmt.comment)
+            )
+            continue
+
+        if not isinstance(stmt, TealOp):
+            copy.append(stmt)
+            continue
+
+        if stmt.getOp() == Op.retsub:
+            if i == len(ops) - 1:
+                # the copy falls through to the code after the call
+                continue
+            if endLabel is None:
+                endLabel = LabelReference("l{}".format(labelIndex))
+                labelIndex += 1
+            copy.append(TealOp(stmt.expr, Op.b, endLabel))
+            continue
+
+        args: List[
+            Union[int, str, LabelReference, ScratchSlot, SubroutineDefinition]
+        ] = []
+        for arg in stmt.args:
+            if isinstance(arg, ScratchSlot):
+                args.append(slotMapping.get(arg, arg))
+            elif isinstance(arg, LabelReference):
+                args.append(renameLabel(arg))
+            else:
+                args.append(arg)
+        copy.append(TealOp(stmt.expr, stmt.getOp(), *args))
+
+    if endLabel is not None:
+        copy.append(TealLabel(None, endLabel))
+
+    return copy
+
+
+def inlineSubroutines(
+    subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    useHeuristic: bool,
+) -> int:
+    """Replace calls to subroutines with copies of their code.
+
+    A subroutine is inlined if it was defined with inline=True, or if useHeuristic is true, it was
+    not defined with inline=False, and shouldInline decides so. Recursive subroutines are never
+    inlined. Callees are considered before their callers, so a subroutine which becomes small after
+    its own calls are inlined may be inlined as well.
+
+    Each copy of a subroutine uses new scratch slots in place of the slots which are only used by
+    that subroutine, so that they can be assigned separately from the slots of other copies. If the
+    program accesses scratch slots dynamically, slots are never renamed.
+
+    Args:
+        subroutineMapping: A mapping from subroutine to the list of TealComponents which make up
+            that subroutine. The key None is taken to mean the main program routine. Inlined
+            subroutines are removed from this map, and the values of this map will be modified to
+            replace calls to them.
+        subroutineGraph: A graph of subroutines. Each key is a subroutine (the main routine should
+            not be present), which represents a node in the graph. Each value is a set of all
+            subroutines that specific subroutine calls, which represent directional edges in the
+            graph. This will be modified to reflect the inlined calls.
+        useHeuristic: Whether to inline subroutines which were not defined with an inline option.
+
+    Raises:
+        TealInputError: if a recursive subroutine was defined with inline=True.
+
+    Returns:
+        The number of calls which were inlined.
+    """
+    recursive = set(
+        subroutine
+        for subroutine, reentryPoints in findRecursionPoints(subroutineGraph).items()
+        if len(reentryPoints) != 0
+    )
+    for subroutine in recursive:
+        if subroutine.inline is True:
+            raise TealInputError(
+                "Subroutine {} cannot be inlined because it is recursive".format(
+                    subroutine.name()
+                )
+            )
+
+    renameSlots = not any(
+        hasDynamicSlotAccess(ops) for ops in subroutineMapping.values()
+    )
+
+    # order subroutines so that callees come before their callers
+    order: List[SubroutineDefinition] = []
+    visited: Set[SubroutineDefinition] = set()
+
+    def visit(subroutine: SubroutineDefinition) -> None:
+        visited.add(subroutine)
+        for callee in sorted(subroutineGraph[subroutine], key=lambda s: s.id):
+            if callee not in visited:
+                visit(callee)
+        order.append(subroutine)
+
+    for subroutine in sorted(subroutineGraph.keys(), key=lambda s: s.id):
+        if subroutine not in visited:
+            visit(subroutine)
+
+    inlined = 0
+    for subroutine in order:
+        if subroutine in recursive or subroutine.inline is False:
+            continue
+
+        ops = subroutineMapping[subroutine]
+        calls = sum(
+            1
+            for callerOps in subroutineMapping.values()
+            for stmt in callerOps
+            if isinstance(stmt, TealOp)
+            and stmt.getOp() == Op.callsub
+            and subroutine in stmt.getSubroutines()
+        )
+
+        if subroutine.inline is not True and not (
+            useHeuristic and shouldInline(ops, calls)
+        ):
+            continue
+
+        renamedSlots: Set[ScratchSlot] = set()
+        if renameSlots:
+            renamedSlots = set(
+                slot
+                for stmt in ops
+                for slot in stmt.getSlots()
+                if not slot.isReservedSlot
+            )
+            for other, otherOps in subroutineMapping.items():
+                if other is not subroutine:
+                    for stmt in otherOps:
+                        renamedSlots -= set(stmt.getSlots())
+
+        del subroutineMapping[subroutine]
+        callees = subroutineGraph.pop(subroutine)
+
+        for caller, callerOps in subroutineMapping.items():
+            if not any(subroutine in stmt.getSubroutines() for stmt in callerOps):
+                continue
+
+            labelIndex = nextLabelIndex(callerOps)
+            newOps: List[TealComponent] = []
+            for stmt in callerOps:
+                if not (
+                    isinstance(stmt, TealOp)
+                    and stmt.getOp() == Op.callsub
+                    and subroutine in stmt.getSubroutines()
+                ):
+                    newOps.append(stmt)
+                    continue
+
+                copy = copySubroutine(ops, renamedSlots, labelIndex)
+                labelIndex = max(labelIndex, nextLabelIndex(copy))
+                newOps += copy
+                inlined += 1
+
+            subroutineMapping[caller] = newOps
+            if caller is not None:
+                subroutineGraph[caller] = (
+                    subroutineGraph[caller] - {subroutine}
+                ) | callees
+
+    return inlined
@@ -0,0 +1,168 @@
+import pytest
+
+from ... import *
+
+from .inline import shouldInline, nextLabelIndex, copySubroutine, inlineSubroutines
+
+
+def test_shouldInline():
+    slot = ScratchSlot()
+    ops = [
+        TealOp(None, Op.store, slot),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.load, slot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert shouldInline(ops, 1)
+    assert shouldInline(ops, 2)
+    assert not shouldInline(ops, 3)
+
+    assert shouldInline(ops[1:], 3)
+
+
+def test_nextLabelIndex():
+    assert nextLabelIndex([]) == 0
+    assert (
+        nextLabelIndex(
+            [
+                TealLabel(None, LabelReference("l3")),
+                TealOp(None, Op.b, LabelReference("l3")),
+                TealLabel(None, LabelReference("l1")),
+            ]
+        )
+        == 4
+    )
+
+
+def test_copySubroutine():
+    localSlot = ScratchSlot()
+    globalSlot = ScratchSlot()
+    label = LabelReference("l1")
+    ops = [
+        TealOp(None, Op.store, localSlot),
+        TealOp(None, Op.load, localSlot),
+        TealOp(None, Op.bnz, label),
+        TealOp(None, Op.load, globalSlot),
+        TealOp(None, Op.retsub),
+        TealLabel(None, label),
+        TealOp(None, Op.load, localSlot),
+        TealOp(None, Op.retsub),
+    ]
+
+    actual = copySubroutine(ops, {localSlot}, 5)
+
+    newSlot = actual[0].args[0]
+    assert newSlot is not localSlot
+
+    expected = [
+        TealOp(None, Op.store, newSlot),
+        TealOp(None, Op.load, newSlot),
+        TealOp(None, Op.bnz, LabelReference("l5")),
+        TealOp(None, Op.load, globalSlot),
+        TealOp(None, Op.b, LabelReference("l6")),
+        TealLabel(None, LabelReference("l5")),
+        TealOp(None, Op.load, newSlot),
+        TealLabel(None, LabelReference("l6")),
+    ]
+    assert actual == expected
+
+    # the original ops are not modified
+    assert ops[0].args[0] is localSlot
+    assert ops[2].args[0] is label and label.getLabel() == "l1"
+
+
+def test_inlineSubroutines():
+    def subImpl(a):
+        return None
+
+    small = SubroutineDefinition(subImpl, TealType.uint64)
+    forbidden = SubroutineDefinition(subImpl, TealType.uint64, inline=False)
+    recursive = SubroutineDefinition(subImpl, TealType.uint64)
+
+    smallSlot = ScratchSlot()
+    forbiddenSlot = ScratchSlot()
+    smallOps = [
+        TealOp(None, Op.store, smallSlot),
+        TealOp(None, Op.load, smallSlot),
+        TealOp(None, Op.retsub),
+    ]
+    forbiddenOps = [
+        TealOp(None, Op.store, forbiddenSlot),
+        TealOp(None, Op.load, forbiddenSlot),
+        TealOp(None, Op.retsub),
+    ]
+    recursiveOps = [
+        TealOp(None, Op.callsub, recursive),
+        TealOp(None, Op.callsub, small),
+        TealOp(None, Op.retsub),
+    ]
+
+    subroutineMapping = {
+        None: [
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.callsub, small),
+            TealOp(None, Op.callsub, forbidden),
+            TealOp(None, Op.callsub, recursive),
+            TealOp(None, Op.return_),
+        ],
+        small: smallOps,
+        forbidden: forbiddenOps,
+        recursive: recursiveOps,
+    }
+    subroutineGraph = {
+        small: set(),
+        forbidden: set(),
+        recursive: {recursive, small},
+    }
+
+    assert inlineSubroutines(subroutineMapping, subroutineGraph, True) == 2
+
+    assert list(subroutineMapping.keys()) == [None, forbidden, recursive]
+    assert subroutineGraph == {forbidden: set(), recursive: {recursive}}
+
+    mainSlot = subroutineMapping[None][1].args[0]
+    recursiveSlot = subroutineMapping[recursive][1].args[0]
+    # each copy uses its own slot
+    assert len({mainSlot, recursiveSlot, smallSlot}) == 3
+
+    assert subroutineMapping[None] == [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, mainSlot),
+        TealOp(None, Op.load, mainSlot),
+        TealOp(None, Op.callsub, forbidden),
+        TealOp(None, Op.callsub, recursive),
+        TealOp(None, Op.return_),
+    ]
+    assert subroutineMapping[recursive] == [
+        TealOp(None, Op.callsub, recursive),
+        TealOp(None, Op.store, recursiveSlot),
+        TealOp(None, Op.load, recursiveSlot),
+        TealOp(None, Op.retsub),
+    ]
+    assert subroutineMapping[forbidden] == forbiddenOps
+
+    # without the heuristic, only forced subroutines are inlined
+    subroutineMapping = {
+        None: [TealOp(None, Op.callsub, small), TealOp(None, Op.return_)],
+        small: smallOps,
+    }
+    subroutineGraph = {small: set()}
+    assert inlineSubroutines(subroutineMapping, subroutineGraph, False) == 0
+    assert list(subroutineMapping.keys()) == [None, small]
+
+
+def test_inlineSubroutines_recursive_forced():
+    def subImpl(a):
+        return None
+
+    recursive = SubroutineDefinition(subImpl, TealType.uint64, inline=True)
+    subroutineMapping = {
+        None: [TealOp(None, Op.callsub, recursive), TealOp(None, Op.return_)],
+        recursive: [TealOp(None, Op.callsub, recursive), TealOp(None, Op.retsub)],
+    }
+    subroutineGraph = {recursive: {recursive}}
+
+    with pytest.raises(TealInputError):
+        inlineSubroutines(subroutineMapping, subroutineGraph, False)
@@ -0,0 +1,274 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from ...ast import ScratchSlot
+from ...ir import Op, TealOp, TealLabel, TealComponent, LabelReference
+from .cse import isPure, findExpression
+from .dominance import findBasicBlocks, findDominators
+from .inline import nextLabelIndex
+from .liveness import findSuccessors
+
+# Ops which cannot fail when their arguments have the types PyTeal requires for them.
+safeOps = {
+    Op.int,
+    Op.byte,
+    Op.addr,
+    Op.method_signature,
+    Op.pushint,
+    Op.pushbytes,
+    Op.txn,
+    Op.global_,
+    Op.load,
+    Op.app_global_get,
+    Op.sha256,
+    Op.keccak256,
+    Op.sha512_256,
+    Op.sqrt,
+    Op.bitlen,
+    Op.lt,
+    Op.gt,
+    Op.le,
+    Op.ge,
+    Op.eq,
+    Op.neq,
+    Op.logic_and,
+    Op.logic_or,
+    Op.logic_not,
+    Op.bitwise_and,
+    Op.bitwise_or,
+    Op.bitwise_xor,
+    Op.bitwise_not,
+    Op.len,
+    Op.itob,
+}
+
+# Ops which read values whose type is only known at runtime.
+untypedOps = (Op.load, Op.app_global_get)
+
+# A loop, as the index of its header block and the set of indexes of the blocks it contains.
+Loop = Tuple[int, Set[int]]
+
+
+def findLoops(ops: List[TealComponent]) -> List[Loop]:
+    """Find the natural loops of a flattened subroutine.
+
+    A loop is formed by every branch to a block which dominates the branch, called a back edge.
+    Back edges to the same block form a single loop.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+
+    Returns:
+        A list of loops, where each loop is a tuple of the index of its header block and the set of
+        indexes of the blocks in its body, including the header. Block indexes refer to the list
+        returned by findBasicBlocks. Inner loops come before the loops which contain them.
+    """
+    blocks = findBasicBlocks(ops)
+    successors = findSuccessors(ops)
+    blockOf, dominators = findDominators(ops)
+
+    predecessors: List[Set[int]] = [set() for _ in blocks]
+    for index, (_, end) in enumerate(blocks):
+        for successor in successors[end - 1]:
+            predecessors[blockOf[successor]].add(index)
+
+    bodies: Dict[int, Set[int]] = dict()
+    for index, (_, end) in enumerate(blocks):
+        for successor in successors[end - 1]:
+            header = blockOf[successor]
+            if header not in dominators[index]:
+                continue
+            # the body is every block which can reach the back edge without passing the header
+            body = bodies.setdefault(header, {header})
+            stack = [index]
+            while len(stack) != 0:
+                block = stack.pop()
+                if block in body:
+                    continue
+                body.add(block)
+                stack += predecessors[block]
+
+    return sorted(bodies.items(), key=lambda loop: len(loop[1]))
+
+
+def hoistInvariants(ops: List[TealComponent], loop: Loop) -> Optional[int]:
+    """Move the invariant expressions of a loop before the loop.
+
+    Returns:
+        The number of expressions which were moved, or None if the loop has no place before its
+        header where they can be computed.
+    """
+    header, body = loop
+    blocks = findBasicBlocks(ops)
+    successors = findSuccessors(ops)
+    blockOf = [0 for _ in ops]
+    for index, (start, end) in enumerate(blocks):
+        for i in range(start, end):
+            blockOf[i] = index
+
+    headerStart = blocks[header][0]
+    headerLabel = ops[headerStart]
+    # the branches into the loop from outside of it
+    entries = [
+        i
+        for i, stmt in enumerate(ops)
+        if isinstance(stmt, TealOp)
+        and stmt.getOp() in (Op.b, Op.bz, Op.bnz)
+        and blockOf[i] not in body
+        and isinstance(headerLabel, TealLabel)
+        and stmt.args[0] == headerLabel.getLabelRef()
+    ]
+
+    # the new code is placed right before the header, unless the loop falls through to it
+    insertAt = headerStart
+    if (
+        headerStart > 0
+        and blockOf[headerStart - 1] in body
+        and headerStart in successors[headerStart - 1]
+    ):
+        if len(entries) != 1 or ops[entries[0]].getOp() != Op.b:  # type: ignore
+            # there is no single place to compute them once
+            return None
+        insertAt = entries[0]
+        entries = []
+
+    loopOps = [
+        stmt
+        for index in body
+        for stmt in ops[blocks[index][0] : blocks[index][1]]
+        if isinstance(stmt, TealOp)
+    ]
+    storedSlots = set(stmt.args[0] for stmt in loopOps if stmt.getOp() == Op.store)
+    loopOpcodes = set(stmt.getOp() for stmt in loopOps)
+    callsSubroutines = Op.callsub in loopOpcodes
+    slotsChange = callsSubroutines or Op.stores in loopOpcodes
+    globalsChange = callsSubroutines or bool(
+        loopOpcodes & {Op.app_global_put, Op.app_global_del}
+    )
+    localsChange = callsSubroutines or bool(
+        loopOpcodes & {Op.app_local_put, Op.app_local_del}
+    )
+
+    def isInvariant(stmt: TealComponent) -> bool:
+        if isPure(stmt):
+            return True
+        if not isinstance(stmt, TealOp):
+            return False
+        op = stmt.getOp()
+        if op == Op.load:
+            return not slotsChange and stmt.args[0] not in storedSlots
+        if op == Op.app_global_get:
+            return not globalsChange
+        if op == Op.app_local_get:
+            return not localsChange
+        return False
+
+    def isSafe(span: List[TealOp]) -> bool:
+        # the root's result is only stored, so its type does not matter
+        return all(stmt.getOp() in safeOps for stmt in span) and all(
+            stmt.getOp() not in untypedOps for stmt in span[:-1]
+        )
+
+    # the start and end index of each invariant expression, keyed by its ops
+    spans: Dict[Tuple[Tuple, ...], List[Tuple[int, int]]] = dict()
+    for index in sorted(body):
+        blockStart, blockEnd = blocks[index]
+        end = blockEnd - 1
+        while end >= blockStart:
+            spanStart = findExpression(ops, end, isInvariant)
+            if spanStart is None or spanStart == end:
+                end -= 1
+                continue
+            span: List[TealOp] = ops[spanStart : end + 1]  # type: ignore
+            # every op of the header runs whenever the loop is entered, so its expressions would
+            # fail there anyway, but other blocks may not run at all
+            if index != header and not isSafe(span):
+                end -= 1
+                continue
+            key = tuple((stmt.getOp(),) + tuple(stmt.args) for stmt in span)
+            spans.setdefault(key, []).append((spanStart, end))
+            end = spanStart - 1
+
+    if len(spans) == 0:
+        return 0
+
+    preheader: List[TealComponent] = []
+    replacements: Dict[int, Tuple[int, TealOp]] = dict()
+    for key, occurrences in sorted(
+        spans.items(), key=lambda item: min(start for start, _ in item[1])
+    ):
+        slot = ScratchSlot()
+        start, end = occurrences[0]
+        preheader += [
+            TealOp(stmt.expr, stmt.getOp(), *stmt.args)  # type: ignore
+            for stmt in ops[start : end + 1]
+        ]
+        preheader.append(TealOp(ops[end].expr, Op.store, slot))
+        for start, end in occurrences:
+            replacements[start] = (end, TealOp(ops[end].expr, Op.load, slot))
+
+    entryLabel: Optional[LabelReference] = None
+    if len(entries) != 0:
+        # branches into the loop from outside of it must run the new code as well
+        entryLabel = LabelReference("l{}".format(nextLabelIndex(ops)))
+        preheader.insert(0, TealLabel(None, entryLabel))
+
+    newOps: List[TealComponent] = []
+    i = 0
+    while i < len(ops):
+        stmt = ops[i]
+        if i == insertAt:
+            newOps += preheader
+        if i in replacements:
+            end, load = replacements[i]
+            newOps.append(load)
+            i = end + 1
+            continue
+        if entryLabel is not None and i in entries:
+            stmt = TealOp(stmt.expr, stmt.getOp(), entryLabel)  # type: ignore
+        newOps.append(stmt)
+        i += 1
+
+    ops[:] = newOps
+    return len(spans)
+
+
+def hoistLoopInvariants(ops: List[TealComponent]) -> int:
+    """Compute invariant expressions of each loop in a subroutine once, before the loop.
+
+    An expression is invariant in a loop if it is pure, or reads a scratch slot or application
+    state which no op in the loop can write, and if every value it uses is invariant as well. Such
+    an expression is computed before the loop and stored in a new scratch slot, and each computation
+    of it in the loop is replaced with a load. Only expressions of more than one op are moved, since
+    a load costs as much as a single op.
+
+    Since the expression is computed even if the loop never reaches it, expressions outside of the
+    loop's header, i.e. the start of its condition, are only moved if they cannot fail.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks. This list will be modified in place.
+
+    Returns:
+        The number of expressions which were moved out of loops.
+    """
+    hoisted = 0
+    # loops whose invariants were already moved, by the first op of their header
+    done: Set[int] = set()
+    while True:
+        blocks = findBasicBlocks(ops)
+        loop = next(
+            (
+                loop
+                for loop in findLoops(ops)
+                if id(ops[blocks[loop[0]][0]]) not in done
+            ),
+            None,
+        )
+        if loop is None:
+            return hoisted
+        headerStmt = ops[blocks[loop[0]][0]]
+        count = hoistInvariants(ops, loop)
+        done.add(id(headerStmt))
+        if count is not None:
+            hoisted += count
@@ -0,0 +1,261 @@
+from ... import *
+
+from .invariant import findLoops, hoistInvariants, hoistLoopInvariants
+
+
+def test_findLoops():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    l3 = LabelReference("l3")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bz, l3),
+        TealLabel(None, l2),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.bnz, l2),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l3),
+        TealOp(None, Op.return_),
+    ]
+
+    # the inner loop comes first
+    assert findLoops(ops) == [(2, {2}), (1, {1, 2, 3})]
+
+    assert findLoops([TealOp(None, Op.int, 1), TealOp(None, Op.return_)]) == []
+
+
+def test_hoistLoopInvariants():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    counter = ScratchSlot()
+    ops = [
+        TealOp(None, Op.int, 0),
+        TealOp(None, Op.store, counter),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, counter),
+        TealOp(None, Op.global_, "GroupSize"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.lt),
+        TealOp(None, Op.bz, l2),
+        TealOp(None, Op.byte, '"cfg"'),
+        TealOp(None, Op.app_global_get),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.load, counter),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.add),
+        TealOp(None, Op.store, counter),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l2),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.return_),
+    ]
+
+    assert hoistLoopInvariants(ops) == 2
+
+    slot1 = ops[5].args[0]
+    slot2 = ops[8].args[0]
+    assert ops == [
+        TealOp(None, Op.int, 0),
+        TealOp(None, Op.store, counter),
+        TealOp(None, Op.global_, "GroupSize"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.store, slot1),
+        TealOp(None, Op.byte, '"cfg"'),
+        TealOp(None, Op.app_global_get),
+        TealOp(None, Op.store, slot2),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, counter),
+        TealOp(None, Op.load, slot1),
+        TealOp(None, Op.lt),
+        TealOp(None, Op.bz, l2),
+        TealOp(None, Op.load, slot2),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.load, counter),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.add),
+        TealOp(None, Op.store, counter),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l2),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.return_),
+    ]
+    assert slot1 != slot2
+
+
+def test_hoistLoopInvariants_may_fail():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    counter = ScratchSlot()
+
+    def argLength(index):
+        return [
+            TealOp(None, Op.txna, "ApplicationArgs", index),
+            TealOp(None, Op.len),
+        ]
+
+    ops = (
+        [TealLabel(None, l1), TealOp(None, Op.load, counter)]
+        + argLength(0)
+        + [TealOp(None, Op.gt), TealOp(None, Op.bz, l2)]
+        + argLength(1)
+        + [TealOp(None, Op.store, counter), TealOp(None, Op.b, l1)]
+        + [TealLabel(None, l2), TealOp(None, Op.int, 1), TealOp(None, Op.return_)]
+    )
+
+    # the condition runs whenever the loop is entered, but the body may not run at all
+    assert hoistLoopInvariants(ops) == 1
+    slot = ops[2].args[0]
+    assert ops[:3] == argLength(0) + [TealOp(None, Op.store, slot)]
+    assert argLength(1) == ops[8:10]
+
+
+def test_hoistLoopInvariants_state_writes():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    written = ScratchSlot()
+    unwritten = ScratchSlot()
+
+    def loop(write):
+        return (
+            [
+                TealLabel(None, l1),
+                TealOp(None, Op.load, written),
+                TealOp(None, Op.int, 2),
+                TealOp(None, Op.mul),
+                TealOp(None, Op.load, unwritten),
+                TealOp(None, Op.int, 2),
+                TealOp(None, Op.mul),
+                TealOp(None, Op.lt),
+                TealOp(None, Op.bz, l2),
+                TealOp(None, Op.byte, '"cfg"'),
+                TealOp(None, Op.app_global_get),
+                TealOp(None, Op.store, written),
+            ]
+            + write
+            + [
+                TealOp(None, Op.b, l1),
+                TealLabel(None, l2),
+                TealOp(None, Op.int, 1),
+                TealOp(None, Op.return_),
+            ]
+        )
+
+    ops = loop([])
+    assert hoistLoopInvariants(ops) == 2
+
+    ops = loop(
+        [
+            TealOp(None, Op.byte, '"cfg"'),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.app_global_put),
+        ]
+    )
+    assert hoistLoopInvariants(ops) == 1
+    # only load unwritten; int 2; * is moved
+    assert ops[0] == TealOp(None, Op.load, unwritten)
+
+    def subImpl():
+        return None
+
+    sub = SubroutineDefinition(subImpl, TealType.none)
+
+    # a subroutine may write any slot or state
+    ops = loop([TealOp(None, Op.callsub, sub)])
+    original = list(ops)
+    assert hoistLoopInvariants(ops) == 0
+    assert ops == original
+
+    ops = loop([TealOp(None, Op.int, 3), TealOp(None, Op.stores)])
+    assert hoistLoopInvariants(ops) == 1
+    assert ops[0] == TealOp(None, Op.byte, '"cfg"')
+
+
+def test_hoistLoopInvariants_entry_branch():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    l3 = LabelReference("l3")
+    ops = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.return_),
+        TealLabel(None, l1),
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.mul),
+        TealOp(None, Op.bz, l3),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l3),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.return_),
+    ]
+
+    assert hoistLoopInvariants(ops) == 1
+
+    # the branch into the loop goes through the new code, but the back edge does not
+    entry = ops[1].args[0]
+    slot = ops[8].args[0]
+    assert entry != l1
+    assert ops[4:11] == [
+        TealLabel(None, entry),
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.mul),
+        TealOp(None, Op.store, slot),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, slot),
+    ]
+    assert ops[12] == TealOp(None, Op.b, l1)
+
+
+def test_hoistInvariants_header_fall_through():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    l3 = LabelReference("l3")
+
+    def loop(entry):
+        # the loop body is placed before its header
+        return entry + [
+            TealLabel(None, l1),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.pop),
+            TealLabel(None, l2),
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.int, 2),
+            TealOp(None, Op.mul),
+            TealOp(None, Op.bnz, l1),
+            TealLabel(None, l3),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.return_),
+        ]
+
+    # the new code is computed before the jump into the loop
+    ops = loop([TealOp(None, Op.b, l2)])
+    assert hoistLoopInvariants(ops) == 1
+    slot = ops[3].args[0]
+    assert ops[:9] == [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.mul),
+        TealOp(None, Op.store, slot),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.pop),
+        TealLabel(None, l2),
+    ]
+
+    ops = loop(
+        [
+            TealOp(None, Op.txn, "Amount"),
+            TealOp(None, Op.bnz, l2),
+            TealOp(None, Op.b, l2),
+        ]
+    )
+    loops = findLoops(ops)
+    assert len(loops) == 1
+    assert hoistInvariants(ops, loops[0]) is None
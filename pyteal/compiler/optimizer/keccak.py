@@ -0,0 +1,95 @@
+from typing import List
+
+# A minimal pure Python implementation of the original Keccak-256 hash function, as used by the
+# keccak256 TEAL opcode. This is not the same as SHA3-256 from hashlib, which uses different
+# padding, so it is vendored here in order to evaluate keccak256 at compile time.
+
+# fmt: off
+ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+
+# rotation offsets for each lane, indexed by [x][y]
+ROTATION_OFFSETS = [
+    [ 0, 36,  3, 41, 18],
+    [ 1, 44, 10, 45,  2],
+    [62,  6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39,  8, 14],
+]
+# fmt: on
+
+LANE_MASK = 2 ** 64 - 1
+
+# the rate of Keccak-256 in bytes, i.e. (1600 - 2 * 256) / 8
+RATE = 136
+
+
+def rotateLeft(value: int, amount: int) -> int:
+    amount %= 64
+    return ((value << amount) | (value >> (64 - amount))) & LANE_MASK
+
+
+def keccakPermutation(state: List[List[int]]) -> List[List[int]]:
+    """Apply the Keccak-f[1600] permutation to a state, indexed by [x][y]."""
+    for roundConstant in ROUND_CONSTANTS:
+        # theta step
+        columns = [
+            state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4]
+            for x in range(5)
+        ]
+        for x in range(5):
+            d = columns[(x - 1) % 5] ^ rotateLeft(columns[(x + 1) % 5], 1)
+            for y in range(5):
+                state[x][y] ^= d
+
+        # rho and pi steps
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = rotateLeft(
+                    state[x][y], ROTATION_OFFSETS[x][y]
+                )
+
+        # chi step
+        for x in range(5):
+            for y in range(5):
+                state[x][y] = b[x][y] ^ (
+                    (~b[(x + 1) % 5][y] & LANE_MASK) & b[(x + 2) % 5][y]
+                )
+
+        # iota step
+        state[0][0] ^= roundConstant
+
+    return state
+
+
+def keccak256(data: bytes) -> bytes:
+    """Compute the Keccak-256 digest of a byte string.
+
+    Args:
+        data: The bytes to hash.
+
+    Returns:
+        The 32 byte digest of data.
+    """
+    padded = bytearray(data)
+    padded.append(0x01)
+    while len(padded) % RATE != 0:
+        padded.append(0x00)
+    padded[-1] |= 0x80
+
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(padded), RATE):
+        for i in range(RATE // 8):
+            lane = int.from_bytes(padded[offset + 8 * i : offset + 8 * i + 8], "little")
+            state[i % 5][i // 5] ^= lane
+        state = keccakPermutation(state)
+
+    digest = b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+    return digest
@@ -0,0 +1,29 @@
+from .keccak import keccak256
+
+
+def test_keccak256():
+    tests = [
+        (b"", "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"),
+        (b"abc", "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45"),
+        (
+            b"The quick brown fox jumps over the lazy dog",
+            "4d741b6f1eb29cb2a9b9911c82f56fa8d73b04959d3d9d222895df6c0b28aa15",
+        ),
+    ]
+
+    for data, expected in tests:
+        assert keccak256(data).hex() == expected
+
+
+def test_keccak256_multiple_blocks():
+    # 136 bytes is the rate of Keccak-256, so these inputs span block boundaries
+    tests = [
+        (135, "cbdfd9dee5faad3818d6b06f95a219fd290b0e1706f6a82e5a595b9ce9faca62"),
+        (136, "7ce759f1ab7f9ce437719970c26b0a66ff11fe3e38e17df89cf5d29c7d7f807e"),
+        (137, "ac73d4fae68b8453f764007c1a20ce95994187861f0c3227a3a8e99a73a3b1db"),
+        (300, "4699841dafd5e26cca72b05a41d38c96b4b468e5a6cbf694cbebe77dacdf6528"),
+    ]
+
+    for length, expected in tests:
+        data = bytes(i % 251 for i in range(length))
+        assert keccak256(data).hex() == expected
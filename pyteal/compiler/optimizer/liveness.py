@@ -0,0 +1,114 @@
+from typing import Dict, Hashable, List, Set
+
+from ...ir import Op, TealOp, TealLabel, TealComponent
+from ...errors import TealInternalError
+
+# Ops which access scratch slots whose IDs are only known at runtime.
+dynamicSlotOps = (Op.loads, Op.stores)
+
+
+def findSuccessors(ops: List[TealComponent]) -> List[List[int]]:
+    """Find the control flow successors of each component in a flattened subroutine.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+
+    Returns:
+        A list the same length as ops, where each element is a list of the indexes of the
+        components that may execute immediately after the component at that index.
+    """
+    labelIndexes: Dict[str, int] = dict()
+    for i, stmt in enumerate(ops):
+        if isinstance(stmt, TealLabel):
+            labelIndexes[stmt.getLabelRef().getLabel()] = i
+
+    def labelIndex(stmt: TealOp) -> int:
+        label = stmt.args[0].getLabel()  # type: ignore
+        if label not in labelIndexes:
+            raise TealInternalError("Branch to unknown label: {}".format(label))
+        return labelIndexes[label]
+
+    successors: List[List[int]] = []
+    for i, stmt in enumerate(ops):
+        following = [i + 1] if i + 1 < len(ops) else []
+
+        if not isinstance(stmt, TealOp):
+            successors.append(following)
+            continue
+
+        op = stmt.getOp()
+        if op in (Op.return_, Op.retsub, Op.err):
+            successors.append([])
+        elif op == Op.b:
+            successors.append([labelIndex(stmt)])
+        elif op in (Op.bz, Op.bnz):
+            successors.append(following + [labelIndex(stmt)])
+        else:
+            successors.append(following)
+
+    return successors
+
+
+def slotUses(stmt: TealComponent) -> Set[Hashable]:
+    """Get the scratch slots whose values are read by a component."""
+    if isinstance(stmt, TealOp) and stmt.getOp() == Op.load:
+        return {stmt.args[0]}
+    return set()
+
+
+def slotDefinitions(stmt: TealComponent) -> Set[Hashable]:
+    """Get the scratch slots whose values are overwritten by a component."""
+    if isinstance(stmt, TealOp) and stmt.getOp() == Op.store:
+        return {stmt.args[0]}
+    return set()
+
+
+def hasDynamicSlotAccess(ops: List[TealComponent]) -> bool:
+    """Check if any component accesses a scratch slot whose ID is only known at runtime.
+
+    Slot liveness cannot be determined for such code.
+    """
+    return any(
+        isinstance(stmt, TealOp) and stmt.getOp() in dynamicSlotOps for stmt in ops
+    )
+
+
+def findLiveSlots(ops: List[TealComponent]) -> List[Set[Hashable]]:
+    """Determine which scratch slots are live after each component in a flattened subroutine.
+
+    A slot is live at a point in the program if its current value may be loaded later on without
+    first being overwritten. Slots may be identified either by ScratchSlot objects, before slot IDs
+    are assigned, or by integer IDs afterwards.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+
+    Returns:
+        A list the same length as ops, where each element is the set of slots that are live
+        immediately after the component at that index executes.
+    """
+    successors = findSuccessors(ops)
+    uses = [slotUses(stmt) for stmt in ops]
+    definitions = [slotDefinitions(stmt) for stmt in ops]
+
+    liveIn: List[Set[Hashable]] = [set() for _ in ops]
+    liveOut: List[Set[Hashable]] = [set() for _ in ops]
+
+    changed = True
+    while changed:
+        changed = False
+        for i in reversed(range(len(ops))):
+            newLiveOut: Set[Hashable] = set()
+            for successor in successors[i]:
+                newLiveOut |= liveIn[successor]
+
+            newLiveIn = uses[i] | (newLiveOut - definitions[i])
+
+            if newLiveOut != liveOut[i] or newLiveIn != liveIn[i]:
+                liveOut[i] = newLiveOut
+                liveIn[i] = newLiveIn
+                changed = True
+
+    return liveOut
@@ -0,0 +1,99 @@
+import pytest
+
+from ... import *
+
+from .liveness import findSuccessors, findLiveSlots, hasDynamicSlotAccess
+
+
+def test_findSuccessors():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 3),
+        TealLabel(None, l2),
+        TealOp(None, Op.return_),
+        TealOp(None, Op.err),
+    ]
+
+    assert findSuccessors(ops) == [[1], [2, 4], [3], [6], [5], [6], [7], [], []]
+
+
+def test_findSuccessors_unknown_label():
+    ops = [TealOp(None, Op.b, LabelReference("l1"))]
+
+    with pytest.raises(TealInternalError):
+        findSuccessors(ops)
+
+
+def test_findLiveSlots_straight_line():
+    slot1 = ScratchSlot()
+    slot2 = ScratchSlot()
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, slot1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.store, slot2),
+        TealOp(None, Op.load, slot1),
+        TealOp(None, Op.load, slot2),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+
+    assert findLiveSlots(ops) == [
+        set(),
+        {slot1},
+        {slot1},
+        {slot1, slot2},
+        {slot2},
+        set(),
+        set(),
+        set(),
+    ]
+
+
+def test_findLiveSlots_loop():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.int, 0),
+        TealOp(None, Op.store, 0),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, 0),
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.lt),
+        TealOp(None, Op.bz, l2),
+        TealOp(None, Op.load, 0),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.add),
+        TealOp(None, Op.store, 0),
+        TealOp(None, Op.b, l1),
+        TealLabel(None, l2),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.return_),
+    ]
+
+    liveOut = findLiveSlots(ops)
+
+    # slot 0 is live around the entire loop, including the back edge
+    for i in range(1, 6):
+        assert liveOut[i] == {0}
+    assert liveOut[6] == {0}
+    assert liveOut[7] == set()
+    assert liveOut[10] == {0}
+    assert liveOut[11] == {0}
+    assert liveOut[12] == set()
+
+
+def test_hasDynamicSlotAccess():
+    assert not hasDynamicSlotAccess(
+        [TealOp(None, Op.load, 0), TealOp(None, Op.store, 1)]
+    )
+    assert hasDynamicSlotAccess([TealOp(None, Op.int, 0), TealOp(None, Op.loads)])
+    assert hasDynamicSlotAccess(
+        [TealOp(None, Op.int, 0), TealOp(None, Op.int, 0), TealOp(None, Op.stores)]
+    )
@@ -0,0 +1,178 @@
+from typing import Dict, List, Optional, Set
+
+from ...ast import MultiValue, ScratchSlot, SubroutineDefinition
+from ...ir import Op, TealOp, TealComponent
+from .liveness import hasDynamicSlotAccess
+from .stack import getStackEffect
+
+# Ops which may not execute in sequence with the ops that follow them.
+controlFlowOps = (Op.b, Op.bz, Op.bnz, Op.return_, Op.retsub, Op.err, Op.callsub)
+
+
+def isSlotOp(stmt: TealComponent, op: Op, slots: Set[ScratchSlot]) -> bool:
+    return isinstance(stmt, TealOp) and stmt.getOp() == op and stmt.args[0] in slots
+
+
+def findBalancedRun(ops: List[TealComponent], start: int, slot: ScratchSlot) -> int:
+    """Find the end of a run of ops which leaves the stack beneath it untouched.
+
+    Args:
+        ops: A list of TealComponents.
+        start: The index of the first op in the run.
+        slot: The slot which ends the run when it is loaded.
+
+    Returns:
+        The index of the load of slot which ends the run, or -1 if no such run exists. The ops in
+        the run execute in sequence, never access values which were on the stack before the run
+        began, and have no net effect on the height of the stack.
+    """
+    height = 0
+    for i in range(start, len(ops)):
+        stmt = ops[i]
+        if not isinstance(stmt, TealOp) or stmt.getOp() in controlFlowOps:
+            return -1
+
+        if height == 0 and stmt.getOp() == Op.load and stmt.args[0] is slot:
+            return i
+
+        effect = getStackEffect(stmt)
+        if effect is None:
+            return -1
+        pops, pushes = effect
+        if pops > height:
+            return -1
+        height += pushes - pops
+
+    return -1
+
+
+def keepOutputsOnStack(
+    ops: List[TealComponent],
+    candidates: Set[ScratchSlot],
+    loadCounts: Dict[ScratchSlot, int],
+    swapAvailable: bool,
+) -> List[TealComponent]:
+    """Remove stores of MultiValue outputs from a subroutine where the value can stay on the stack.
+
+    The following rewrites are repeated until none apply, where slot is a candidate slot:
+
+    * :code:`store slot` becomes :code:`pop` if slot is never loaded.
+    * :code:`store slot; ...; load slot` becomes :code:`...` if slot is loaded once, and the ops in
+      between execute in sequence and leave the rest of the stack untouched.
+    * :code:`store slot; op; load slot` becomes :code:`swap; op` if slot is loaded once and op pops
+      a single value without pushing anything, e.g. :code:`pop` or :code:`store`.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine).
+        candidates: The slots which may be removed. Each must be stored to exactly once in the
+            program.
+        loadCounts: The number of times each candidate slot is loaded in the program.
+        swapAvailable: Whether the swap op is available.
+
+    Returns:
+        The rewritten list of TealComponents.
+    """
+    ops = list(ops)
+
+    def removeDeadStore(i: int, slot: ScratchSlot) -> bool:
+        if loadCounts[slot] != 0:
+            return False
+        ops[i] = TealOp(ops[i].expr, Op.pop)
+        return True
+
+    def removeStoreAndLoad(i: int, slot: ScratchSlot) -> bool:
+        if loadCounts[slot] != 1:
+            return False
+        end = findBalancedRun(ops, i + 1, slot)
+        if end == -1:
+            return False
+        del ops[end]
+        del ops[i]
+        return True
+
+    def swapStoreAndLoad(i: int, slot: ScratchSlot) -> bool:
+        if (
+            not swapAvailable
+            or loadCounts[slot] != 1
+            or i + 2 >= len(ops)
+            or not isinstance(ops[i + 1], TealOp)
+            or ops[i + 1].getOp() in controlFlowOps  # type: ignore
+            or getStackEffect(ops[i + 1]) != (1, 0)  # type: ignore
+            or not isSlotOp(ops[i + 2], Op.load, {slot})
+        ):
+            return False
+        ops[i : i + 3] = [TealOp(ops[i].expr, Op.swap), ops[i + 1]]
+        return True
+
+    # the rewrites are tried in order of preference, since applying one may prevent another
+    rewrites = (removeDeadStore, removeStoreAndLoad, swapStoreAndLoad)
+
+    changed = True
+    while changed:
+        changed = False
+        for rewrite in rewrites:
+            for i, stmt in enumerate(ops):
+                if isSlotOp(stmt, Op.store, candidates) and rewrite(
+                    i, stmt.args[0]  # type: ignore
+                ):
+                    changed = True
+                    break
+            if changed:
+                break
+
+    return ops
+
+
+def keepMultiValuesOnStack(
+    subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
+    version: int,
+) -> int:
+    """Keep the outputs of MultiValue expressions, such as MaybeValue, on the stack when possible.
+
+    A MultiValue normally stores each of its outputs into a scratch slot. Outputs that are never
+    used are instead popped from the stack, and outputs that are used once, immediately after they
+    are produced, are never stored.
+
+    Args:
+        subroutineMapping: A mapping from subroutine to the list of TealComponents which make up
+            that subroutine. The key None is taken to mean the main program routine. The values of
+            this map will be modified in place.
+        version: The TEAL version being compiled.
+
+    Returns:
+        The number of ops that were removed from the program.
+    """
+    allOps = [stmt for ops in subroutineMapping.values() for stmt in ops]
+    if hasDynamicSlotAccess(allOps):
+        return 0
+
+    outputSlots: Set[ScratchSlot] = set()
+    for stmt in allOps:
+        if isinstance(stmt, TealOp) and isinstance(stmt.expr, MultiValue):
+            outputSlots |= set(stmt.expr.output_slots)
+
+    loadCounts: Dict[ScratchSlot, int] = {slot: 0 for slot in outputSlots}
+    storeCounts: Dict[ScratchSlot, int] = {slot: 0 for slot in outputSlots}
+    for stmt in allOps:
+        if isSlotOp(stmt, Op.load, outputSlots):
+            loadCounts[stmt.args[0]] += 1  # type: ignore
+        elif isSlotOp(stmt, Op.store, outputSlots):
+            storeCounts[stmt.args[0]] += 1  # type: ignore
+
+    candidates = set(
+        slot
+        for slot in outputSlots
+        if storeCounts[slot] == 1 and not slot.isReservedSlot
+    )
+    if len(candidates) == 0:
+        return 0
+
+    removed = 0
+    for subroutine, ops in subroutineMapping.items():
+        newOps = keepOutputsOnStack(
+            ops, candidates, loadCounts, version >= Op.swap.min_version
+        )
+        removed += len(ops) - len(newOps)
+        subroutineMapping[subroutine] = newOps
+
+    return removed
@@ -0,0 +1,177 @@
+from ... import *
+
+from .multivalue import findBalancedRun, keepOutputsOnStack, keepMultiValuesOnStack
+
+
+def test_findBalancedRun():
+    slot = ScratchSlot()
+    l1 = LabelReference("l1")
+
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.assert_),
+        TealOp(None, Op.load, slot),
+    ]
+    assert findBalancedRun(ops, 0, slot) == 2
+
+    # the value of slot is not at the top of the stack when it is loaded
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.load, slot),
+    ]
+    assert findBalancedRun(ops, 0, slot) == -1
+
+    # the run accesses a value from beneath it
+    ops = [
+        TealOp(None, Op.pop),
+        TealOp(None, Op.load, slot),
+    ]
+    assert findBalancedRun(ops, 0, slot) == -1
+
+    # the run does not execute in sequence
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, slot),
+    ]
+    assert findBalancedRun(ops, 0, slot) == -1
+
+
+def test_keepOutputsOnStack():
+    valueSlot = ScratchSlot()
+    okSlot = ScratchSlot()
+    candidates = {valueSlot, okSlot}
+
+    getOp = TealOp(None, Op.app_global_get_ex)
+
+    # only hasValue is used
+    ops = [
+        getOp,
+        TealOp(None, Op.store, okSlot),
+        TealOp(None, Op.store, valueSlot),
+        TealOp(None, Op.load, okSlot),
+        TealOp(None, Op.return_),
+    ]
+    loadCounts = {valueSlot: 0, okSlot: 1}
+    assert keepOutputsOnStack(ops, candidates, loadCounts, True) == [
+        getOp,
+        TealOp(None, Op.swap),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.return_),
+    ]
+    assert keepOutputsOnStack(ops, candidates, loadCounts, False) == [
+        getOp,
+        TealOp(None, Op.store, okSlot),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.load, okSlot),
+        TealOp(None, Op.return_),
+    ]
+
+    # only value is used
+    ops = [
+        getOp,
+        TealOp(None, Op.store, okSlot),
+        TealOp(None, Op.store, valueSlot),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.return_),
+    ]
+    loadCounts = {valueSlot: 1, okSlot: 0}
+    assert keepOutputsOnStack(ops, candidates, loadCounts, True) == [
+        getOp,
+        TealOp(None, Op.pop),
+        TealOp(None, Op.return_),
+    ]
+
+    # both are used in order
+    ops = [
+        getOp,
+        TealOp(None, Op.store, okSlot),
+        TealOp(None, Op.store, valueSlot),
+        TealOp(None, Op.load, okSlot),
+        TealOp(None, Op.assert_),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.return_),
+    ]
+    loadCounts = {valueSlot: 1, okSlot: 1}
+    assert keepOutputsOnStack(ops, candidates, loadCounts, True) == [
+        getOp,
+        TealOp(None, Op.assert_),
+        TealOp(None, Op.return_),
+    ]
+
+
+def test_keepOutputsOnStack_multiple_uses():
+    valueSlot = ScratchSlot()
+    okSlot = ScratchSlot()
+    candidates = {valueSlot, okSlot}
+    l1 = LabelReference("l1")
+
+    getOp = TealOp(None, Op.app_global_get_ex)
+
+    ops = [
+        getOp,
+        TealOp(None, Op.store, okSlot),
+        TealOp(None, Op.store, valueSlot),
+        TealOp(None, Op.load, okSlot),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.err),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+    loadCounts = {valueSlot: 2, okSlot: 1}
+
+    # hasValue stays on the stack, but value is used twice, so it must be stored
+    assert keepOutputsOnStack(ops, candidates, loadCounts, True) == [
+        getOp,
+        TealOp(None, Op.swap),
+        TealOp(None, Op.store, valueSlot),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.err),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.load, valueSlot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+
+
+def test_keepMultiValuesOnStack():
+    maybe = App.globalGetEx(Int(0), Bytes("key"))
+    program = Seq([maybe, maybe.value()])
+
+    ops = [
+        TealOp(maybe, Op.app_global_get_ex),
+        TealOp(None, Op.store, maybe.slotOk),
+        TealOp(None, Op.store, maybe.slotValue),
+        TealOp(None, Op.load, maybe.slotValue),
+        TealOp(None, Op.return_),
+    ]
+
+    # slots which are not the outputs of a MultiValue are ignored
+    otherSlot = ScratchSlot()
+    otherOps = [
+        TealOp(None, Op.store, otherSlot),
+        TealOp(None, Op.load, otherSlot),
+        TealOp(None, Op.retsub),
+    ]
+
+    def subImpl(a):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    subroutineMapping = {None: ops, subroutine: otherOps}
+
+    assert keepMultiValuesOnStack(subroutineMapping, 5) == 2
+    assert subroutineMapping == {
+        None: [
+            TealOp(maybe, Op.app_global_get_ex),
+            TealOp(None, Op.pop),
+            TealOp(None, Op.return_),
+        ],
+        subroutine: otherOps,
+    }
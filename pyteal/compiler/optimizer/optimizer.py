@@ -0,0 +1,168 @@
+from typing import Dict
+from collections import OrderedDict
+
+
+class OptimizeReport:
+    """A record of the optimizations that were performed while compiling a program."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = OrderedDict()
+
+    def record(self, name: str, count: int = 1) -> None:
+        """Record that an optimization was performed.
+
+        Args:
+            name: The name of the optimization, or of the specific rule within it.
+            count (optional): The number of times it was performed. Defaults to 1.
+        """
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def __getitem__(self, name: str) -> int:
+        return self.counts.get(name, 0)
+
+    def __str__(self) -> str:
+        return "\n".join(
+            "{}: {}".format(name, count) for name, count in self.counts.items()
+        )
+
+
+OptimizeReport.__module__ = "pyteal"
+
+
+class OptimizeOptions:
+    """An object which specifies the optimizations to be performed by the compiler.
+
+    All optimizations are disabled by default, in which case the compiler produces exactly the same
+    TEAL code as it would if no OptimizeOptions were provided.
+
+    After a program is compiled, the :code:`report` attribute of this object contains an
+    :any:`OptimizeReport` describing the optimizations that were performed on that program.
+    """
+
+    def __init__(
+        self,
+        *,
+        constantFolding: bool = False,
+        deadCode: bool = False,
+        slotReuse: bool = False,
+        stackArguments: bool = False,
+        multiValueStack: bool = False,
+        commonSubexpressions: bool = False,
+        blockLayout: bool = False,
+        shortCircuit: bool = False,
+        constantPacking: bool = False,
+        inlining: bool = False,
+        outlining: bool = False,
+        liveSlotSpilling: bool = False,
+        instructionSelection: bool = False,
+        strengthReduction: bool = False,
+        algebraicSimplification: bool = False,
+        loopInvariantMotion: bool = False,
+        loopRotation: bool = False,
+        loopUnrolling: int = 0,
+    ) -> None:
+        """Create a new OptimizeOptions object.
+
+        Args:
+            constantFolding (optional): When true, operations whose inputs are all constants known
+                at compile time, such as hashes of literal byte strings, are evaluated by the
+                compiler and replaced with their result. Defaults to false.
+            deadCode (optional): When true, expressions in a Seq that follow an expression which
+                always returns are not compiled, and blocks which can never be executed are removed
+                from the program. Defaults to false.
+            slotReuse (optional): When true, scratch slots that are only used by a single
+                subroutine (or the main program) and whose values are never needed at the same
+                time are assigned the same slot ID, which allows programs to use more than 256
+                ScratchSlots. Subroutines which never appear together on a call chain also share
+                slot IDs for such slots. Manually reserved slots are never shared. Defaults to
+                false.
+            stackArguments (optional): When true, non-recursive subroutines read their arguments
+                directly from the stack with dig and uncover, instead of storing them in scratch
+                slots, if that requires fewer ops. This only applies to TEAL version 5 and above.
+                Defaults to false.
+            multiValueStack (optional): When true, outputs of MultiValue expressions such as
+                MaybeValue are not stored in scratch slots if they are never used, or if they are
+                used once immediately after being produced. Defaults to false.
+            commonSubexpressions (optional): When true, pure expressions such as transaction
+                fields, arithmetic and hashes which are computed more than once on the same path
+                are computed once and stored in a scratch slot, if that uses less opcode budget.
+                Defaults to false.
+            blockLayout (optional): When true, the blocks of each subroutine are ordered so that
+                as many branches as possible fall through to the next block, favoring branches
+                inside loops, which reduces the number of unconditional jumps. Defaults to false.
+            shortCircuit (optional): When true, And and Or expressions skip their remaining
+                operands once their value is known, and the conditions of If, Cond, Assert and
+                While branch directly on each operand instead of on the combined value, if the
+                opcode budget that can be skipped outweighs the extra branches. Note that a skipped
+                operand cannot fail the program. Defaults to false.
+            constantPacking (optional): When true and constants are assembled, the constants stored
+                in the intcblock and bytecblock, and their order, are chosen to minimize the number
+                of bytes used by constants, based on the encoded size of each constant. Defaults to
+                false.
+            inlining (optional): When true, calls to non-recursive subroutines which are called
+                only once, or which are small enough that copying them barely increases the size
+                of the program, are replaced with a copy of the subroutine's code. Subroutines
+                defined with the inline option of :any:`Subroutine` are always or never inlined,
+                regardless of this option. Defaults to false.
+            outlining (optional): When true, sequences of ops which are repeated throughout the
+                program are moved into new subroutines, and each occurrence is replaced with a call
+                to it, if that makes the program smaller. Each call uses 2 more ops of opcode
+                budget. This only applies to TEAL version 4 and above. Defaults to false.
+            liveSlotSpilling (optional): When true, a recursive subroutine only saves the local
+                slots whose values are used after a call which may recurse, instead of all of its
+                local slots. In TEAL version 5 and above, long runs of consecutive slots are saved
+                with loops over loads and stores, which makes the program smaller but uses more
+                opcode budget. Defaults to false.
+            instructionSelection (optional): When true, common combinations of ops are replaced
+                with cheaper ops that compute the same result and are available in the TEAL
+                version being compiled, such as :code:`extract_uint64` in place of an
+                :code:`extract` followed by :code:`btoi`, or :code:`txna` in place of
+                :code:`txnas` with a constant index. Defaults to false.
+            strengthReduction (optional): When true, dividing by a power of two, taking the
+                remainder of dividing by a power of two, and raising to a small constant power use
+                shr, a bitwise and, or multiplications instead, if that is cheaper. Multiplying,
+                dividing or raising to the power of 1 is removed. Operations that fail on overflow
+                still do. Defaults to false.
+            algebraicSimplification (optional): When true, expressions are simplified with
+                algebraic rules before they are compiled, such as replacing :code:`Not(Not(x))`
+                with :code:`x` where only whether :code:`x` is zero matters,
+                :code:`Btoi(Itob(x))` with :code:`x`, and :code:`x == Int(0)` with
+                :code:`Not(x)`. Defaults to false.
+            loopInvariantMotion (optional): When true, expressions inside a loop whose value
+                cannot change between iterations, such as global state that the loop never
+                writes, are computed once before the loop and stored in a scratch slot. Defaults
+                to false.
+            loopRotation (optional): When true, the condition of a While or For loop is tested
+                once before the loop and again at the end of its body, which branches back to the
+                start of the body, so that each iteration uses one branch instead of two. The
+                condition's ops appear twice in the program. Defaults to false.
+            loopUnrolling (optional): The maximum number of iterations of a For loop which is
+                unrolled. A For loop whose counter is a ScratchVar with a constant start, a
+                constant bound and a constant step, and which its body never writes, is compiled to
+                a copy of its body for each iteration, with the counter replaced by its value in
+                that iteration, if it runs at most this many iterations. Defaults to 0, which
+                disables unrolling.
+        """
+        self.constantFolding = constantFolding
+        self.deadCode = deadCode
+        self.slotReuse = slotReuse
+        self.stackArguments = stackArguments
+        self.multiValueStack = multiValueStack
+        self.commonSubexpressions = commonSubexpressions
+        self.blockLayout = blockLayout
+        self.shortCircuit = shortCircuit
+        self.constantPacking = constantPacking
+        self.inlining = inlining
+        self.outlining = outlining
+        self.liveSlotSpilling = liveSlotSpilling
+        self.instructionSelection = instructionSelection
+        self.strengthReduction = strengthReduction
+        self.algebraicSimplification = algebraicSimplification
+        self.loopInvariantMotion = loopInvariantMotion
+        self.loopRotation = loopRotation
+        self.loopUnrolling = loopUnrolling
+
+        self.report = OptimizeReport()
+
+
+OptimizeOptions.__module__ = "pyteal"
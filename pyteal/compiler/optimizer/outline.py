@@ -0,0 +1,293 @@
+from inspect import Parameter, Signature
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from ...types import TealType
+from ...ast import ScratchSlot, SubroutineDefinition
+from ...errors import TealInternalError
+from ...ir import Op, TealOp, TealComponent
+from ..subroutines import findRecursionPoints
+from .stack import getStackEffect
+
+# Ops which may not execute in sequence with the ops that follow them, or which call other
+# subroutines.
+controlFlowOps = (Op.b, Op.bz, Op.bnz, Op.return_, Op.retsub, Op.err, Op.callsub)
+
+# The assembled size of a callsub op, which includes a 2 byte offset.
+CALLSUB_SIZE = 3
+
+
+def getOpSize(stmt: TealOp) -> int:
+    """Estimate the number of bytes an op occupies in an assembled program.
+
+    Each immediate argument is assumed to take 1 byte, and constants are assumed to be loaded from a
+    constant block with a 1 byte index.
+    """
+    if stmt.getOp() in (Op.int, Op.byte, Op.addr, Op.method_signature):
+        return 2
+    if stmt.getOp() in (Op.b, Op.bz, Op.bnz, Op.callsub):
+        return 3
+    return 1 + len(stmt.args)
+
+
+def getSequenceEffect(ops: List[TealOp]) -> Optional[Tuple[int, int]]:
+    """Get the stack effect of a sequence of ops which execute one after the other.
+
+    Returns:
+        A tuple of the number of values the sequence uses from the stack beneath it, and the number
+        of values it leaves in their place, or None if the stack effect of some op is not known.
+    """
+    needed = 0
+    height = 0
+    for stmt in ops:
+        effect = getStackEffect(stmt)
+        if effect is None:
+            return None
+        pops, pushes = effect
+        if pops > height:
+            needed += pops - height
+            height = pops
+        height += pushes - pops
+    return needed, height
+
+
+def buildSuffixArray(tokens: List[int]) -> List[int]:
+    """Sort the suffixes of a sequence of tokens.
+
+    Returns:
+        The starting index of each suffix, in lexicographic order of the suffixes.
+    """
+    n = len(tokens)
+    rank = list(tokens)
+    suffixes = list(range(n))
+    length = 1
+    while True:
+        key = lambda i: (rank[i], rank[i + length] if i + length < n else -1)
+        suffixes.sort(key=key)
+        newRank = [0] * n
+        for j in range(1, n):
+            newRank[suffixes[j]] = newRank[suffixes[j - 1]] + (
+                key(suffixes[j]) != key(suffixes[j - 1])
+            )
+        rank = newRank
+        if n == 0 or rank[suffixes[-1]] == n - 1:
+            return suffixes
+        length *= 2
+
+
+def buildLcpArray(tokens: List[int], suffixes: List[int]) -> List[int]:
+    """Find the length of the longest common prefix of each pair of adjacent suffixes.
+
+    Returns:
+        A list where the element at index i is the length of the longest common prefix of
+        suffixes[i - 1] and suffixes[i]. The first element is 0.
+    """
+    n = len(tokens)
+    rank = [0] * n
+    for i, suffix in enumerate(suffixes):
+        rank[suffix] = i
+
+    lcp = [0] * n
+    length = 0
+    for i in range(n):
+        if rank[i] == 0:
+            length = 0
+            continue
+        j = suffixes[rank[i] - 1]
+        while (
+            i + length < n
+            and j + length < n
+            and tokens[i + length] == tokens[j + length]
+        ):
+            length += 1
+        lcp[rank[i]] = length
+        if length > 0:
+            length -= 1
+    return lcp
+
+
+def findRepeats(suffixes: List[int], lcp: List[int]) -> Iterator[Tuple[int, List[int]]]:
+    """Find the repeated subsequences of a sequence of tokens.
+
+    Yields:
+        Tuples of a length and the starting indexes of every occurrence of a subsequence of that
+        length which occurs more than once. Every repeated subsequence is a prefix of one of the
+        yielded subsequences with the same occurrences, or with a subset of them.
+    """
+    # each entry is the lcp of an interval of suffixes and the index of its first suffix
+    stack: List[Tuple[int, int]] = [(0, 0)]
+    for i in range(1, len(suffixes) + 1):
+        current = lcp[i] if i < len(suffixes) else 0
+        left = i - 1
+        while current < stack[-1][0]:
+            length, left = stack.pop()
+            yield length, suffixes[left:i]
+        if current > stack[-1][0]:
+            stack.append((current, left))
+
+
+def createOutlinedSubroutine(numArgs: int, returnsValue: bool) -> SubroutineDefinition:
+    """Create a definition for a subroutine which is generated by the compiler."""
+
+    def implementation(*args):
+        raise TealInternalError("Outlined subroutines cannot be evaluated")
+
+    setattr(
+        implementation,
+        "__signature__",
+        Signature(
+            [
+                Parameter("arg{}".format(i), Parameter.POSITIONAL_ONLY)
+                for i in range(numArgs)
+            ]
+        ),
+    )
+
+    return SubroutineDefinition(
+        implementation,
+        TealType.anytype if returnsValue else TealType.none,
+        nameStr="outlined",
+    )
+
+
+def outlineRepeatedSequences(
+    subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+) -> Tuple[int, int]:
+    """Move sequences of ops which are repeated throughout a program into new subroutines.
+
+    Repeated sequences are found with a suffix array over the ops of every routine. A sequence may
+    be outlined if it executes in sequence, does not call a subroutine, and leaves at most one value
+    in place of the values it uses from the stack, since subroutines can access the entire stack.
+    The sequence which saves the most bytes is outlined first, and this is repeated until no
+    sequence saves any bytes. Each occurrence is replaced by a callsub, which costs 2 more ops of
+    opcode budget when it executes, so this only reduces the size of the program.
+
+    Recursive subroutines are never changed, since moving their local slots into other subroutines
+    would prevent the slots from being spilled during recursion. A sequence is also not outlined if
+    every reference to one of its slots would move into the new subroutine, since slots which are
+    local to a subroutine are not expected to keep their values between calls.
+
+    Args:
+        subroutineMapping: A mapping from subroutine to the list of TealComponents which make up
+            that subroutine. The key None is taken to mean the main program routine. The values of
+            this map will be modified, and new subroutines will be added to it.
+        subroutineGraph: A graph of subroutines. Each key is a subroutine (the main routine should
+            not be present), which represents a node in the graph. Each value is a set of all
+            subroutines that specific subroutine calls, which represent directional edges in the
+            graph. This will be modified to include the new subroutines.
+
+    Returns:
+        A tuple of the number of subroutines which were created, and the estimated number of bytes
+        this saved.
+    """
+    recursive = set(
+        subroutine
+        for subroutine, reentryPoints in findRecursionPoints(subroutineGraph).items()
+        if len(reentryPoints) != 0
+    )
+    routines = [
+        subroutine for subroutine in subroutineMapping if subroutine not in recursive
+    ]
+
+    created = 0
+    savedBytes = 0
+    while True:
+        slotReferences: Dict[ScratchSlot, int] = dict()
+        for ops in subroutineMapping.values():
+            for stmt in ops:
+                for slot in stmt.getSlots():
+                    slotReferences[slot] = slotReferences.get(slot, 0) + 1
+
+        # ops which cannot be outlined are given unique tokens, so that no sequence contains them
+        tokenIds: Dict[Hashable, int] = dict()
+        tokens: List[int] = []
+        locations: List[Tuple[Optional[SubroutineDefinition], int]] = []
+        nextUnique = -1
+        for routine in routines:
+            for index, stmt in enumerate(subroutineMapping[routine]):
+                if (
+                    isinstance(stmt, TealOp)
+                    and stmt.getOp() not in controlFlowOps
+                    and getStackEffect(stmt) is not None
+                ):
+                    key = (stmt.getOp(),) + tuple(
+                        ("slot", arg.id) if isinstance(arg, ScratchSlot) else arg
+                        for arg in stmt.args
+                    )
+                    tokens.append(tokenIds.setdefault(key, len(tokenIds)))
+                else:
+                    tokens.append(nextUnique)
+                    nextUnique -= 1
+                locations.append((routine, index))
+            tokens.append(nextUnique)
+            nextUnique -= 1
+            locations.append((routine, -1))
+
+        suffixes = buildSuffixArray(tokens)
+        lcp = buildLcpArray(tokens, suffixes)
+
+        best: Optional[Tuple[int, int, List[int]]] = None
+        for length, starts in findRepeats(suffixes, lcp):
+            first = starts[0]
+            sequence = [
+                subroutineMapping[locations[i][0]][locations[i][1]]
+                for i in range(first, first + length)
+            ]
+
+            # the longest prefix of the sequence which can be a subroutine
+            while length > 1:
+                effect = getSequenceEffect(sequence[:length])  # type: ignore
+                if effect is not None and effect[1] <= 1:
+                    break
+                length -= 1
+            if length <= 1:
+                continue
+
+            occurrences: List[int] = []
+            for start in sorted(starts):
+                if len(occurrences) == 0 or start >= occurrences[-1] + length:
+                    occurrences.append(start)
+
+            # A slot which is only referenced by the occurrences would become local to the new
+            # subroutine, even though its value may need to be preserved between calls.
+            sequenceReferences: Dict[ScratchSlot, int] = dict()
+            for stmt in sequence[:length]:
+                for slot in stmt.getSlots():
+                    sequenceReferences[slot] = sequenceReferences.get(slot, 0) + 1
+            if any(
+                count * len(occurrences) == slotReferences[slot]
+                for slot, count in sequenceReferences.items()
+            ):
+                continue
+
+            size = sum(getOpSize(stmt) for stmt in sequence[:length])  # type: ignore
+            # the subroutine contains the sequence and a retsub
+            savings = len(occurrences) * (size - CALLSUB_SIZE) - (size + 1)
+            if savings > 0 and (best is None or savings > best[0]):
+                best = (savings, length, occurrences)
+
+        if best is None:
+            return created, savedBytes
+
+        savings, length, occurrences = best
+        routine, index = locations[occurrences[0]]
+        body = subroutineMapping[routine][index : index + length]
+        numArgs, results = getSequenceEffect(body)  # type: ignore
+
+        subroutine = createOutlinedSubroutine(numArgs, results == 1)
+        subroutineMapping[subroutine] = [
+            TealOp(stmt.expr, stmt.getOp(), *stmt.args) for stmt in body  # type: ignore
+        ] + [TealOp(None, Op.retsub)]
+        subroutineGraph[subroutine] = set()
+
+        # replace occurrences from last to first, so that indexes remain valid
+        for start in reversed(occurrences):
+            routine, index = locations[start]
+            subroutineMapping[routine][index : index + length] = [
+                TealOp(None, Op.callsub, subroutine)
+            ]
+            if routine is not None:
+                subroutineGraph[routine].add(subroutine)
+
+        created += 1
+        savedBytes += savings
@@ -0,0 +1,313 @@
+import random
+
+from ... import *
+
+from .outline import (
+    getOpSize,
+    getSequenceEffect,
+    buildSuffixArray,
+    buildLcpArray,
+    findRepeats,
+    outlineRepeatedSequences,
+)
+
+
+def test_getOpSize():
+    assert getOpSize(TealOp(None, Op.int, 5)) == 2
+    assert getOpSize(TealOp(None, Op.byte, '"a"')) == 2
+    assert getOpSize(TealOp(None, Op.add)) == 1
+    assert getOpSize(TealOp(None, Op.txn, "Fee")) == 2
+    assert getOpSize(TealOp(None, Op.gtxn, 0, "Fee")) == 3
+    assert getOpSize(TealOp(None, Op.bnz, LabelReference("l1"))) == 3
+
+
+def test_getSequenceEffect():
+    assert getSequenceEffect([]) == (0, 0)
+    assert getSequenceEffect([TealOp(None, Op.int, 1)]) == (0, 1)
+    assert getSequenceEffect([TealOp(None, Op.int, 1), TealOp(None, Op.add)]) == (1, 1)
+    assert getSequenceEffect(
+        [TealOp(None, Op.add), TealOp(None, Op.int, 1), TealOp(None, Op.eq)]
+    ) == (2, 1)
+    assert getSequenceEffect([TealOp(None, Op.pop), TealOp(None, Op.pop)]) == (2, 0)
+    assert getSequenceEffect([TealOp(None, Op.loads)]) is not None
+
+
+def test_buildSuffixArray():
+    rng = random.Random(1)
+    for _ in range(100):
+        tokens = [rng.randrange(3) for _ in range(rng.randrange(20))]
+        expected = sorted(range(len(tokens)), key=lambda i: tokens[i:])
+        assert buildSuffixArray(tokens) == expected
+
+
+def test_buildLcpArray():
+    rng = random.Random(2)
+    for _ in range(100):
+        tokens = [rng.randrange(3) for _ in range(1 + rng.randrange(20))]
+        suffixes = buildSuffixArray(tokens)
+        lcp = buildLcpArray(tokens, suffixes)
+
+        assert lcp[0] == 0
+        for i in range(1, len(tokens)):
+            a = tokens[suffixes[i - 1] :]
+            b = tokens[suffixes[i] :]
+            length = 0
+            while length < min(len(a), len(b)) and a[length] == b[length]:
+                length += 1
+            assert lcp[i] == length
+
+
+def test_findRepeats():
+    tokens = [0, 1, 2, -1, 0, 1, 2, -2, 0, 1, -3]
+    suffixes = buildSuffixArray(tokens)
+    lcp = buildLcpArray(tokens, suffixes)
+
+    repeats = sorted(
+        (length, sorted(starts)) for length, starts in findRepeats(suffixes, lcp)
+    )
+    assert repeats == [
+        (1, [1, 5, 9]),
+        (1, [2, 6]),
+        (2, [0, 4, 8]),
+        (2, [1, 5]),
+        (3, [0, 4]),
+    ]
+
+
+def test_outlineRepeatedSequences():
+    def subImpl():
+        return None
+
+    sub = SubroutineDefinition(subImpl, TealType.none)
+
+    slot = ScratchSlot()
+
+    def sequence():
+        return [
+            TealOp(None, Op.txn, "Sender"),
+            TealOp(None, Op.global_, "CreatorAddress"),
+            TealOp(None, Op.eq),
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.int, 1000),
+            TealOp(None, Op.le),
+            TealOp(None, Op.logic_and),
+        ]
+
+    subroutineMapping = {
+        None: [TealOp(None, Op.store, slot)]
+        + sequence()
+        + [TealOp(None, Op.assert_)]
+        + sequence()
+        + [TealOp(None, Op.callsub, sub), TealOp(None, Op.return_)],
+        sub: sequence() + [TealOp(None, Op.pop), TealOp(None, Op.retsub)],
+    }
+    subroutineGraph = {sub: set()}
+
+    created, savedBytes = outlineRepeatedSequences(subroutineMapping, subroutineGraph)
+    assert created == 1
+    # 3 occurrences of 11 bytes each are replaced by 3 byte calls, and the subroutine uses 12 bytes
+    assert savedBytes == 3 * (11 - 3) - 12
+
+    outlined = next(s for s in subroutineMapping if s is not None and s is not sub)
+    assert outlined.argumentCount() == 0
+    assert outlined.returnType == TealType.anytype
+    assert subroutineMapping[outlined] == sequence() + [TealOp(None, Op.retsub)]
+
+    call = TealOp(None, Op.callsub, outlined)
+    assert subroutineMapping[None] == [
+        TealOp(None, Op.store, slot),
+        call,
+        TealOp(None, Op.assert_),
+        call,
+        TealOp(None, Op.callsub, sub),
+        TealOp(None, Op.return_),
+    ]
+    assert subroutineMapping[sub] == [
+        call,
+        TealOp(None, Op.pop),
+        TealOp(None, Op.retsub),
+    ]
+    assert subroutineGraph == {sub: {outlined}, outlined: set()}
+
+
+def test_outlineRepeatedSequences_arguments():
+    def sequence():
+        return [
+            TealOp(None, Op.int, 2),
+            TealOp(None, Op.mul),
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.add),
+            TealOp(None, Op.int, 3),
+            TealOp(None, Op.div),
+        ]
+
+    subroutineMapping = {
+        None: [TealOp(None, Op.int, 7)]
+        + sequence()
+        + sequence()
+        + sequence()
+        + [TealOp(None, Op.return_)],
+    }
+    subroutineGraph = {}
+
+    created, _ = outlineRepeatedSequences(subroutineMapping, subroutineGraph)
+    assert created == 1
+
+    outlined = next(s for s in subroutineMapping if s is not None)
+    assert outlined.argumentCount() == 1
+    assert outlined.returnType == TealType.anytype
+
+    call = TealOp(None, Op.callsub, outlined)
+    assert subroutineMapping[None] == [
+        TealOp(None, Op.int, 7),
+        call,
+        call,
+        call,
+        TealOp(None, Op.return_),
+    ]
+
+
+def test_outlineRepeatedSequences_unprofitable():
+    def sequence():
+        return [
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.int, 1000),
+            TealOp(None, Op.le),
+            TealOp(None, Op.assert_),
+        ]
+
+    ops = sequence() + sequence() + [TealOp(None, Op.int, 1), TealOp(None, Op.return_)]
+    subroutineMapping = {None: list(ops)}
+
+    # 2 occurrences of 6 bytes save 6 bytes, but the subroutine uses 7
+    assert outlineRepeatedSequences(subroutineMapping, {}) == (0, 0)
+    assert subroutineMapping == {None: ops}
+
+
+def test_outlineRepeatedSequences_control_flow():
+    label = LabelReference("l0")
+
+    def sequence():
+        return [
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.int, 1000),
+            TealOp(None, Op.le),
+        ]
+
+    ops = (
+        sequence()
+        + [TealLabel(None, label)]
+        + sequence()
+        + [TealOp(None, Op.bnz, label)]
+        + sequence()
+        + [TealOp(None, Op.return_)]
+    )
+    subroutineMapping = {None: list(ops)}
+
+    # 3 occurrences of 5 bytes save 6 bytes, but the subroutine uses 6
+    assert outlineRepeatedSequences(subroutineMapping, {}) == (0, 0)
+
+    ops = (
+        [TealOp(None, Op.int, 1), TealOp(None, Op.int, 2)] * 4
+        + [TealOp(None, Op.bnz, label), TealOp(None, Op.int, 1)]
+        + [TealOp(None, Op.int, 2), TealOp(None, Op.int, 1)] * 4
+        + [TealOp(None, Op.return_)]
+    )
+    subroutineMapping = {None: list(ops)}
+
+    # sequences which leave more than one value on the stack are not outlined
+    assert outlineRepeatedSequences(subroutineMapping, {}) == (0, 0)
+    assert subroutineMapping == {None: ops}
+
+
+def test_outlineRepeatedSequences_local_slot():
+    slot = ScratchSlot()
+
+    def sequence():
+        return [
+            TealOp(None, Op.load, slot),
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.add),
+            TealOp(None, Op.int, 100),
+            TealOp(None, Op.add),
+            TealOp(None, Op.store, slot),
+        ]
+
+    def separated(count):
+        ops = []
+        for i in range(count):
+            ops += sequence() + [TealLabel(None, LabelReference("l{}".format(i)))]
+        return ops
+
+    ops = separated(4) + [TealOp(None, Op.int, 1), TealOp(None, Op.return_)]
+    subroutineMapping = {None: list(ops)}
+
+    created, _ = outlineRepeatedSequences(subroutineMapping, {})
+    assert created == 1
+
+    # the value of slot must be preserved between calls, so it cannot only be used by the new
+    # subroutine
+    outlined = next(s for s in subroutineMapping if s is not None)
+    assert subroutineMapping[outlined] == sequence()[1:] + [TealOp(None, Op.retsub)]
+
+    ops = (
+        [TealOp(None, Op.int, 0), TealOp(None, Op.store, slot)]
+        + separated(4)
+        + [TealOp(None, Op.int, 1), TealOp(None, Op.return_)]
+    )
+    subroutineMapping = {None: list(ops)}
+
+    created, _ = outlineRepeatedSequences(subroutineMapping, {})
+    assert created == 1
+
+    outlined = next(s for s in subroutineMapping if s is not None)
+    assert subroutineMapping[outlined] == sequence() + [TealOp(None, Op.retsub)]
+
+
+def test_outlineRepeatedSequences_recursive():
+    def subImpl(a):
+        return None
+
+    recursive = SubroutineDefinition(subImpl, TealType.uint64)
+
+    def sequence():
+        return [
+            TealOp(None, Op.txn, "Sender"),
+            TealOp(None, Op.global_, "CreatorAddress"),
+            TealOp(None, Op.eq),
+            TealOp(None, Op.txn, "Fee"),
+            TealOp(None, Op.int, 1000),
+            TealOp(None, Op.le),
+            TealOp(None, Op.logic_and),
+        ]
+
+    mainOps = (
+        sequence()
+        + [TealOp(None, Op.callsub, recursive)]
+        + sequence()
+        + [TealOp(None, Op.return_)]
+    )
+    recursiveOps = (
+        sequence()
+        + sequence()
+        + [TealOp(None, Op.callsub, recursive), TealOp(None, Op.retsub)]
+    )
+    subroutineMapping = {None: list(mainOps), recursive: list(recursiveOps)}
+    subroutineGraph = {recursive: {recursive}}
+
+    # only the occurrences in the main routine are outlined
+    created, _ = outlineRepeatedSequences(subroutineMapping, subroutineGraph)
+    assert created == 1
+
+    outlined = next(
+        s for s in subroutineMapping if s is not None and s is not recursive
+    )
+    call = TealOp(None, Op.callsub, outlined)
+    assert subroutineMapping[None] == [
+        call,
+        TealOp(None, Op.callsub, recursive),
+        call,
+        TealOp(None, Op.return_),
+    ]
+    assert subroutineMapping[recursive] == recursiveOps
+    assert subroutineGraph == {recursive: {recursive}, outlined: set()}
@@ -0,0 +1,55 @@
+from typing import List, Set
+
+from ...ir import Op, TealBlock, TealSimpleBlock, TealConditionalBlock
+
+# Ops which end the execution of the current program or subroutine.
+terminalOps = (Op.return_, Op.retsub, Op.err)
+
+
+def removeUnreachableCode(start: TealBlock) -> int:
+    """Remove all code which can never be executed from a graph of blocks.
+
+    A block ends at its first op that exits the program or subroutine, so any ops after that op
+    are removed, along with the block's outgoing edges. Blocks which are then no longer reachable
+    from start are dropped from the graph.
+
+    This function modifies the graph in place and recalculates the incoming blocks of every block
+    that is still reachable.
+
+    Args:
+        start: The starting block of the graph.
+
+    Returns:
+        The number of ops that were removed.
+    """
+    opsBefore = sum(len(block.ops) for block in TealBlock.Iterate(start))
+
+    reachable: List[TealBlock] = []
+    visited: Set[int] = set()
+    queue: List[TealBlock] = [start]
+
+    while len(queue) != 0:
+        block = queue.pop(0)
+        if id(block) in visited:
+            continue
+        visited.add(id(block))
+        reachable.append(block)
+
+        for i, op in enumerate(block.ops):
+            if op.getOp() in terminalOps:
+                del block.ops[i + 1 :]
+                if isinstance(block, TealSimpleBlock):
+                    block.nextBlock = None
+                elif isinstance(block, TealConditionalBlock):
+                    block.trueBlock = None
+                    block.falseBlock = None
+                break
+
+        queue += block.getOutgoing()
+
+    for block in reachable:
+        block.incoming = []
+    start.addIncoming()
+
+    opsAfter = sum(len(block.ops) for block in reachable)
+    return opsBefore - opsAfter
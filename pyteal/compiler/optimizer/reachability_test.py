@@ -0,0 +1,65 @@
+from ... import *
+
+from .reachability import removeUnreachableCode
+
+
+def test_removeUnreachableCode_none():
+    blockTrue = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockFalse = TealSimpleBlock([TealOp(None, Op.int, 0), TealOp(None, Op.return_)])
+    block = TealConditionalBlock([TealOp(None, Op.txn, "Fee")])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    block.addIncoming()
+
+    assert removeUnreachableCode(block) == 0
+    assert block.getOutgoing() == [blockTrue, blockFalse]
+    assert blockTrue.incoming == [block]
+    assert blockFalse.incoming == [block]
+
+
+def test_removeUnreachableCode_ops_after_terminal():
+    for terminal in (Op.return_, Op.retsub, Op.err):
+        end = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.return_)])
+        block = TealSimpleBlock(
+            [TealOp(None, Op.int, 1), TealOp(None, terminal), TealOp(None, Op.pop)]
+        )
+        block.setNextBlock(end)
+        block.addIncoming()
+
+        assert removeUnreachableCode(block) == 3
+        assert block.ops == [TealOp(None, Op.int, 1), TealOp(None, terminal)]
+        assert block.getOutgoing() == []
+
+
+def test_removeUnreachableCode_conditional_block():
+    blockTrue = TealSimpleBlock([TealOp(None, Op.int, 1)])
+    blockFalse = TealSimpleBlock([TealOp(None, Op.int, 0)])
+    block = TealConditionalBlock([TealOp(None, Op.err), TealOp(None, Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    block.addIncoming()
+
+    assert removeUnreachableCode(block) == 3
+    assert block.ops == [TealOp(None, Op.err)]
+    assert block.getOutgoing() == []
+    assert block.isTerminal()
+
+
+def test_removeUnreachableCode_shared_successor():
+    # the join block is still reachable through the false branch, but its incoming blocks change
+    join = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockTrue = TealSimpleBlock([TealOp(None, Op.err)])
+    blockTrue.setNextBlock(join)
+    blockFalse = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.pop)])
+    blockFalse.setNextBlock(join)
+    block = TealConditionalBlock([TealOp(None, Op.txn, "Fee")])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    block.addIncoming()
+
+    assert len(join.incoming) == 2
+
+    assert removeUnreachableCode(block) == 0
+    assert blockTrue.getOutgoing() == []
+    assert join.incoming == [blockFalse]
+    block.validateTree()
@@ -0,0 +1,303 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...ir import Op, TealOp, TealBlock
+from ..constants import intConstantSize, extractIntValue
+from .cost import getOpCost
+from .folding import extractConstantValue
+from .outline import getOpSize
+from .stack import getStackEffect
+
+# A pattern is a tree of ops, written as a tuple of an op followed by patterns for each of its stack
+# arguments, or ANY, which matches any expression. Since TEAL ops are in postfix order, every ANY in
+# a pattern must come before all of its ops when the pattern is written in postfix order, so that the
+# ops matched by a pattern are contiguous.
+ANY = None
+Pattern = Optional[Tuple]
+
+# A function which is given the ops matched by a pattern, in order, and returns ops which compute
+# the same result from the same values matched by ANY, or None if it cannot replace them.
+Rewrite = Callable[[List[TealOp]], Optional[List[TealOp]]]
+
+# The ops which load a byte string of each length from a byte string and an offset on the stack,
+# and convert it to an integer.
+extractIntOps: Dict[int, Op] = {
+    1: Op.getbyte,
+    2: Op.extract_uint16,
+    4: Op.extract_uint32,
+    8: Op.extract_uint64,
+}
+
+
+def intValue(stmt: TealOp) -> Optional[int]:
+    """Get the value loaded by an int op, if it is known at compile time."""
+    value = extractConstantValue(stmt)
+    return value if type(value) is int else None
+
+
+def isImmediate(value: int) -> bool:
+    """Check if a value can be an immediate argument which is encoded in 1 byte."""
+    return 0 <= value < 2 ** 8
+
+
+def extractIntWithImmediates(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # btoi(extract S L (x)) or btoi(substring S E (x))
+    extractOp, btoiOp = matched
+    start, end = extractOp.args
+    length = end - start if extractOp.getOp() == Op.substring else end  # type: ignore
+    if length not in extractIntOps:
+        return None
+    return [
+        TealOp(extractOp.expr, Op.int, start),
+        TealOp(btoiOp.expr, extractIntOps[length]),  # type: ignore
+    ]
+
+
+def extractIntWithLength(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # btoi(extract3(x, s, int L))
+    lengthOp, _, btoiOp = matched
+    length = intValue(lengthOp)
+    if length not in extractIntOps:
+        return None
+    return [TealOp(btoiOp.expr, extractIntOps[length])]  # type: ignore
+
+
+def extractWithImmediates(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # extract3(x, int S, int L)
+    startOp, lengthOp, extractOp = matched
+    start, length = intValue(startOp), intValue(lengthOp)
+    if start is None or length is None:
+        return None
+    if not isImmediate(start) or not isImmediate(length) or length == 0:
+        # a length of 0 means the rest of the string to extract
+        return None
+    return [TealOp(extractOp.expr, Op.extract, start, length)]
+
+
+def substringWithImmediates(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # substring3(x, int S, int E)
+    startOp, endOp, substringOp = matched
+    start, end = intValue(startOp), intValue(endOp)
+    if start is None or end is None:
+        return None
+    if not isImmediate(start) or not isImmediate(end) or start > end:
+        return None
+    return [TealOp(substringOp.expr, Op.substring, start, end)]
+
+
+def substringAsExtract(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # substring3(x, int S, int E)
+    startOp, endOp, substringOp = matched
+    start, end = intValue(startOp), intValue(endOp)
+    if start is None or end is None:
+        return None
+    length = end - start
+    if not isImmediate(start) or not isImmediate(length) or length == 0:
+        return None
+    return [TealOp(substringOp.expr, Op.extract, start, length)]
+
+
+def foldExtractInt(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # extract_uintN(byte X, int S) or getbyte(byte X, int S)
+    bytesOp, startOp, extractOp = matched
+    value, start = extractConstantValue(bytesOp), intValue(startOp)
+    length = next(
+        length for length, op in extractIntOps.items() if op == extractOp.getOp()
+    )
+    if type(value) is not bytes or start is None or start + length > len(value):  # type: ignore
+        # leave the op in place so that it still fails at runtime
+        return None
+    result = int.from_bytes(value[start : start + length], "big")  # type: ignore
+    return [TealOp(extractOp.expr, Op.int, result)]
+
+
+def moveIndexToImmediate(newOp: Op) -> Rewrite:
+    """Create a rewrite which replaces an op that reads its last index from the stack with an op
+    that takes the index as its last immediate argument.
+    """
+
+    def rewrite(matched: List[TealOp]) -> Optional[List[TealOp]]:
+        indexOp, op = matched
+        index = intValue(indexOp)
+        if index is None or not isImmediate(index):
+            return None
+        return [TealOp(op.expr, newOp, *op.args, index)]
+
+    return rewrite
+
+
+def moveGroupIndexToImmediate(newOp: Op) -> Rewrite:
+    """Create a rewrite which replaces an op that reads a transaction group index from the stack
+    with an op that takes the group index as its first immediate argument.
+    """
+
+    def rewrite(matched: List[TealOp]) -> Optional[List[TealOp]]:
+        indexOp, op = matched
+        index = intValue(indexOp)
+        if index is None or not isImmediate(index):
+            return None
+        return [TealOp(op.expr, newOp, index, *op.args)]
+
+    return rewrite
+
+
+# The patterns which may be rewritten, and the rewrites which can replace each pattern. If more than
+# one rewrite applies, the one whose ops are available and cost the least is chosen.
+selectionRules: List[Tuple[Pattern, List[Rewrite]]] = [
+    ((Op.btoi, (Op.extract, ANY)), [extractIntWithImmediates]),
+    ((Op.btoi, (Op.substring, ANY)), [extractIntWithImmediates]),
+    ((Op.btoi, (Op.extract3, ANY, ANY, (Op.int,))), [extractIntWithLength]),
+    ((Op.extract3, ANY, (Op.int,), (Op.int,)), [extractWithImmediates]),
+    (
+        (Op.substring3, ANY, (Op.int,), (Op.int,)),
+        [substringAsExtract, substringWithImmediates],
+    ),
+]
+for extractIntOp in extractIntOps.values():
+    selectionRules.append(
+        ((extractIntOp, (Op.byte,), (Op.int,)), [foldExtractInt]),
+    )
+for stackOp, immediateOp in (
+    (Op.txnas, Op.txna),
+    (Op.gtxnas, Op.gtxna),
+    (Op.args, Op.arg),
+):
+    selectionRules.append(
+        ((stackOp, (Op.int,)), [moveIndexToImmediate(immediateOp)]),
+    )
+selectionRules.append(
+    ((Op.gtxnsas, ANY, (Op.int,)), [moveIndexToImmediate(Op.gtxnsa)]),
+)
+for stackOp, immediateOp in (
+    (Op.gtxns, Op.gtxn),
+    (Op.gtxnsa, Op.gtxna),
+    (Op.gloads, Op.gload),
+    (Op.gaids, Op.gaid),
+):
+    selectionRules.append(
+        ((stackOp, (Op.int,)), [moveGroupIndexToImmediate(immediateOp)]),
+    )
+
+
+def matchPattern(pattern: Tuple, ops: List[TealOp], end: int) -> Optional[int]:
+    """Match a pattern against the expression whose result is computed by an op.
+
+    Args:
+        pattern: The pattern to match. This must not be ANY.
+        ops: A list of ops that are executed sequentially.
+        end: The index of the op which computes the result of the expression.
+
+    Returns:
+        The index of the first op matched by the pattern, or None if the pattern does not match.
+        The ops from this index to end are exactly the ops matched by the pattern, excluding the
+        ops matched by ANY.
+    """
+    if end < 0 or ops[end].getOp() != pattern[0]:
+        return None
+
+    effect = getStackEffect(ops[end])
+    arguments = pattern[1:]
+    if effect is None or effect[0] != len(arguments):
+        return None
+
+    start = end
+    for argument in reversed(arguments):
+        if argument is ANY:
+            # every earlier argument is also ANY
+            break
+        argumentStart = matchPattern(argument, ops, start - 1)
+        if argumentStart is None:
+            return None
+        start = argumentStart
+
+    return start
+
+
+def getOpsCost(ops: List[TealOp]) -> Tuple[int, int]:
+    """Get the opcode budget and the estimated number of bytes used by a list of ops.
+
+    Int constants are assumed to be loaded with pushint, so that the size of the constant is taken
+    into account.
+    """
+    size = 0
+    for op in ops:
+        if op.getOp() == Op.int:
+            size += 1 + intConstantSize(extractIntValue(op))
+        else:
+            size += getOpSize(op)
+    return sum(getOpCost(op) for op in ops), size
+
+
+def selectOps(
+    ops: List[TealOp],
+    version: int,
+    rules: List[Tuple[Pattern, List[Rewrite]]] = None,
+) -> Tuple[List[TealOp], int]:
+    """Replace expressions with cheaper ops which compute the same result.
+
+    Each rule is tried on every op. When the pattern of a rule matches the
+    expression computed by an op, the cheapest replacement which is available in the TEAL version
+    is chosen, if it uses less opcode budget than the matched ops, or the same budget and fewer
+    bytes. This is repeated until no rule applies, since one replacement may allow another.
+
+    Args:
+        ops: A list of ops that are executed sequentially, i.e. the ops of a single basic block.
+        version: The TEAL version being compiled.
+        rules (optional): The patterns to match and the rewrites which can replace each of them.
+            Defaults to selectionRules.
+
+    Returns:
+        A tuple of the new list of ops, and the number of replacements that were made.
+    """
+    if rules is None:
+        rules = selectionRules
+
+    ops = list(ops)
+    replaced = 0
+
+    changed = True
+    while changed:
+        changed = False
+        for end in range(len(ops)):
+            best: Optional[Tuple[Tuple[int, int], int, List[TealOp]]] = None
+            for pattern, rewrites in rules:
+                start = matchPattern(pattern, ops, end)  # type: ignore
+                if start is None:
+                    continue
+                matched = ops[start : end + 1]
+                for rewrite in rewrites:
+                    newOps = rewrite(matched)
+                    if newOps is None or any(
+                        op.getOp().min_version > version for op in newOps
+                    ):
+                        continue
+                    cost = getOpsCost(newOps)
+                    if cost < getOpsCost(matched) and (best is None or cost < best[0]):
+                        best = (cost, start, newOps)
+
+            if best is not None:
+                _, start, newOps = best
+                ops[start : end + 1] = newOps
+                replaced += 1
+                changed = True
+                break
+
+    return ops, replaced
+
+
+def selectInstructions(start: TealBlock, version: int) -> int:
+    """Replace expressions with cheaper ops which compute the same result in every block of a graph.
+
+    This function modifies the ops of the blocks in the graph in place.
+
+    Args:
+        start: The starting block of the graph.
+        version: The TEAL version being compiled.
+
+    Returns:
+        The number of replacements that were made.
+    """
+    replaced = 0
+    for block in TealBlock.Iterate(start):
+        block.ops, count = selectOps(block.ops, version)
+        replaced += count
+    return replaced
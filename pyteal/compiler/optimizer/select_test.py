@@ -0,0 +1,215 @@
+from ... import *
+
+from .select import ANY, selectionRules, matchPattern, selectOps, selectInstructions
+
+
+def test_selectionRules_wildcards_first():
+    def postfix(pattern):
+        if pattern is ANY:
+            return [ANY]
+        ops = []
+        for argument in pattern[1:]:
+            ops += postfix(argument)
+        return ops + [pattern[0]]
+
+    for pattern, _ in selectionRules:
+        ops = postfix(pattern)
+        wildcards = sum(1 for op in ops if op is ANY)
+        assert all(op is ANY for op in ops[:wildcards])
+
+
+def test_matchPattern():
+    ops = [
+        TealOp(None, Op.txn, "Note"),
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 8),
+        TealOp(None, Op.extract3),
+        TealOp(None, Op.btoi),
+    ]
+
+    assert matchPattern((Op.btoi, (Op.extract3, ANY, ANY, (Op.int,))), ops, 4) == 2
+    assert matchPattern((Op.extract3, ANY, ANY, (Op.int,)), ops, 3) == 2
+    assert matchPattern((Op.extract3, ANY, (Op.int,), (Op.int,)), ops, 3) is None
+    assert matchPattern((Op.btoi, (Op.extract, ANY)), ops, 4) is None
+    assert matchPattern((Op.btoi, (Op.extract3, ANY, ANY, (Op.int,))), ops, 3) is None
+
+    # the int argument is outside of the ops
+    assert (
+        matchPattern((Op.txnas, (Op.int,)), [TealOp(None, Op.txnas, "Accounts")], 0)
+        is None
+    )
+
+
+def test_selectOps_extract_int():
+    tests = [
+        (
+            [TealOp(None, Op.extract, 2, 8), TealOp(None, Op.btoi)],
+            [TealOp(None, Op.int, 2), TealOp(None, Op.extract_uint64)],
+        ),
+        (
+            [TealOp(None, Op.extract, 0, 4), TealOp(None, Op.btoi)],
+            [TealOp(None, Op.int, 0), TealOp(None, Op.extract_uint32)],
+        ),
+        (
+            [TealOp(None, Op.substring, 3, 5), TealOp(None, Op.btoi)],
+            [TealOp(None, Op.int, 3), TealOp(None, Op.extract_uint16)],
+        ),
+        (
+            [TealOp(None, Op.extract, 3, 1), TealOp(None, Op.btoi)],
+            [TealOp(None, Op.int, 3), TealOp(None, Op.getbyte)],
+        ),
+        (
+            [
+                TealOp(None, Op.txn, "Fee"),
+                TealOp(None, Op.int, 8),
+                TealOp(None, Op.extract3),
+                TealOp(None, Op.btoi),
+            ],
+            [TealOp(None, Op.txn, "Fee"), TealOp(None, Op.extract_uint64)],
+        ),
+    ]
+
+    for ops, expected in tests:
+        actual, replaced = selectOps(ops, 5)
+        assert actual == expected
+        assert replaced == 1
+
+    # lengths which do not have an op
+    for ops in (
+        [TealOp(None, Op.extract, 2, 3), TealOp(None, Op.btoi)],
+        [TealOp(None, Op.extract, 2, 0), TealOp(None, Op.btoi)],
+        [TealOp(None, Op.substring, 2, 2), TealOp(None, Op.btoi)],
+    ):
+        assert selectOps(ops, 5) == (ops, 0)
+
+    # extract_uint64 is not available before TEAL version 5
+    ops = [TealOp(None, Op.substring, 0, 8), TealOp(None, Op.btoi)]
+    assert selectOps(ops, 4) == (ops, 0)
+
+    # getbyte is available in TEAL version 3
+    ops = [TealOp(None, Op.substring, 1, 2), TealOp(None, Op.btoi)]
+    assert selectOps(ops, 3) == (
+        [TealOp(None, Op.int, 1), TealOp(None, Op.getbyte)],
+        1,
+    )
+
+
+def test_selectOps_substring():
+    ops = [
+        TealOp(None, Op.txn, "Note"),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.substring3),
+    ]
+
+    assert selectOps(ops, 2) == (
+        [TealOp(None, Op.txn, "Note"), TealOp(None, Op.substring, 2, 10)],
+        1,
+    )
+    assert selectOps(ops, 5) == (
+        [TealOp(None, Op.txn, "Note"), TealOp(None, Op.extract, 2, 8)],
+        1,
+    )
+
+    ops[2] = TealOp(None, Op.int, 300)
+    assert selectOps(ops, 5) == (ops, 0)
+
+    ops = [
+        TealOp(None, Op.txn, "Note"),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.extract3),
+    ]
+    assert selectOps(ops, 5) == (
+        [TealOp(None, Op.txn, "Note"), TealOp(None, Op.extract, 2, 10)],
+        1,
+    )
+
+    # a length of 0 has a different meaning for the extract op
+    ops[2] = TealOp(None, Op.int, 0)
+    assert selectOps(ops, 5) == (ops, 0)
+
+
+def test_selectOps_fold_extract_int():
+    ops = [
+        TealOp(None, Op.byte, "0x01020304"),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.extract_uint16),
+    ]
+    assert selectOps(ops, 5) == ([TealOp(None, Op.int, 0x0203)], 1)
+
+    # out of bounds reads still fail at runtime
+    ops[1] = TealOp(None, Op.int, 3)
+    assert selectOps(ops, 5) == (ops, 0)
+
+
+def test_selectOps_immediate_indexes():
+    tests = [
+        (
+            [TealOp(None, Op.int, 1), TealOp(None, Op.txnas, "Accounts")],
+            [TealOp(None, Op.txna, "Accounts", 1)],
+        ),
+        (
+            [TealOp(None, Op.int, 1), TealOp(None, Op.gtxnas, 0, "Accounts")],
+            [TealOp(None, Op.gtxna, 0, "Accounts", 1)],
+        ),
+        (
+            [
+                TealOp(None, Op.txn, "GroupIndex"),
+                TealOp(None, Op.int, 1),
+                TealOp(None, Op.gtxnsas, "Accounts"),
+            ],
+            [
+                TealOp(None, Op.txn, "GroupIndex"),
+                TealOp(None, Op.gtxnsa, "Accounts", 1),
+            ],
+        ),
+        (
+            [
+                TealOp(None, Op.int, 0),
+                TealOp(None, Op.int, 1),
+                TealOp(None, Op.gtxnsas, "Accounts"),
+            ],
+            [TealOp(None, Op.gtxna, 0, "Accounts", 1)],
+        ),
+        (
+            [TealOp(None, Op.int, 0), TealOp(None, Op.gtxns, "Fee")],
+            [TealOp(None, Op.gtxn, 0, "Fee")],
+        ),
+        (
+            [TealOp(None, Op.int, 0), TealOp(None, Op.gloads, 3)],
+            [TealOp(None, Op.gload, 0, 3)],
+        ),
+        (
+            [TealOp(None, Op.int, 0), TealOp(None, Op.gaids)],
+            [TealOp(None, Op.gaid, 0)],
+        ),
+        (
+            [TealOp(None, Op.int, 2), TealOp(None, Op.args)],
+            [TealOp(None, Op.arg, 2)],
+        ),
+    ]
+
+    for ops, expected in tests:
+        actual, _ = selectOps(ops, 5)
+        assert actual == expected
+
+    ops = [TealOp(None, Op.int, 256), TealOp(None, Op.txnas, "Accounts")]
+    assert selectOps(ops, 5) == (ops, 0)
+
+    ops = [TealOp(None, Op.int, "TMPL_INDEX"), TealOp(None, Op.txnas, "Accounts")]
+    assert selectOps(ops, 5) == (ops, 0)
+
+
+def test_selectInstructions():
+    block1 = TealSimpleBlock(
+        [TealOp(None, Op.int, 1), TealOp(None, Op.txnas, "Accounts")]
+    )
+    block2 = TealSimpleBlock(
+        [TealOp(None, Op.int, 2), TealOp(None, Op.txnas, "Accounts")]
+    )
+    block1.setNextBlock(block2)
+
+    assert selectInstructions(block1, 5) == 2
+    assert block1.ops == [TealOp(None, Op.txna, "Accounts", 1)]
+    assert block2.ops == [TealOp(None, Op.txna, "Accounts", 2)]
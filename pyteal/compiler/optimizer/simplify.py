@@ -0,0 +1,262 @@
+from collections import OrderedDict
+from copy import copy
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ...types import TealType
+from ...ir import Op
+from ...ast import (
+    Expr,
+    Int,
+    UnaryExpr,
+    BinaryExpr,
+    NaryExpr,
+    ScratchLoad,
+    If,
+    While,
+    For,
+    Assert,
+    Cond,
+    Not,
+)
+
+# A function which is given an expression, and whether only the zero or nonzero value of that
+# expression matters, and returns a simpler expression with the same result, or None if it cannot
+# simplify it.
+Rule = Callable[[Expr, bool], Optional[Expr]]
+
+# Ops whose result is always 0 or 1.
+booleanOps = (
+    Op.logic_not,
+    Op.eq,
+    Op.neq,
+    Op.lt,
+    Op.le,
+    Op.gt,
+    Op.ge,
+    Op.b_eq,
+    Op.b_neq,
+    Op.b_lt,
+    Op.b_le,
+    Op.b_gt,
+    Op.b_ge,
+    Op.getbit,
+)
+
+
+def isOp(expr: Expr, op: Op) -> bool:
+    """Check if an expression is a unary, binary or n-ary expression of an op."""
+    return isinstance(expr, (UnaryExpr, BinaryExpr, NaryExpr)) and expr.op == op
+
+
+def isBoolean(expr: Expr) -> bool:
+    """Check if an expression always evaluates to 0 or 1."""
+    if isinstance(expr, Int):
+        return expr.value in (0, 1)
+    if isinstance(expr, NaryExpr) and expr.op in (Op.logic_and, Op.logic_or):
+        # a single argument is evaluated without the op
+        return len(expr.args) > 1 or isBoolean(expr.args[0])
+    return isinstance(expr, (UnaryExpr, BinaryExpr)) and expr.op in booleanOps
+
+
+def replaceWith(original: Expr, replacement: Expr) -> Expr:
+    """Attribute a new expression to the definition of the expression it replaces."""
+    replacement.trace = original.trace
+    return replacement
+
+
+def removeDoubleNot(expr: Expr, condition: bool) -> Optional[Expr]:
+    # Not(Not(x))
+    if not isOp(expr, Op.logic_not) or not isOp(expr.arg, Op.logic_not):  # type: ignore
+        return None
+    inner = expr.arg.arg  # type: ignore
+    if not condition and not isBoolean(inner):
+        return None
+    return inner
+
+
+def compareWithZero(expr: Expr, condition: bool) -> Optional[Expr]:
+    # x == Int(0) or Int(0) == x
+    if not isOp(expr, Op.eq):
+        return None
+    for value, other in (
+        (expr.argLeft, expr.argRight),  # type: ignore
+        (expr.argRight, expr.argLeft),  # type: ignore
+    ):
+        if (
+            isinstance(value, Int)
+            and value.value == 0
+            and other.type_of() == TealType.uint64
+        ):
+            return replaceWith(expr, Not(other))
+    return None
+
+
+def removeItobBtoi(expr: Expr, condition: bool) -> Optional[Expr]:
+    # Btoi(Itob(x))
+    if not isOp(expr, Op.btoi) or not isOp(expr.arg, Op.itob):  # type: ignore
+        return None
+    return expr.arg.arg  # type: ignore
+
+
+def lengthOfItob(expr: Expr, condition: bool) -> Optional[Expr]:
+    # Len(Itob(x))
+    if not isOp(expr, Op.len) or not isOp(expr.arg, Op.itob):  # type: ignore
+        return None
+    if not isinstance(expr.arg.arg, (Int, ScratchLoad)):  # type: ignore
+        # other expressions may have side effects, or may fail
+        return None
+    return replaceWith(expr, Int(8))
+
+
+def swapIfNotBranches(expr: Expr, condition: bool) -> Optional[Expr]:
+    # If(Not(c), a, b)
+    if (
+        not isinstance(expr, If)
+        or expr.elseBranch is None
+        or not isOp(expr.cond, Op.logic_not)
+    ):
+        return None
+    swapped = copy(expr)
+    swapped.cond = expr.cond.arg  # type: ignore
+    swapped.thenBranch = expr.elseBranch
+    swapped.elseBranch = expr.thenBranch
+    return swapped
+
+
+def removeConstantOperands(
+    op: Op, identity: Callable[[int], bool], result: int
+) -> Rule:
+    """Create a rule which removes constant operands of a logical op which cannot change its value.
+
+    Args:
+        op: The op, either logic_and or logic_or.
+        identity: A function which checks if the value of a constant operand can be removed.
+        result: The value of the op when every operand is removed.
+    """
+
+    def rule(expr: Expr, condition: bool) -> Optional[Expr]:
+        if not isOp(expr, op) or len(expr.args) < 2:  # type: ignore
+            return None
+        args: List[Expr] = list(expr.args)  # type: ignore
+        remaining = [
+            arg for arg in args if not (isinstance(arg, Int) and identity(arg.value))
+        ]
+        if len(remaining) == len(args):
+            return None
+        if len(remaining) == 0:
+            return replaceWith(expr, Int(result))
+        if len(remaining) == 1:
+            if condition or isBoolean(remaining[0]):
+                return remaining[0]
+            # the op is still needed to produce 0 or 1
+            if len(args) == 2:
+                return None
+            remaining.append(Int(result))
+        simplified = copy(expr)
+        simplified.args = remaining  # type: ignore
+        return simplified
+
+    return rule
+
+
+# The name of each rule and the rule, in the order they are tried.
+simplificationRules: List[Tuple[str, Rule]] = [
+    ("notNot", removeDoubleNot),
+    ("eqZero", compareWithZero),
+    ("btoiItob", removeItobBtoi),
+    ("lenItob", lengthOfItob),
+    ("ifNot", swapIfNotBranches),
+    ("andOne", removeConstantOperands(Op.logic_and, lambda value: value != 0, 1)),
+    ("orZero", removeConstantOperands(Op.logic_or, lambda value: value == 0, 0)),
+]
+
+
+def getConditionAttributes(expr: Expr, condition: bool) -> Set[str]:
+    """Get the attributes of an expression which hold expressions whose value only matters by
+    whether it is zero or nonzero.
+    """
+    if isinstance(expr, (If, While, For, Assert)):
+        return {"cond"}
+    if isOp(expr, Op.logic_not):
+        return {"arg"}
+    if isOp(expr, Op.logic_and) or isOp(expr, Op.logic_or):
+        if condition or len(expr.args) > 1:  # type: ignore
+            return {"args"}
+    return set()
+
+
+def simplifyExpr(
+    expr: Expr, rules: List[Tuple[str, Rule]] = None
+) -> Tuple[Expr, Dict[str, int]]:
+    """Simplify an expression with algebraic rules.
+
+    Every rule is applied to every expression in the tree, from the leaves up, until no rule
+    applies. The expression is not modified. Instead, expressions whose arguments are simplified are
+    copied, and expressions which occur more than once in the tree are simplified once.
+
+    Args:
+        expr: The expression to simplify.
+        rules (optional): The names of the rules to apply and the rules. Defaults to
+            simplificationRules.
+
+    Returns:
+        A tuple of the simplified expression, and a dictionary of the number of times each rule
+        was applied.
+    """
+    if rules is None:
+        rules = simplificationRules
+
+    counts: Dict[str, int] = OrderedDict((name, 0) for name, _ in rules)
+    # maps the id of an expression and its context to the expression and its simplified form, which
+    # keeps the expression alive so that its id is not reused
+    simplified: Dict[Tuple[int, bool], Tuple[Expr, Expr]] = dict()
+
+    def simplifyValue(value: Any, condition: bool) -> Any:
+        if isinstance(value, Expr):
+            return simplify(value, condition)
+        if isinstance(value, (list, tuple)):
+            items = [simplifyValue(item, condition) for item in value]
+            if all(new is old for new, old in zip(items, value)):
+                return value
+            return type(value)(items)
+        return value
+
+    def simplify(expr: Expr, condition: bool) -> Expr:
+        key = (id(expr), condition)
+        if key in simplified:
+            return simplified[key][1]
+
+        conditionAttributes = getConditionAttributes(expr, condition)
+        result = expr
+        for name, value in vars(expr).items():
+            if name == "trace":
+                continue
+            if isinstance(expr, Cond) and name == "args":
+                newValue = [
+                    [simplify(cond, True), simplify(branch, False)]
+                    for cond, branch in value
+                ]
+                if all(
+                    new[0] is old[0] and new[1] is old[1]
+                    for new, old in zip(newValue, value)
+                ):
+                    newValue = value
+            else:
+                newValue = simplifyValue(value, name in conditionAttributes)
+            if newValue is not value:
+                if result is expr:
+                    result = copy(expr)
+                setattr(result, name, newValue)
+
+        for name, rule in rules:
+            replacement = rule(result, condition)
+            if replacement is not None:
+                counts[name] += 1
+                # the replacement may allow more rules to apply
+                result = simplify(replacement, condition)
+                break
+
+        simplified[key] = (expr, result)
+        return result
+
+    return simplify(expr, False), counts
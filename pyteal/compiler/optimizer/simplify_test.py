@@ -0,0 +1,186 @@
+from ... import *
+
+from .simplify import (
+    isBoolean,
+    removeDoubleNot,
+    compareWithZero,
+    removeItobBtoi,
+    lengthOfItob,
+    swapIfNotBranches,
+    simplificationRules,
+    simplifyExpr,
+)
+
+options = CompileOptions(version=5)
+
+
+def compile(expr: Expr) -> str:
+    """Get the ops of an expression, to compare expressions which are not the same object."""
+    start, _ = expr.__teal__(options)
+    return str([block.ops for block in TealBlock.Iterate(start)])
+
+
+def getRule(name):
+    return next(rule for ruleName, rule in simplificationRules if ruleName == name)
+
+
+def test_isBoolean():
+    assert isBoolean(Int(0))
+    assert isBoolean(Int(1))
+    assert not isBoolean(Int(2))
+    assert isBoolean(Txn.fee() < Int(5))
+    assert isBoolean(BytesEq(Txn.note(), Bytes("a")))
+    assert isBoolean(Not(Txn.fee()))
+    assert isBoolean(And(Txn.fee(), Txn.amount()))
+    assert not isBoolean(And(Txn.fee()))
+    assert not isBoolean(Txn.fee())
+    assert not isBoolean(Txn.fee() + Int(1))
+
+
+def test_removeDoubleNot():
+    comparison = Txn.fee() < Int(5)
+    assert removeDoubleNot(Not(Not(comparison)), False) is comparison
+
+    # the value of Not(Not(x)) is 0 or 1, which is only the value of x if x is 0 or 1
+    fee = Txn.fee()
+    assert removeDoubleNot(Not(Not(fee)), False) is None
+    assert removeDoubleNot(Not(Not(fee)), True) is fee
+
+    assert removeDoubleNot(Not(fee), True) is None
+
+
+def test_compareWithZero():
+    fee = Txn.fee()
+    assert compile(compareWithZero(fee == Int(0), False)) == compile(Not(fee))
+    assert compile(compareWithZero(Int(0) == fee, False)) == compile(Not(fee))
+
+    assert compareWithZero(fee == Int(1), False) is None
+    assert compareWithZero(fee != Int(0), False) is None
+    assert compareWithZero(Txn.note() == Bytes("base16", "00"), False) is None
+
+
+def test_removeItobBtoi():
+    fee = Txn.fee()
+    assert removeItobBtoi(Btoi(Itob(fee)), False) is fee
+
+    # Itob(Btoi(x)) is not x when x is shorter than 8 bytes
+    assert removeItobBtoi(Itob(Btoi(Txn.note())), False) is None
+
+
+def test_lengthOfItob():
+    assert compile(lengthOfItob(Len(Itob(Int(5))), False)) == compile(Int(8))
+    assert compile(lengthOfItob(Len(Itob(ScratchVar().load())), False)) == compile(
+        Int(8)
+    )
+
+    # the argument could fail, so it must still be evaluated
+    assert lengthOfItob(Len(Itob(Txn.fee() + Int(1))), False) is None
+    assert lengthOfItob(Len(Txn.note()), False) is None
+
+
+def test_swapIfNotBranches():
+    cond = Txn.fee() > Int(5)
+    then = Int(1)
+    else_ = Int(2)
+    original = If(Not(cond), then, else_)
+
+    swapped = swapIfNotBranches(original, False)
+    assert swapped.cond is cond
+    assert swapped.thenBranch is else_
+    assert swapped.elseBranch is then
+    assert original.cond.arg is cond
+
+    swapped = swapIfNotBranches(If(Not(cond)).Then(Int(1)).Else(Int(2)), False)
+    assert swapped.cond is cond
+
+    # without an else branch there is nothing to swap
+    assert swapIfNotBranches(If(Not(cond), Pop(Int(1))), False) is None
+
+
+def test_andOne():
+    andOne = getRule("andOne")
+    comparison = Txn.fee() < Int(5)
+    fee = Txn.fee()
+
+    assert andOne(And(comparison, Int(1)), False) is comparison
+    assert andOne(And(Int(1), fee), True) is fee
+    assert compile(andOne(And(Int(1), Int(2)), False)) == compile(Int(1))
+    assert compile(andOne(And(fee, Int(1), comparison), False)) == compile(
+        And(fee, comparison)
+    )
+    assert compile(andOne(And(fee, Int(1), Int(1)), False)) == compile(And(fee, Int(1)))
+
+    # And(x, Int(1)) is 1 when x is any nonzero value
+    assert andOne(And(fee, Int(1)), False) is None
+    assert andOne(And(fee, Int(0)), False) is None
+    # And(Int(1)) is evaluated without &&
+    assert andOne(And(Int(1)), False) is None
+
+
+def test_orZero():
+    orZero = getRule("orZero")
+    comparison = Txn.fee() < Int(5)
+
+    assert orZero(Or(Int(0), comparison), False) is comparison
+    assert compile(orZero(Or(Int(0), Int(0)), False)) == compile(Int(0))
+    assert orZero(Or(comparison, Int(1)), False) is None
+
+
+def test_simplifyExpr():
+    fee = Txn.fee()
+    program = Seq(
+        [
+            If(Not(fee == Int(0)), Pop(Int(1)), Pop(Int(2))),
+            Assert(Not(Not(Btoi(Itob(fee))))),
+            Return(And(Len(Itob(Int(3))) == Int(8), Int(1))),
+        ]
+    )
+    original = str(program)
+
+    simplified, counts = simplifyExpr(program)
+    assert compile(simplified) == compile(
+        Seq(
+            [
+                If(fee, Pop(Int(1)), Pop(Int(2))),
+                Assert(fee),
+                Return(Int(8) == Int(8)),
+            ]
+        )
+    )
+    assert counts == {
+        "notNot": 2,
+        "eqZero": 1,
+        "btoiItob": 1,
+        "lenItob": 1,
+        "ifNot": 0,
+        "andOne": 1,
+        "orZero": 0,
+    }
+
+    # the original expression is not modified
+    assert str(program) == original
+
+
+def test_simplifyExpr_cond():
+    fee = Txn.fee()
+    program = Cond([Not(Not(fee)), Int(1)], [Int(1), Not(Not(fee))])
+
+    simplified, counts = simplifyExpr(program)
+    assert compile(simplified) == compile(Cond([fee, Int(1)], [Int(1), Not(Not(fee))]))
+    assert counts["notNot"] == 1
+
+
+def test_simplifyExpr_shared():
+    shared = Btoi(Itob(Txn.fee()))
+    program = shared + shared
+
+    simplified, counts = simplifyExpr(program)
+    assert simplified.argLeft is simplified.argRight
+    assert counts["btoiItob"] == 1
+
+
+def test_simplifyExpr_unchanged():
+    program = Seq([Pop(Txn.fee() + Int(1)), Return(Int(1))])
+    simplified, counts = simplifyExpr(program)
+    assert simplified is program
+    assert sum(counts.values()) == 0
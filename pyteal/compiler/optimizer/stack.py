@@ -0,0 +1,236 @@
+from typing import Dict, List, Optional, Tuple, cast
+
+from ...types import TealType
+from ...ir import Op, TealOp, TealComponent
+from .liveness import findSuccessors
+
+# The number of values each op pops from and pushes onto the stack, for ops whose stack effect does
+# not depend on their immediate arguments.
+fixedStackEffects: Dict[Op, Tuple[int, int]] = {
+    Op.err: (0, 0),
+    Op.sha256: (1, 1),
+    Op.keccak256: (1, 1),
+    Op.sha512_256: (1, 1),
+    Op.ed25519verify: (3, 1),
+    Op.add: (2, 1),
+    Op.minus: (2, 1),
+    Op.div: (2, 1),
+    Op.mul: (2, 1),
+    Op.lt: (2, 1),
+    Op.gt: (2, 1),
+    Op.le: (2, 1),
+    Op.ge: (2, 1),
+    Op.logic_and: (2, 1),
+    Op.logic_or: (2, 1),
+    Op.eq: (2, 1),
+    Op.neq: (2, 1),
+    Op.logic_not: (1, 1),
+    Op.len: (1, 1),
+    Op.itob: (1, 1),
+    Op.btoi: (1, 1),
+    Op.mod: (2, 1),
+    Op.bitwise_or: (2, 1),
+    Op.bitwise_and: (2, 1),
+    Op.bitwise_xor: (2, 1),
+    Op.bitwise_not: (1, 1),
+    Op.mulw: (2, 2),
+    Op.addw: (2, 2),
+    Op.intcblock: (0, 0),
+    Op.intc: (0, 1),
+    Op.intc_0: (0, 1),
+    Op.intc_1: (0, 1),
+    Op.intc_2: (0, 1),
+    Op.intc_3: (0, 1),
+    Op.int: (0, 1),
+    Op.bytecblock: (0, 0),
+    Op.bytec: (0, 1),
+    Op.bytec_0: (0, 1),
+    Op.bytec_1: (0, 1),
+    Op.bytec_2: (0, 1),
+    Op.bytec_3: (0, 1),
+    Op.byte: (0, 1),
+    Op.addr: (0, 1),
+    Op.method_signature: (0, 1),
+    Op.arg: (0, 1),
+    Op.txn: (0, 1),
+    Op.global_: (0, 1),
+    Op.gtxn: (0, 1),
+    Op.load: (0, 1),
+    Op.store: (1, 0),
+    Op.txna: (0, 1),
+    Op.gtxna: (0, 1),
+    Op.bnz: (1, 0),
+    Op.bz: (1, 0),
+    Op.b: (0, 0),
+    Op.return_: (1, 0),
+    Op.pop: (1, 0),
+    Op.dup: (1, 2),
+    Op.dup2: (2, 4),
+    Op.concat: (2, 1),
+    Op.substring: (1, 1),
+    Op.substring3: (3, 1),
+    Op.balance: (1, 1),
+    Op.app_opted_in: (2, 1),
+    Op.app_local_get: (2, 1),
+    Op.app_local_get_ex: (3, 2),
+    Op.app_global_get: (1, 1),
+    Op.app_global_get_ex: (2, 2),
+    Op.app_local_put: (3, 0),
+    Op.app_global_put: (2, 0),
+    Op.app_local_del: (2, 0),
+    Op.app_global_del: (1, 0),
+    Op.asset_holding_get: (2, 2),
+    Op.asset_params_get: (1, 2),
+    Op.gtxns: (1, 1),
+    Op.gtxnsa: (1, 1),
+    Op.assert_: (1, 0),
+    Op.swap: (2, 2),
+    Op.select: (3, 1),
+    Op.getbit: (2, 1),
+    Op.setbit: (3, 1),
+    Op.getbyte: (2, 1),
+    Op.setbyte: (3, 1),
+    Op.min_balance: (1, 1),
+    Op.pushbytes: (0, 1),
+    Op.pushint: (0, 1),
+    Op.shl: (2, 1),
+    Op.shr: (2, 1),
+    Op.sqrt: (1, 1),
+    Op.bitlen: (1, 1),
+    Op.exp: (2, 1),
+    Op.divmodw: (4, 4),
+    Op.expw: (2, 2),
+    Op.b_add: (2, 1),
+    Op.b_minus: (2, 1),
+    Op.b_div: (2, 1),
+    Op.b_mul: (2, 1),
+    Op.b_lt: (2, 1),
+    Op.b_gt: (2, 1),
+    Op.b_le: (2, 1),
+    Op.b_ge: (2, 1),
+    Op.b_eq: (2, 1),
+    Op.b_neq: (2, 1),
+    Op.b_mod: (2, 1),
+    Op.b_or: (2, 1),
+    Op.b_and: (2, 1),
+    Op.b_xor: (2, 1),
+    Op.b_not: (1, 1),
+    Op.bzero: (1, 1),
+    Op.gload: (0, 1),
+    Op.gloads: (1, 1),
+    Op.gaid: (0, 1),
+    Op.gaids: (1, 1),
+    Op.retsub: (0, 0),
+    Op.ecdsa_verify: (5, 1),
+    Op.ecdsa_pk_decompress: (1, 2),
+    Op.ecdsa_pk_recover: (4, 2),
+    Op.loads: (1, 1),
+    Op.stores: (2, 0),
+    Op.extract: (1, 1),
+    Op.extract3: (3, 1),
+    Op.extract_uint16: (2, 1),
+    Op.extract_uint32: (2, 1),
+    Op.extract_uint64: (2, 1),
+    Op.app_params_get: (1, 2),
+    Op.log: (1, 0),
+    Op.itxn_begin: (0, 0),
+    Op.itxn_field: (1, 0),
+    Op.itxn_submit: (0, 0),
+    Op.itxn: (0, 1),
+    Op.itxna: (0, 1),
+    Op.txnas: (1, 1),
+    Op.gtxnas: (1, 1),
+    Op.gtxnsas: (2, 1),
+    Op.args: (1, 1),
+    Op.bsqrt: (1, 1),
+    Op.itxn_next: (0, 0),
+    Op.gitxn: (0, 1),
+    Op.gitxna: (0, 1),
+    Op.gloadss: (2, 1),
+    Op.acct_params_get: (1, 2),
+}
+
+
+def getStackEffect(stmt: TealOp) -> Optional[Tuple[int, int]]:
+    """Get the number of values an op pops from and pushes onto the stack.
+
+    Ops which access values deeper in the stack without popping them, such as dig, are treated as
+    popping and pushing back every value they access, so that the stack must contain at least as
+    many values as the op pops.
+
+    Args:
+        stmt: The op to check.
+
+    Returns:
+        A tuple of the number of values popped and the number of values pushed, or None if the
+        stack effect of the op is not known.
+    """
+    op = stmt.getOp()
+
+    if op == Op.dig:
+        depth = cast(int, stmt.args[0])
+        return depth + 1, depth + 2
+
+    if op in (Op.cover, Op.uncover):
+        depth = cast(int, stmt.args[0])
+        return depth + 1, depth + 1
+
+    if op == Op.callsub:
+        subroutine = stmt.args[0]
+        pushes = 0 if subroutine.returnType == TealType.none else 1  # type: ignore
+        return subroutine.argumentCount(), pushes  # type: ignore
+
+    return fixedStackEffects.get(op)
+
+
+def findStackHeights(
+    ops: List[TealComponent], initialHeight: int = 0
+) -> Optional[List[Optional[int]]]:
+    """Determine the height of the stack before each component in a flattened subroutine.
+
+    Heights are relative to the height of the stack when the first component executes. Labels are
+    considered to have no stack effect.
+
+    Args:
+        ops: The TealComponents of a single subroutine (or the main routine), as produced by
+            flattenBlocks.
+        initialHeight (optional): The height of the stack before the first component. Defaults to
+            0.
+
+    Returns:
+        A list the same length as ops, where each element is the height of the stack immediately
+        before the component at that index executes, or None for components which can never
+        execute. If the height cannot be determined, because some op has an unknown stack effect,
+        because paths which join have different heights, or because an op would pop more values
+        than the stack contains, None is returned instead of a list.
+    """
+    if len(ops) == 0:
+        return []
+
+    successors = findSuccessors(ops)
+    heights: List[Optional[int]] = [None for _ in ops]
+    heights[0] = initialHeight
+
+    worklist = [0]
+    while len(worklist) != 0:
+        i = worklist.pop()
+        height = cast(int, heights[i])
+
+        stmt = ops[i]
+        if isinstance(stmt, TealOp):
+            effect = getStackEffect(stmt)
+            if effect is None:
+                return None
+            pops, pushes = effect
+            if pops > height:
+                return None
+            height += pushes - pops
+
+        for successor in successors[i]:
+            if heights[successor] is None:
+                heights[successor] = height
+                worklist.append(successor)
+            elif heights[successor] != height:
+                return None
+
+    return heights
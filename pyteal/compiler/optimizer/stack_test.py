@@ -0,0 +1,71 @@
+from ... import *
+
+from .stack import fixedStackEffects, getStackEffect, findStackHeights
+
+
+def test_fixedStackEffects_complete():
+    variableOps = {Op.dig, Op.cover, Op.uncover, Op.callsub}
+    for op in Op:
+        assert (op in fixedStackEffects) != (op in variableOps)
+
+
+def test_getStackEffect():
+    def subImpl(a1, a2):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+    noneSubroutine = SubroutineDefinition(subImpl, TealType.none)
+
+    assert getStackEffect(TealOp(None, Op.add)) == (2, 1)
+    assert getStackEffect(TealOp(None, Op.int, 1)) == (0, 1)
+    assert getStackEffect(TealOp(None, Op.app_local_get_ex)) == (3, 2)
+    assert getStackEffect(TealOp(None, Op.dig, 2)) == (3, 4)
+    assert getStackEffect(TealOp(None, Op.cover, 2)) == (3, 3)
+    assert getStackEffect(TealOp(None, Op.uncover, 1)) == (2, 2)
+    assert getStackEffect(TealOp(None, Op.callsub, subroutine)) == (2, 1)
+    assert getStackEffect(TealOp(None, Op.callsub, noneSubroutine)) == (2, 0)
+
+
+def test_findStackHeights():
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 3),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.add),
+        TealLabel(None, l2),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+        TealOp(None, Op.err),
+    ]
+
+    assert findStackHeights(ops, 1) == [1, 2, 1, 2, 1, 1, 2, 3, 2, 2, 1, None]
+
+
+def test_findStackHeights_mismatch():
+    l1 = LabelReference("l1")
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.int, 2),
+        TealLabel(None, l1),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert findStackHeights(ops) is None
+
+
+def test_findStackHeights_underflow():
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.dig, 1),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert findStackHeights(ops) is None
+    assert findStackHeights(ops, 1) == [1, 2, 3]
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional, Set, cast
+
+from ...types import TealType
+from ...ast import ScratchSlot, SubroutineDefinition
+from ...ir import Op, TealOp, TealLabel, TealComponent
+from ..subroutines import depthFirstSearch
+from .liveness import hasDynamicSlotAccess
+from .stack import findStackHeights
+
+# Ops which end or redirect the straight line code at the start of a subroutine.
+controlFlowOps = (Op.b, Op.bz, Op.bnz, Op.return_, Op.retsub, Op.err)
+
+
+def loadArgument(depth: int, consume: bool) -> List[TealOp]:
+    """Get the ops which copy or move a value in the stack to the top of the stack.
+
+    Args:
+        depth: The number of values above the value to load.
+        consume: If true, the value is moved to the top of the stack. Otherwise it is copied.
+    """
+    if consume:
+        if depth == 0:
+            return []
+        if depth == 1:
+            return [TealOp(None, Op.swap)]
+        return [TealOp(None, Op.uncover, depth)]
+
+    if depth == 0:
+        return [TealOp(None, Op.dup)]
+    return [TealOp(None, Op.dig, depth)]
+
+
+def removeArguments(numArgs: int, returnsValue: bool) -> List[TealOp]:
+    """Get the ops which remove arguments from beneath the return value of a subroutine.
+
+    Args:
+        numArgs: The number of arguments remaining on the stack.
+        returnsValue: Whether the return value of the subroutine is on top of the arguments.
+    """
+    if numArgs == 0:
+        return []
+
+    ops: List[TealOp] = []
+    if returnsValue:
+        if numArgs == 1:
+            ops.append(TealOp(None, Op.swap))
+        else:
+            ops.append(TealOp(None, Op.cover, numArgs))
+
+    ops += [TealOp(None, Op.pop) for _ in range(numArgs)]
+    return ops
+
+
+def passArgumentsOnStack(
+    subroutine: SubroutineDefinition, ops: List[TealComponent]
+) -> Optional[List[TealComponent]]:
+    """Rewrite a subroutine to read its arguments directly from the stack.
+
+    Normally a subroutine stores each of its arguments into a scratch slot when it is entered, and
+    loads that slot whenever the argument is used. Instead, each use of an argument can copy it from
+    beneath the values the subroutine has pushed onto the stack with dig. An argument which is used
+    once in the straight line code at the start of the subroutine is moved with uncover instead.
+    Before the subroutine returns, any arguments which are still on the stack are removed.
+
+    Args:
+        subroutine: The subroutine to rewrite. This must not be able to invoke itself recursively.
+        ops: The TealComponents of the subroutine, as produced by flattenBlocks. This list is not
+            modified.
+
+    Returns:
+        The TealComponents of the rewritten subroutine, or None if it cannot be rewritten. The
+        caller should choose between the two based on their cost.
+    """
+    numArgs = subroutine.argumentCount()
+    if numArgs == 0 or len(ops) < numArgs or hasDynamicSlotAccess(ops):
+        return None
+
+    # the subroutine begins by storing its arguments, last argument first
+    argumentSlots: List[ScratchSlot] = []
+    for stmt in ops[numArgs - 1 :: -1]:
+        if not isinstance(stmt, TealOp) or stmt.getOp() != Op.store:
+            return None
+        argumentSlots.append(cast(ScratchSlot, stmt.args[0]))
+    if len(set(argumentSlots)) != numArgs:
+        return None
+
+    body = ops[numArgs:]
+
+    loadCounts = [0 for _ in range(numArgs)]
+    for stmt in body:
+        slots = stmt.getSlots()
+        if any(slot in argumentSlots for slot in slots):
+            if not isinstance(stmt, TealOp) or stmt.getOp() != Op.load:
+                # the argument is modified by the subroutine
+                return None
+            loadCounts[argumentSlots.index(cast(ScratchSlot, slots[0]))] += 1
+
+    # the heights exclude the arguments, and do not depend on whether they are copied or moved
+    heights = findStackHeights(body)
+    if heights is None:
+        return None
+
+    returnsValue = subroutine.returnType != TealType.none
+
+    # arguments which are moved to the top of the stack, instead of being copied
+    consumed: Set[int] = set()
+    for stmt in body:
+        if isinstance(stmt, TealLabel) or (
+            isinstance(stmt, TealOp) and stmt.getOp() in controlFlowOps
+        ):
+            break
+        for slot in stmt.getSlots():
+            index = argumentSlots.index(cast(ScratchSlot, slot))
+            if loadCounts[index] == 1:
+                consumed.add(index)
+
+    # the indexes of the arguments which are currently on the stack, from bottom to top
+    remaining = list(range(numArgs))
+
+    newOps: List[TealComponent] = []
+    for stmt, height in zip(body, heights):
+        if height is None:
+            # unreachable
+            newOps.append(stmt)
+            continue
+
+        slots = stmt.getSlots()
+        if len(slots) != 0 and slots[0] in argumentSlots:
+            index = argumentSlots.index(cast(ScratchSlot, slots[0]))
+            depth = height + len(remaining) - 1 - remaining.index(index)
+            if index in consumed:
+                remaining.remove(index)
+            newOps += loadArgument(depth, index in consumed)
+            continue
+
+        if isinstance(stmt, TealOp) and stmt.getOp() == Op.retsub:
+            if height != (1 if returnsValue else 0):
+                return None
+            newOps += removeArguments(len(remaining), returnsValue)
+
+        newOps.append(stmt)
+
+    # moving several arguments in their original order produces pairs of swaps, which cancel out
+    optimizedOps: List[TealComponent] = []
+    for stmt in newOps:
+        if (
+            isinstance(stmt, TealOp)
+            and stmt.getOp() == Op.swap
+            and len(optimizedOps) != 0
+            and isinstance(optimizedOps[-1], TealOp)
+            and optimizedOps[-1].getOp() == Op.swap
+        ):
+            optimizedOps.pop()
+            continue
+        optimizedOps.append(stmt)
+
+    return optimizedOps
+
+
+def passArgumentsOnStackForSubroutines(
+    subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+) -> int:
+    """Pass arguments on the stack for every subroutine where that requires fewer ops.
+
+    Recursive subroutines are never rewritten, since their arguments are spilled to the stack
+    during recursion.
+
+    Args:
+        subroutineMapping: A mapping from subroutine to the list of TealComponents which make up
+            that subroutine. The key None is taken to mean the main program routine. The values of
+            this map will be modified for subroutines which are rewritten.
+        subroutineGraph: A graph of subroutines. Each key is a subroutine (the main routine should
+            not be present), which represents a node in the graph. Each value is a set of all
+            subroutines that specific subroutine calls, which represent directional edges in the
+            graph.
+
+    Returns:
+        The number of subroutines which were rewritten.
+    """
+    rewritten = 0
+
+    for subroutine, ops in subroutineMapping.items():
+        if subroutine is None or depthFirstSearch(
+            subroutineGraph, subroutine, subroutine
+        ):
+            continue
+
+        argumentSlots = set()
+        for stmt in ops[: subroutine.argumentCount()]:
+            argumentSlots |= set(stmt.getSlots())
+        if any(
+            argumentSlots.intersection(stmt.getSlots())
+            for other, otherOps in subroutineMapping.items()
+            if other is not subroutine
+            for stmt in otherOps
+        ):
+            # the arguments are referenced outside of the subroutine
+            continue
+
+        newOps = passArgumentsOnStack(subroutine, ops)
+        if newOps is not None and len(newOps) < len(ops):
+            subroutineMapping[subroutine] = newOps
+            rewritten += 1
+
+    return rewritten
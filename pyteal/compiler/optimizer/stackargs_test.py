@@ -0,0 +1,233 @@
+from ... import *
+
+from .stackargs import (
+    loadArgument,
+    removeArguments,
+    passArgumentsOnStack,
+    passArgumentsOnStackForSubroutines,
+)
+
+
+def test_loadArgument():
+    assert loadArgument(0, False) == [TealOp(None, Op.dup)]
+    assert loadArgument(2, False) == [TealOp(None, Op.dig, 2)]
+    assert loadArgument(0, True) == []
+    assert loadArgument(1, True) == [TealOp(None, Op.swap)]
+    assert loadArgument(3, True) == [TealOp(None, Op.uncover, 3)]
+
+
+def test_removeArguments():
+    assert removeArguments(0, True) == []
+    assert removeArguments(1, False) == [TealOp(None, Op.pop)]
+    assert removeArguments(1, True) == [TealOp(None, Op.swap), TealOp(None, Op.pop)]
+    assert removeArguments(2, True) == [
+        TealOp(None, Op.cover, 2),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.pop),
+    ]
+
+
+def test_passArgumentsOnStack_consume():
+    def subImpl(a, b):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    slotA = ScratchSlot()
+    slotB = ScratchSlot()
+    ops = [
+        TealOp(None, Op.store, slotB),
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.load, slotB),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.retsub),
+    ]
+
+    # b is already on top of the stack, and a is swapped above it
+    assert passArgumentsOnStack(subroutine, ops) == [
+        TealOp(None, Op.swap),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.retsub),
+    ]
+
+
+def test_passArgumentsOnStack_branches():
+    def subImpl(a, b):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    slotA = ScratchSlot()
+    slotB = ScratchSlot()
+    l1 = LabelReference("l1")
+    l2 = LabelReference("l2")
+    ops = [
+        TealOp(None, Op.store, slotB),
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.load, slotB),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.load, slotB),
+        TealOp(None, Op.add),
+        TealLabel(None, l2),
+        TealOp(None, Op.retsub),
+    ]
+
+    # a is used once before any branch, so it is moved. b is used in both branches, so it is
+    # copied and removed before returning
+    assert passArgumentsOnStack(subroutine, ops) == [
+        TealOp(None, Op.swap),
+        TealOp(None, Op.bnz, l1),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.b, l2),
+        TealLabel(None, l1),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.dig, 1),
+        TealOp(None, Op.add),
+        TealLabel(None, l2),
+        TealOp(None, Op.swap),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.retsub),
+    ]
+
+
+def test_passArgumentsOnStack_no_return_value():
+    def subImpl(a, b):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.none)
+
+    slotA = ScratchSlot()
+    slotB = ScratchSlot()
+    ops = [
+        TealOp(None, Op.store, slotB),
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.app_global_put),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert passArgumentsOnStack(subroutine, ops) == [
+        TealOp(None, Op.dig, 1),
+        TealOp(None, Op.dig, 2),
+        TealOp(None, Op.app_global_put),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.pop),
+        TealOp(None, Op.retsub),
+    ]
+
+
+def test_passArgumentsOnStack_argument_modified():
+    def subImpl(a):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    slotA = ScratchSlot()
+    ops = [
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert passArgumentsOnStack(subroutine, ops) is None
+
+
+def test_passArgumentsOnStack_unbalanced_return():
+    def subImpl(a):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    slotA = ScratchSlot()
+    ops = [
+        TealOp(None, Op.store, slotA),
+        TealOp(None, Op.load, slotA),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.retsub),
+    ]
+
+    assert passArgumentsOnStack(subroutine, ops) is None
+
+
+def test_passArgumentsOnStackForSubroutines():
+    def cheapImpl(a):
+        return None
+
+    def expensiveImpl(a):
+        return None
+
+    def recursiveImpl(a):
+        return None
+
+    cheap = SubroutineDefinition(cheapImpl, TealType.uint64)
+    expensive = SubroutineDefinition(expensiveImpl, TealType.uint64)
+    recursive = SubroutineDefinition(recursiveImpl, TealType.uint64)
+
+    mainOps = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.callsub, cheap),
+        TealOp(None, Op.callsub, expensive),
+        TealOp(None, Op.callsub, recursive),
+        TealOp(None, Op.return_),
+    ]
+
+    cheapSlot = ScratchSlot()
+    cheapOps = [
+        TealOp(None, Op.store, cheapSlot),
+        TealOp(None, Op.load, cheapSlot),
+        TealOp(None, Op.logic_not),
+        TealOp(None, Op.retsub),
+    ]
+
+    # the argument must be copied and removed, which is not cheaper than a store and a load
+    expensiveSlot = ScratchSlot()
+    l1 = LabelReference("l1")
+    expensiveOps = [
+        TealOp(None, Op.store, expensiveSlot),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.bnz, l1),
+        TealLabel(None, l1),
+        TealOp(None, Op.load, expensiveSlot),
+        TealOp(None, Op.retsub),
+    ]
+
+    recursiveSlot = ScratchSlot()
+    recursiveOps = [
+        TealOp(None, Op.store, recursiveSlot),
+        TealOp(None, Op.load, recursiveSlot),
+        TealOp(None, Op.callsub, recursive),
+        TealOp(None, Op.retsub),
+    ]
+
+    subroutineMapping = {
+        None: mainOps,
+        cheap: cheapOps,
+        expensive: expensiveOps,
+        recursive: recursiveOps,
+    }
+
+    subroutineGraph = {
+        cheap: set(),
+        expensive: set(),
+        recursive: {recursive},
+    }
+
+    assert passArgumentsOnStackForSubroutines(subroutineMapping, subroutineGraph) == 1
+
+    assert subroutineMapping == {
+        None: mainOps,
+        cheap: [
+            TealOp(None, Op.logic_not),
+            TealOp(None, Op.retsub),
+        ],
+        expensive: expensiveOps,
+        recursive: recursiveOps,
+    }
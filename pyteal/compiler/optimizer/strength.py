@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Tuple
+
+from ...ir import Op, TealOp, TealBlock
+from .select import ANY, Pattern, Rewrite, intValue, selectOps
+
+# The ops which multiply the value on top of the stack by itself to raise it to each exponent. These
+# only overflow when the final result overflows, like exp.
+multiplyChains: Dict[int, List[Op]] = {
+    2: [Op.dup, Op.mul],
+    3: [Op.dup, Op.dup, Op.mul, Op.mul],
+    4: [Op.dup, Op.mul, Op.dup, Op.mul],
+}
+
+
+def powerOfTwo(value: Optional[int]) -> Optional[int]:
+    """Get the exponent k such that value is 2**k, or None if value is not a power of two."""
+    if value is None or value <= 0 or value & (value - 1) != 0:
+        return None
+    return value.bit_length() - 1
+
+
+def removeIdentity(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # x * 1, x / 1 or x ** 1
+    constantOp, _ = matched
+    if intValue(constantOp) != 1:
+        return None
+    return []
+
+
+def divideWithShift(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # x / 2**k
+    constantOp, divOp = matched
+    exponent = powerOfTwo(intValue(constantOp))
+    if exponent is None:
+        return None
+    return [TealOp(constantOp.expr, Op.int, exponent), TealOp(divOp.expr, Op.shr)]
+
+
+def modWithMask(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # x % 2**k
+    constantOp, modOp = matched
+    value = intValue(constantOp)
+    if powerOfTwo(value) is None:
+        return None
+    return [
+        TealOp(constantOp.expr, Op.int, value - 1),  # type: ignore
+        TealOp(modOp.expr, Op.bitwise_and),
+    ]
+
+
+def exponentWithMultiplies(matched: List[TealOp]) -> Optional[List[TealOp]]:
+    # x ** e
+    constantOp, expOp = matched
+    exponent = intValue(constantOp)
+    if exponent not in multiplyChains:
+        return None
+    return [TealOp(expOp.expr, op) for op in multiplyChains[exponent]]  # type: ignore
+
+
+# The patterns which may be rewritten, and the rewrites which can replace each pattern. Multiplying
+# by a power of two is never replaced with shl, since shl does not fail when the result overflows.
+strengthReductionRules: List[Tuple[Pattern, List[Rewrite]]] = [
+    ((Op.mul, ANY, (Op.int,)), [removeIdentity]),
+    ((Op.div, ANY, (Op.int,)), [removeIdentity, divideWithShift]),
+    ((Op.mod, ANY, (Op.int,)), [modWithMask]),
+    ((Op.exp, ANY, (Op.int,)), [removeIdentity, exponentWithMultiplies]),
+]
+
+
+def reduceStrength(start: TealBlock, version: int) -> int:
+    """Replace arithmetic by constants with cheaper ops in every block of a graph.
+
+    Division by a power of two is replaced with shr, the remainder of division by a power of two
+    with a bitwise and, and small constant exponents with multiplications. Multiplying, dividing or
+    raising a value to the power of 1 is removed. Each replacement is only made if it uses less
+    opcode budget, or the same budget and fewer bytes, according to getOpsCost.
+
+    This function modifies the ops of the blocks in the graph in place.
+
+    Args:
+        start: The starting block of the graph.
+        version: The TEAL version being compiled.
+
+    Returns:
+        The number of replacements that were made.
+    """
+    replaced = 0
+    for block in TealBlock.Iterate(start):
+        block.ops, count = selectOps(block.ops, version, strengthReductionRules)
+        replaced += count
+    return replaced
@@ -0,0 +1,90 @@
+from ... import *
+
+from .strength import powerOfTwo, reduceStrength
+
+
+def test_powerOfTwo():
+    assert powerOfTwo(None) is None
+    assert powerOfTwo(0) is None
+    assert powerOfTwo(1) == 0
+    assert powerOfTwo(2) == 1
+    assert powerOfTwo(6) is None
+    assert powerOfTwo(2 ** 63) == 63
+
+
+def reduce(ops, version=4):
+    block = TealSimpleBlock(ops)
+    replaced = reduceStrength(block, version)
+    return block.ops, replaced
+
+
+def test_reduceStrength_identity():
+    for op in (Op.mul, Op.div, Op.exp):
+        ops = [TealOp(None, Op.txn, "Fee"), TealOp(None, Op.int, 1), TealOp(None, op)]
+        assert reduce(ops) == ([TealOp(None, Op.txn, "Fee")], 1)
+
+
+def test_reduceStrength_div():
+    ops = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 2 ** 40),
+        TealOp(None, Op.div),
+    ]
+    expected = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 40),
+        TealOp(None, Op.shr),
+    ]
+    assert reduce(ops) == (expected, 1)
+
+    # shr is not available before TEAL version 4
+    assert reduce(ops, 3) == (ops, 0)
+
+    # dividing by a small power of two is not any cheaper
+    ops[1] = TealOp(None, Op.int, 8)
+    assert reduce(ops) == (ops, 0)
+
+    # division by 0 still fails
+    ops[1] = TealOp(None, Op.int, 0)
+    assert reduce(ops) == (ops, 0)
+
+
+def test_reduceStrength_mod():
+    ops = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 128),
+        TealOp(None, Op.mod),
+    ]
+    expected = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 127),
+        TealOp(None, Op.bitwise_and),
+    ]
+    assert reduce(ops, 2) == (expected, 1)
+
+    ops[1] = TealOp(None, Op.int, 100)
+    assert reduce(ops) == (ops, 0)
+
+
+def test_reduceStrength_exp():
+    ops = [TealOp(None, Op.txn, "Fee"), TealOp(None, Op.int, 2), TealOp(None, Op.exp)]
+    expected = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.mul),
+    ]
+    assert reduce(ops) == (expected, 1)
+
+    # longer multiply chains use more opcode budget than exp
+    ops[1] = TealOp(None, Op.int, 3)
+    assert reduce(ops) == (ops, 0)
+
+
+def test_reduceStrength_mul():
+    # shl does not fail on overflow
+    ops = [
+        TealOp(None, Op.txn, "Fee"),
+        TealOp(None, Op.int, 2 ** 40),
+        TealOp(None, Op.mul),
+    ]
+    assert reduce(ops) == (ops, 0)
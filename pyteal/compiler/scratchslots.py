@@ -4,6 +4,8 @@ from ..ast import ScratchSlot, SubroutineDefinition
 from ..ir import Mode, TealComponent, TealBlock
 from ..errors import TealInputError, TealInternalError
 from ..config import NUM_SLOTS
+from .optimizer.liveness import findLiveSlots, slotDefinitions, hasDynamicSlotAccess
+from .subroutines import depthFirstSearch
 
 
 def collectScratchSlots(
@@ -32,9 +34,173 @@ def collectScratchSlots(
     return subroutineSlots
 
 
+def findInterferingSlots(
+    ops: List[TealComponent], slots: Set[ScratchSlot]
+) -> Dict[ScratchSlot, Set[ScratchSlot]]:
+    """Build the interference graph of some of the slots referenced by a subroutine.
+
+    Two slots interfere if one of them is stored to while the other one is live. Slots which do not
+    interfere with each other can safely be assigned the same slot ID.
+
+    Args:
+        ops: The list of TealComponents which make up a subroutine.
+        slots: The slots to include in the graph. Slots in ops that are not in this set are ignored.
+
+    Returns:
+        A dictionary whose keys are the elements of slots, and whose values are the sets of slots
+        that each key interferes with.
+    """
+    interference: Dict[ScratchSlot, Set[ScratchSlot]] = {slot: set() for slot in slots}
+    liveOut = findLiveSlots(ops)
+
+    for i, stmt in enumerate(ops):
+        for defined in slotDefinitions(stmt):
+            if defined not in interference:
+                continue
+            for live in liveOut[i]:
+                if live is not defined and live in interference:
+                    interference[cast(ScratchSlot, defined)].add(
+                        cast(ScratchSlot, live)
+                    )
+                    interference[cast(ScratchSlot, live)].add(
+                        cast(ScratchSlot, defined)
+                    )
+
+    return interference
+
+
+def colorSlots(
+    interference: Dict[ScratchSlot, Set[ScratchSlot]]
+) -> List[List[ScratchSlot]]:
+    """Partition slots into groups that can each share a single slot ID.
+
+    This greedily colors the interference graph, visiting slots in the order they were created.
+
+    Args:
+        interference: An interference graph, as returned by findInterferingSlots.
+
+    Returns:
+        A list of groups of slots, such that no two slots in the same group interfere.
+    """
+    colors: Dict[ScratchSlot, int] = dict()
+    groups: List[List[ScratchSlot]] = []
+
+    for slot in sorted(interference.keys(), key=lambda slot: slot.id):
+        neighborColors = set(
+            colors[neighbor] for neighbor in interference[slot] if neighbor in colors
+        )
+        color = 0
+        while color in neighborColors:
+            color += 1
+
+        colors[slot] = color
+        if color == len(groups):
+            groups.append([])
+        groups[color].append(slot)
+
+    return groups
+
+
+def findOverlappingSubroutines(
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
+    subroutines: List[Optional[SubroutineDefinition]],
+) -> Dict[Optional[SubroutineDefinition], Set[Optional[SubroutineDefinition]]]:
+    """Find which subroutines may be executing at the same time.
+
+    Two subroutines may be executing at the same time if one of them can be reached from the other
+    in the call graph, i.e. if they may appear together on a call chain. The main routine is
+    executing during every subroutine.
+
+    Args:
+        subroutineGraph: A graph of subroutines. Each key is a subroutine (the main routine should
+            not be present), which represents a node in the graph. Each value is a set of all
+            subroutines that specific subroutine calls, which represent directional edges in the
+            graph.
+        subroutines: The subroutines to check. The value None is taken to mean the main program
+            routine.
+
+    Returns:
+        A dictionary whose keys are the elements of subroutines, and whose values are the other
+        subroutines which may be executing at the same time as each key.
+    """
+    overlapping: Dict[
+        Optional[SubroutineDefinition], Set[Optional[SubroutineDefinition]]
+    ] = {subroutine: set() for subroutine in subroutines}
+
+    for i, subroutine in enumerate(subroutines):
+        for other in subroutines[i + 1 :]:
+            if (
+                subroutine is None
+                or other is None
+                or depthFirstSearch(subroutineGraph, subroutine, other)
+                or depthFirstSearch(subroutineGraph, other, subroutine)
+            ):
+                overlapping[subroutine].add(other)
+                overlapping[other].add(subroutine)
+
+    return overlapping
+
+
+def shareLocalSlotGroups(
+    localGroups: Dict[Optional[SubroutineDefinition], List[List[ScratchSlot]]],
+    overlapping: Dict[
+        Optional[SubroutineDefinition], Set[Optional[SubroutineDefinition]]
+    ],
+) -> List[List[ScratchSlot]]:
+    """Merge the local slot groups of subroutines which are never executing at the same time.
+
+    Local slots are always stored to before they are loaded in each invocation of a subroutine, so
+    their values do not need to be preserved after the subroutine returns. This means local slots of
+    different subroutines can share a slot ID as long as those subroutines are never executing at
+    the same time.
+
+    Args:
+        localGroups: A mapping from each subroutine to the groups of its local slots which will
+            each be assigned a single slot ID.
+        overlapping: The output of findOverlappingSubroutines for the keys of localGroups.
+
+    Returns:
+        A list of groups of slots which can each share a single slot ID.
+    """
+    sharedGroups: List[List[ScratchSlot]] = []
+    # the indexes in sharedGroups used by each subroutine
+    usedIndexes: Dict[Optional[SubroutineDefinition], Set[int]] = dict()
+
+    # visit the subroutines with the most groups first, so that they claim the lowest indexes
+    order = sorted(
+        localGroups.keys(),
+        key=lambda subroutine: (
+            -len(localGroups[subroutine]),
+            subroutine.id if subroutine is not None else -1,
+        ),
+    )
+
+    for subroutine in order:
+        unavailable: Set[int] = set()
+        for other in overlapping[subroutine]:
+            unavailable |= usedIndexes.get(other, set())
+
+        usedIndexes[subroutine] = set()
+        index = 0
+        for group in localGroups[subroutine]:
+            while index in unavailable:
+                index += 1
+
+            if index == len(sharedGroups):
+                sharedGroups.append([])
+            sharedGroups[index] += group
+            usedIndexes[subroutine].add(index)
+            index += 1
+
+    return sharedGroups
+
+
 def assignScratchSlotsToSubroutines(
     subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
     subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    *,
+    reuseSlots: bool = False,
+    subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]] = None,
 ) -> Dict[Optional[SubroutineDefinition], Set[int]]:
     """Assign scratch slot values for an entire program.
 
@@ -43,6 +209,12 @@ def assignScratchSlotsToSubroutines(
             subroutine. The key None is taken to mean the main program routine. The values of this
             map will be modified in order to assign specific slot values to all referenced scratch
             slots.
+        reuseSlots (optional): If true, local slots of the same subroutine whose live ranges do not
+            overlap will be assigned the same slot ID. Slots that are referenced by more than one
+            subroutine and manually reserved slots are never shared. Defaults to false.
+        subroutineGraph (optional): The call graph of the program's subroutines, as built by
+            compileSubroutine. If provided along with reuseSlots, local slots of subroutines which
+            never appear together on a call chain will also be assigned the same slot IDs.
 
     Raises:
         TealInternalError: if the scratch slots referenced by the program do not fit into 256 slots,
@@ -76,11 +248,43 @@ def assignScratchSlotsToSubroutines(
         globalSlots |= slots & allOtherSlots
         localSlots[subroutine] = slots - globalSlots
 
-    if len(allSlots) > NUM_SLOTS:
-        # TODO: identify which slots can be reused
-        # subroutines which never invoke each other can use the same slot ID for local slots
+    # groups of slots which will be assigned the same ID. Without reuseSlots, each slot is in its
+    # own group
+    slotGroups: List[List[ScratchSlot]] = [
+        [slot] for slot in globalSlots if not slot.isReservedSlot
+    ]
+    localGroups: Dict[Optional[SubroutineDefinition], List[List[ScratchSlot]]] = dict()
+    for subroutine, slots in localSlots.items():
+        unreservedSlots = set(slot for slot in slots if not slot.isReservedSlot)
+        ops = subroutineMapping[subroutine]
+        if reuseSlots and not hasDynamicSlotAccess(ops):
+            localGroups[subroutine] = colorSlots(
+                findInterferingSlots(ops, unreservedSlots)
+            )
+        else:
+            localGroups[subroutine] = [[slot] for slot in unreservedSlots]
+
+    if (
+        reuseSlots
+        and subroutineGraph is not None
+        and not any(hasDynamicSlotAccess(ops) for ops in subroutineMapping.values())
+    ):
+        # Recursive subroutines overlap with themselves and with every subroutine on their cycle,
+        # so only their own slots are ever shared with them, and those are spilled during recursion
+        overlapping = findOverlappingSubroutines(
+            subroutineGraph, list(localGroups.keys())
+        )
+        slotGroups += shareLocalSlotGroups(localGroups, overlapping)
+    else:
+        for groups in localGroups.values():
+            slotGroups += groups
+
+    numReservedSlots = sum(1 for slot in allSlots if slot.isReservedSlot)
+    numSlotIds = len(slotGroups) + numReservedSlots
+
+    if numSlotIds > NUM_SLOTS:
         raise TealInternalError(
-            "Too many slots in use: {}, maximum is {}".format(len(allSlots), NUM_SLOTS)
+            "Too many slots in use: {}, maximum is {}".format(numSlotIds, NUM_SLOTS)
         )
 
     # verify that all local slots are assigned to before being loaded.
@@ -107,19 +311,18 @@ def assignScratchSlotsToSubroutines(
                 "Slot ID {} has been assigned multiple times".format(slot.id)
             )
         slotIds.add(slot.id)
+        # Slot ids under 256 are manually reserved slots
+        slotAssignments[slot] = slot.id
 
     nextSlotIndex = 0
-    for slot in sorted(allSlots, key=lambda slot: slot.id):
+    for group in sorted(slotGroups, key=lambda group: min(slot.id for slot in group)):
         # Find next vacant slot that compiler can assign to
         while nextSlotIndex in slotIds:
             nextSlotIndex += 1
 
-        if slot.isReservedSlot:
-            # Slot ids under 256 are manually reserved slots
-            slotAssignments[slot] = slot.id
-        else:
+        for slot in group:
             slotAssignments[slot] = nextSlotIndex
-            slotIds.add(nextSlotIndex)
+        slotIds.add(nextSlotIndex)
 
     for ops in subroutineMapping.values():
         for stmt in ops:
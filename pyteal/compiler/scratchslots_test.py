@@ -2,7 +2,14 @@ import pytest
 
 from .. import *
 
-from .scratchslots import collectScratchSlots, assignScratchSlotsToSubroutines
+from .scratchslots import (
+    collectScratchSlots,
+    findInterferingSlots,
+    colorSlots,
+    findOverlappingSubroutines,
+    shareLocalSlotGroups,
+    assignScratchSlotsToSubroutines,
+)
 
 
 def test_collectScratchSlots():
@@ -455,3 +462,383 @@ def test_assignScratchSlotsToSubroutines_slot_used_before_assignment():
 
     with pytest.raises(TealInternalError):
         assignScratchSlotsToSubroutines(subroutineMapping, subroutineBlocks)
+
+
+def test_findInterferingSlots():
+    slot1 = ScratchSlot()
+    slot2 = ScratchSlot()
+    slot3 = ScratchSlot()
+    ignoredSlot = ScratchSlot()
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, slot1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.store, ignoredSlot),
+        TealOp(None, Op.int, 3),
+        TealOp(None, Op.store, slot2),
+        TealOp(None, Op.load, slot1),
+        TealOp(None, Op.load, slot2),
+        TealOp(None, Op.add),
+        TealOp(None, Op.store, slot3),
+        TealOp(None, Op.load, slot3),
+        TealOp(None, Op.load, ignoredSlot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+
+    actual = findInterferingSlots(ops, {slot1, slot2, slot3})
+
+    assert actual == {slot1: {slot2}, slot2: {slot1}, slot3: set()}
+
+
+def test_findInterferingSlots_dead_store():
+    # a store to a slot that is never loaded must still not overwrite a live slot
+    slot1 = ScratchSlot()
+    slot2 = ScratchSlot()
+    ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, slot1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.store, slot2),
+        TealOp(None, Op.load, slot1),
+        TealOp(None, Op.return_),
+    ]
+
+    actual = findInterferingSlots(ops, {slot1, slot2})
+
+    assert actual == {slot1: {slot2}, slot2: {slot1}}
+
+
+def test_colorSlots():
+    slot1 = ScratchSlot()
+    slot2 = ScratchSlot()
+    slot3 = ScratchSlot()
+    slot4 = ScratchSlot()
+
+    interference = {
+        slot1: {slot2},
+        slot2: {slot1, slot3},
+        slot3: {slot2},
+        slot4: set(),
+    }
+
+    assert colorSlots(interference) == [[slot1, slot3, slot4], [slot2]]
+    assert colorSlots({}) == []
+
+
+def test_assignScratchSlotsToSubroutines_reuse_slots():
+    def subImpl():
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    globalSlot = ScratchSlot()
+    reservedSlot = ScratchSlot(0)
+
+    mainSlot1 = ScratchSlot()
+    mainSlot2 = ScratchSlot()
+    mainSlot3 = ScratchSlot()
+    mainOps = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, globalSlot),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.store, mainSlot1),
+        TealOp(None, Op.load, mainSlot1),
+        TealOp(None, Op.store, reservedSlot),
+        TealOp(None, Op.int, 3),
+        TealOp(None, Op.store, mainSlot2),
+        TealOp(None, Op.load, mainSlot2),
+        TealOp(None, Op.store, mainSlot3),
+        TealOp(None, Op.load, mainSlot3),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.return_),
+    ]
+
+    subroutineSlot1 = ScratchSlot()
+    subroutineSlot2 = ScratchSlot()
+    subroutineOps = [
+        TealOp(None, Op.store, subroutineSlot1),
+        TealOp(None, Op.load, subroutineSlot1),
+        TealOp(None, Op.store, subroutineSlot2),
+        TealOp(None, Op.load, subroutineSlot2),
+        TealOp(None, Op.load, globalSlot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+    ]
+
+    subroutineMapping = {
+        None: mainOps,
+        subroutine: subroutineOps,
+    }
+
+    subroutineBlocks = {
+        None: TealSimpleBlock(mainOps),
+        subroutine: TealSimpleBlock(subroutineOps),
+    }
+
+    actual = assignScratchSlotsToSubroutines(
+        subroutineMapping, subroutineBlocks, reuseSlots=True
+    )
+
+    # the reserved slot keeps its ID, the global slot is not shared, and the local slots of each
+    # subroutine share a single ID that is distinct from the other subroutine's
+    assert actual == {None: {0, 2}, subroutine: {3}}
+
+    assert mainOps == [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, 1),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.store, 2),
+        TealOp(None, Op.load, 2),
+        TealOp(None, Op.store, 0),
+        TealOp(None, Op.int, 3),
+        TealOp(None, Op.store, 2),
+        TealOp(None, Op.load, 2),
+        TealOp(None, Op.store, 2),
+        TealOp(None, Op.load, 2),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.return_),
+    ]
+
+    assert subroutineOps == [
+        TealOp(None, Op.store, 3),
+        TealOp(None, Op.load, 3),
+        TealOp(None, Op.store, 3),
+        TealOp(None, Op.load, 3),
+        TealOp(None, Op.load, 1),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+    ]
+
+
+def test_assignScratchSlotsToSubroutines_reuse_slots_too_many():
+    slots = [ScratchSlot() for _ in range(NUM_SLOTS + 1)]
+    ops = []
+    for slot in slots:
+        ops += [TealOp(None, Op.int, 1), TealOp(None, Op.store, slot)]
+    for slot in slots:
+        ops += [TealOp(None, Op.load, slot), TealOp(None, Op.pop)]
+    ops.append(TealOp(None, Op.return_))
+
+    subroutineMapping = {None: ops}
+    subroutineBlocks = {None: TealSimpleBlock(ops)}
+
+    # all slots are live at the same time, so none can be reused
+    with pytest.raises(TealInternalError):
+        assignScratchSlotsToSubroutines(
+            subroutineMapping, subroutineBlocks, reuseSlots=True
+        )
+
+
+def test_findOverlappingSubroutines():
+    def sub1Impl():
+        return None
+
+    def sub2Impl(a1):
+        return None
+
+    def sub3Impl(a1, a2):
+        return None
+
+    def sub4Impl(a1, a2, a3):
+        return None
+
+    subroutine1 = SubroutineDefinition(sub1Impl, TealType.uint64)
+    subroutine2 = SubroutineDefinition(sub2Impl, TealType.uint64)
+    subroutine3 = SubroutineDefinition(sub3Impl, TealType.uint64)
+    subroutine4 = SubroutineDefinition(sub4Impl, TealType.uint64)
+
+    # subroutine1 calls subroutine2, and subroutine3 and subroutine4 call each other
+    subroutineGraph = {
+        subroutine1: {subroutine2},
+        subroutine2: set(),
+        subroutine3: {subroutine4},
+        subroutine4: {subroutine3},
+    }
+
+    actual = findOverlappingSubroutines(
+        subroutineGraph, [None, subroutine1, subroutine2, subroutine3, subroutine4]
+    )
+
+    assert actual == {
+        None: {subroutine1, subroutine2, subroutine3, subroutine4},
+        subroutine1: {None, subroutine2},
+        subroutine2: {None, subroutine1},
+        subroutine3: {None, subroutine4},
+        subroutine4: {None, subroutine3},
+    }
+
+
+def test_shareLocalSlotGroups():
+    def sub1Impl():
+        return None
+
+    def sub2Impl(a1):
+        return None
+
+    def sub3Impl(a1, a2):
+        return None
+
+    subroutine1 = SubroutineDefinition(sub1Impl, TealType.uint64)
+    subroutine2 = SubroutineDefinition(sub2Impl, TealType.uint64)
+    subroutine3 = SubroutineDefinition(sub3Impl, TealType.uint64)
+
+    mainSlot = ScratchSlot()
+    sub1Slot1 = ScratchSlot()
+    sub1Slot2 = ScratchSlot()
+    sub2Slot = ScratchSlot()
+    sub3Slot = ScratchSlot()
+
+    localGroups = {
+        None: [[mainSlot]],
+        subroutine1: [[sub1Slot1], [sub1Slot2]],
+        subroutine2: [[sub2Slot]],
+        subroutine3: [[sub3Slot]],
+    }
+
+    # subroutine1 calls subroutine3, and subroutine2 is independent of both
+    overlapping = {
+        None: {subroutine1, subroutine2, subroutine3},
+        subroutine1: {None, subroutine3},
+        subroutine2: {None},
+        subroutine3: {None, subroutine1},
+    }
+
+    actual = shareLocalSlotGroups(localGroups, overlapping)
+
+    assert actual == [
+        [sub1Slot1, sub2Slot],
+        [sub1Slot2],
+        [mainSlot],
+        [sub3Slot],
+    ]
+
+
+def test_assignScratchSlotsToSubroutines_reuse_slots_across_subroutines():
+    def sub1Impl():
+        return None
+
+    def sub2Impl(a1):
+        return None
+
+    subroutine1 = SubroutineDefinition(sub1Impl, TealType.uint64)
+    subroutine2 = SubroutineDefinition(sub2Impl, TealType.uint64)
+
+    mainSlot = ScratchSlot()
+    sub1Slot = ScratchSlot()
+    sub2Slot = ScratchSlot()
+
+    mainOps = [
+        TealOp(None, Op.callsub, subroutine1),
+        TealOp(None, Op.store, mainSlot),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.callsub, subroutine2),
+        TealOp(None, Op.load, mainSlot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.return_),
+    ]
+
+    sub1Ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, sub1Slot),
+        TealOp(None, Op.load, sub1Slot),
+        TealOp(None, Op.retsub),
+    ]
+
+    sub2Ops = [
+        TealOp(None, Op.store, sub2Slot),
+        TealOp(None, Op.load, sub2Slot),
+        TealOp(None, Op.retsub),
+    ]
+
+    subroutineMapping = {
+        None: mainOps,
+        subroutine1: sub1Ops,
+        subroutine2: sub2Ops,
+    }
+
+    subroutineGraph = {
+        subroutine1: set(),
+        subroutine2: set(),
+    }
+
+    subroutineBlocks = {
+        None: TealSimpleBlock(mainOps),
+        subroutine1: TealSimpleBlock(sub1Ops),
+        subroutine2: TealSimpleBlock(sub2Ops),
+    }
+
+    actual = assignScratchSlotsToSubroutines(
+        subroutineMapping,
+        subroutineBlocks,
+        reuseSlots=True,
+        subroutineGraph=subroutineGraph,
+    )
+
+    assert actual == {None: {0}, subroutine1: {1}, subroutine2: {1}}
+
+    assert mainOps[1] == TealOp(None, Op.store, 0)
+    assert sub1Ops[1] == TealOp(None, Op.store, 1)
+    assert sub2Ops[0] == TealOp(None, Op.store, 1)
+
+
+def test_assignScratchSlotsToSubroutines_reuse_slots_nested_subroutines():
+    def sub1Impl():
+        return None
+
+    def sub2Impl(a1):
+        return None
+
+    subroutine1 = SubroutineDefinition(sub1Impl, TealType.uint64)
+    subroutine2 = SubroutineDefinition(sub2Impl, TealType.uint64)
+
+    sub1Slot = ScratchSlot()
+    sub2Slot = ScratchSlot()
+
+    mainOps = [
+        TealOp(None, Op.callsub, subroutine1),
+        TealOp(None, Op.return_),
+    ]
+
+    sub1Ops = [
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.store, sub1Slot),
+        TealOp(None, Op.int, 2),
+        TealOp(None, Op.callsub, subroutine2),
+        TealOp(None, Op.load, sub1Slot),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+    ]
+
+    sub2Ops = [
+        TealOp(None, Op.store, sub2Slot),
+        TealOp(None, Op.load, sub2Slot),
+        TealOp(None, Op.retsub),
+    ]
+
+    subroutineMapping = {
+        None: mainOps,
+        subroutine1: sub1Ops,
+        subroutine2: sub2Ops,
+    }
+
+    subroutineGraph = {
+        subroutine1: {subroutine2},
+        subroutine2: set(),
+    }
+
+    subroutineBlocks = {
+        None: TealSimpleBlock(mainOps),
+        subroutine1: TealSimpleBlock(sub1Ops),
+        subroutine2: TealSimpleBlock(sub2Ops),
+    }
+
+    actual = assignScratchSlotsToSubroutines(
+        subroutineMapping,
+        subroutineBlocks,
+        reuseSlots=True,
+        subroutineGraph=subroutineGraph,
+    )
+
+    # subroutine1 is still executing while subroutine2 runs, so their slots cannot be shared
+    assert actual == {None: set(), subroutine1: {0}, subroutine2: {1}}
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Set, Tuple
 
 from ..ir import TealBlock
 from ..errors import TealInternalError
@@ -41,3 +41,159 @@ def sortBlocks(start: TealBlock, end: TealBlock) -> List[TealBlock]:
     order.append(end)
 
     return order
+
+
+# The factor by which edges inside a loop are assumed to execute more often than edges outside it.
+LOOP_WEIGHT = 10
+
+
+def findLoopDepths(blocks: List[TealBlock]) -> List[int]:
+    """Find the number of loops which contain each block.
+
+    Args:
+        blocks: A list of all TealBlocks in a graph, where the first element is the starting block.
+
+    Returns:
+        A list the same length as blocks, where each element is the number of distinct loops that
+        contain the block at that index. A loop is identified by its header, the target of a back
+        edge found during a depth first search from the starting block.
+    """
+    indexes = {id(block): i for i, block in enumerate(blocks)}
+    successors = [[indexes[id(b)] for b in block.getOutgoing()] for block in blocks]
+    predecessors: List[List[int]] = [[] for _ in blocks]
+    for i, outgoing in enumerate(successors):
+        for j in outgoing:
+            predecessors[j].append(i)
+
+    # find back edges with an iterative depth first search
+    backEdges: List[Tuple[int, int]] = []
+    onStack = [False for _ in blocks]
+    visited = [False for _ in blocks]
+    stack: List[Tuple[int, int]] = [(0, 0)]
+    visited[0] = True
+    onStack[0] = True
+    while len(stack) != 0:
+        node, nextSuccessor = stack[-1]
+        if nextSuccessor < len(successors[node]):
+            stack[-1] = (node, nextSuccessor + 1)
+            successor = successors[node][nextSuccessor]
+            if onStack[successor]:
+                backEdges.append((node, successor))
+            elif not visited[successor]:
+                visited[successor] = True
+                onStack[successor] = True
+                stack.append((successor, 0))
+        else:
+            onStack[node] = False
+            stack.pop()
+
+    # the body of each loop is its header plus every block that can reach a back edge to the
+    # header without passing through the header
+    loopBodies: Dict[int, Set[int]] = dict()
+    for source, header in backEdges:
+        body = loopBodies.setdefault(header, {header})
+        worklist = [source]
+        while len(worklist) != 0:
+            node = worklist.pop()
+            if node in body:
+                continue
+            body.add(node)
+            worklist += predecessors[node]
+
+    depths = [0 for _ in blocks]
+    for body in loopBodies.values():
+        for node in body:
+            depths[node] += 1
+
+    return depths
+
+
+def countJumps(order: List[TealBlock], weights: Dict[int, int] = None) -> int:
+    """Count the unconditional jumps that flattenBlocks will emit for a list of blocks.
+
+    Args:
+        order: The blocks, in the order they will be flattened.
+        weights (optional): A mapping from the id of each block to the number of times a jump at
+            the end of that block is counted. If not present, every jump is counted once.
+    """
+    jumps = 0
+    for i, block in enumerate(order):
+        following = order[i + 1] if i + 1 < len(order) else None
+        outgoing = block.getOutgoing()
+        if len(outgoing) != 0 and all(b is not following for b in outgoing):
+            jumps += weights[id(block)] if weights is not None else 1
+    return jumps
+
+
+def layoutBlocks(start: TealBlock, end: TealBlock) -> List[TealBlock]:
+    """Order the blocks of a graph so that as many branches as possible fall through.
+
+    This follows the chain merging approach of Pettis and Hansen. Every edge of the graph is given
+    a weight estimating how often it executes, which is multiplied by LOOP_WEIGHT for each loop
+    that contains it. Starting from a chain of a single block for each block, edges are visited
+    from heaviest to lightest, and if an edge leads from the last block of a chain to the first
+    block of another chain, the two chains are joined, so that the edge becomes a fall through and
+    needs no jump. Finally the chains are placed one after another, beginning with the chain
+    containing the starting block and ending with the chain containing the end block. If the
+    resulting order would execute as many jumps as the depth first order from sortBlocks, taking
+    the weights into account, the depth first order is returned instead.
+
+    Args:
+        start: The starting point of the graph to sort.
+        end: The block which should appear last. If it has outgoing blocks, the chain which
+            contains it appears last instead.
+
+    Returns:
+        An ordered list of all TealBlocks reachable from start, beginning with start.
+    """
+    # use the depth first order to break ties, so that the result is deterministic
+    blocks = sortBlocks(start, end)
+    indexes = {id(block): i for i, block in enumerate(blocks)}
+    depths = findLoopDepths(blocks)
+
+    edges: List[Tuple[int, int, int]] = []
+    for i, block in enumerate(blocks):
+        for block2 in block.getOutgoing():
+            j = indexes[id(block2)]
+            weight = LOOP_WEIGHT ** min(depths[i], depths[j])
+            edges.append((-weight, i, j))
+    edges.sort()
+
+    # the chain containing each block, and the blocks in each chain
+    chainOf = list(range(len(blocks)))
+    chains: Dict[int, List[int]] = {i: [i] for i in range(len(blocks))}
+
+    for _, source, target in edges:
+        sourceChain = chains[chainOf[source]]
+        targetChain = chains[chainOf[target]]
+        if (
+            target == 0
+            or sourceChain is targetChain
+            or sourceChain[-1] != source
+            or targetChain[0] != target
+        ):
+            continue
+
+        sourceChain += targetChain
+        del chains[chainOf[target]]
+        for node in targetChain:
+            chainOf[node] = chainOf[source]
+
+    endChain = chainOf[len(blocks) - 1]
+    chainIds = sorted(
+        chains.keys(),
+        key=lambda chainId: (
+            chainId != chainOf[0],
+            chainId == endChain,
+            min(chains[chainId]),
+        ),
+    )
+
+    order = [blocks[i] for chainId in chainIds for i in chains[chainId]]
+
+    # chain merging is greedy, so keep the depth first order if it is at least as good
+    weights = {id(block): LOOP_WEIGHT ** depth for block, depth in zip(blocks, depths)}
+    if countJumps(order, weights) >= countJumps(blocks, weights):
+        return blocks
+
+    return order
@@ -1,6 +1,6 @@
 from .. import *
 
-from .sort import sortBlocks
+from .sort import sortBlocks, findLoopDepths, countJumps, layoutBlocks
 
 
 def test_sort_single():
@@ -92,3 +92,105 @@ def test_sort_branch_converge():
     actual = sortBlocks(block, blockEnd)
 
     assert actual == expected
+
+
+def test_findLoopDepths():
+    blockExit = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockInnerBody = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.pop)])
+    blockInner = TealConditionalBlock([TealOp(None, Op.int, 3)])
+    blockOuter = TealConditionalBlock([TealOp(None, Op.int, 4)])
+    blockStart = TealSimpleBlock([])
+
+    blockStart.setNextBlock(blockOuter)
+    blockOuter.setTrueBlock(blockInner)
+    blockOuter.setFalseBlock(blockExit)
+    blockInner.setTrueBlock(blockInnerBody)
+    blockInner.setFalseBlock(blockOuter)
+    blockInnerBody.setNextBlock(blockInner)
+
+    blocks = [blockStart, blockOuter, blockInner, blockInnerBody, blockExit]
+    assert findLoopDepths(blocks) == [0, 1, 2, 2, 0]
+
+
+def test_countJumps():
+    blockTrue = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockFalse = TealSimpleBlock([TealOp(None, Op.int, 0)])
+    blockEnd = TealSimpleBlock([TealOp(None, Op.return_)])
+    block = TealConditionalBlock([TealOp(None, Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    blockFalse.setNextBlock(blockEnd)
+
+    assert countJumps([block, blockFalse, blockEnd, blockTrue]) == 0
+    assert countJumps([block, blockFalse, blockTrue, blockEnd]) == 1
+    assert countJumps([block, blockTrue, blockEnd, blockFalse]) == 1
+    assert (
+        countJumps(
+            [block, blockTrue, blockEnd, blockFalse],
+            {id(block): 1, id(blockFalse): 10, id(blockTrue): 1, id(blockEnd): 1},
+        )
+        == 10
+    )
+
+
+def test_layoutBlocks_fall_through():
+    blockEnd = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockFail = TealSimpleBlock([TealOp(None, Op.err)])
+    blockCheck = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.pop)])
+    block = TealConditionalBlock([TealOp(None, Op.int, 1)])
+    block.setTrueBlock(blockFail)
+    block.setFalseBlock(blockCheck)
+    blockCheck.setNextBlock(blockEnd)
+    block.addIncoming()
+    block.validateTree()
+
+    # moving the end block last after a depth first search leaves a jump from blockCheck
+    assert sortBlocks(block, blockEnd) == [block, blockCheck, blockFail, blockEnd]
+
+    expected = [block, blockCheck, blockEnd, blockFail]
+    actual = layoutBlocks(block, blockEnd)
+
+    assert actual == expected
+    assert countJumps(actual) == 0
+
+
+def test_layoutBlocks_keeps_depth_first_order():
+    blockTrue = TealSimpleBlock([TealOp(None, Op.byte, '"true"')])
+    blockFalse = TealSimpleBlock([TealOp(None, Op.byte, '"false"')])
+    blockEnd = TealSimpleBlock([TealOp(None, Op.return_)])
+    block = TealConditionalBlock([TealOp(None, Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+    blockTrue.setNextBlock(blockEnd)
+    blockFalse.setNextBlock(blockEnd)
+    block.addIncoming()
+    block.validateTree()
+
+    # one of the branches must jump to the end block either way
+    assert layoutBlocks(block, blockEnd) == sortBlocks(block, blockEnd)
+
+
+def test_layoutBlocks_loop():
+    blockExit = TealSimpleBlock([TealOp(None, Op.int, 1), TealOp(None, Op.return_)])
+    blockBody = TealSimpleBlock([TealOp(None, Op.int, 2), TealOp(None, Op.pop)])
+    blockSkip = TealSimpleBlock([TealOp(None, Op.int, 3), TealOp(None, Op.pop)])
+    blockBodyBranch = TealConditionalBlock([TealOp(None, Op.int, 4)])
+    blockHeader = TealConditionalBlock([TealOp(None, Op.int, 5)])
+    blockStart = TealSimpleBlock([TealOp(None, Op.int, 6), TealOp(None, Op.pop)])
+
+    blockStart.setNextBlock(blockHeader)
+    blockHeader.setTrueBlock(blockBodyBranch)
+    blockHeader.setFalseBlock(blockExit)
+    blockBodyBranch.setTrueBlock(blockBody)
+    blockBodyBranch.setFalseBlock(blockSkip)
+    blockBody.setNextBlock(blockHeader)
+    blockSkip.setNextBlock(blockExit)
+    blockStart.addIncoming()
+    blockStart.validateTree()
+
+    actual = layoutBlocks(blockStart, blockExit)
+
+    # the blocks of the loop are placed together after its header
+    assert actual[:4] == [blockStart, blockHeader, blockBodyBranch, blockBody]
+    assert actual[-1] is blockExit
+    assert len(actual) == 6
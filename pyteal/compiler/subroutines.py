@@ -1,11 +1,12 @@
 import re
-from typing import List, Dict, Set, Optional, TypeVar
+from typing import List, Dict, Set, Optional, Tuple, TypeVar
 from collections import OrderedDict
 from itertools import chain
 
 from ..types import TealType
 from ..ast import SubroutineDefinition
-from ..ir import TealComponent, TealOp, Op
+from ..ir import TealComponent, TealOp, TealLabel, LabelReference, Op
+from .optimizer.liveness import findLiveSlots, hasDynamicSlotAccess
 
 # generic type variable
 Node = TypeVar("Node")
@@ -62,12 +63,83 @@ def findRecursionPoints(
     return reentryPoints
 
 
+# The minimum number of consecutive slot IDs which are spilled with a loop over loads and stores,
+# instead of with a load and a store for each slot.
+SPILL_LOOP_MIN_SLOTS = 16
+
+
+def groupConsecutiveSlots(slots: List[int]) -> List[List[int]]:
+    """Split a sorted list of slot IDs into runs of consecutive IDs."""
+    groups: List[List[int]] = []
+    for slot in slots:
+        if len(groups) != 0 and groups[-1][-1] + 1 == slot:
+            groups[-1].append(slot)
+        else:
+            groups.append([slot])
+    return groups
+
+
+def createSpillLoops(
+    first: int, last: int, labelIndex: int
+) -> Tuple[List[TealComponent], List[TealComponent]]:
+    """Create loops which spill a range of slots to the stack and restore them.
+
+    The spill loop pushes the values of the slots first through last onto the stack, in increasing
+    order of slot ID, with loads. The restore loop pops them back into the same slots with stores.
+
+    Args:
+        first: The first slot ID in the range.
+        last: The last slot ID in the range.
+        labelIndex: The index of the first of the 2 labels used by the loops. Labels are named
+            l<index>, and must not conflict with the labels of the subroutine.
+
+    Returns:
+        A tuple of the ops of the spill loop and the ops of the restore loop.
+    """
+    spillLabel = LabelReference("l{}".format(labelIndex))
+    restoreLabel = LabelReference("l{}".format(labelIndex + 1))
+
+    spill: List[TealComponent] = [
+        TealOp(None, Op.int, first),
+        TealLabel(None, spillLabel),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.loads),
+        TealOp(None, Op.swap),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.add),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.int, last + 1),
+        TealOp(None, Op.lt),
+        TealOp(None, Op.bnz, spillLabel),
+        TealOp(None, Op.pop),
+    ]
+
+    restore: List[TealComponent] = [
+        TealOp(None, Op.int, last + 1),
+        TealLabel(None, restoreLabel),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.uncover, 2),
+        TealOp(None, Op.stores),
+        TealOp(None, Op.dup),
+        TealOp(None, Op.int, first),
+        TealOp(None, Op.gt),
+        TealOp(None, Op.bnz, restoreLabel),
+        TealOp(None, Op.pop),
+    ]
+
+    return spill, restore
+
+
 def spillLocalSlotsDuringRecursion(
     version: int,
     subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
     subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
     localSlots: Dict[Optional[SubroutineDefinition], Set[int]],
-) -> None:
+    *,
+    onlyLiveSlots: bool = False,
+) -> int:
     """In order to prevent recursion from modifying the local scratch slots a subroutine uses,
     subroutines must "spill" their local slots to the stack before calling any other subroutine
     which may invoke the calling subroutine.
@@ -87,27 +159,57 @@ def spillLocalSlotsDuringRecursion(
             graph.
         localSlots: The output from the function `assignScratchSlotsToSubroutines`, which indicates
             the local slots which must be spilled for each subroutine.
+        onlyLiveSlots (optional): If true, only the local slots whose values may be loaded after a
+            call returns are spilled around that call, and runs of at least SPILL_LOOP_MIN_SLOTS
+            consecutive slot IDs are spilled with loops over loads and stores in TEAL version 5 and
+            above. Defaults to false.
+
+    Returns:
+        The number of times a local slot was not spilled around a call because its value is never
+        loaded after the call returns. This is always 0 if onlyLiveSlots is false.
     """
+    from .optimizer.inline import nextLabelIndex
+
     recursivePoints = findRecursionPoints(subroutineGraph)
 
     coverAvailable = version >= Op.cover.min_version
+    spillLoopsAvailable = onlyLiveSlots and version >= Op.loads.min_version
+
+    # liveness is unknown if any slot may be accessed dynamically
+    useLiveness = onlyLiveSlots and not any(
+        hasDynamicSlotAccess(ops) for ops in subroutineMapping.values()
+    )
+
+    skippedSpills = 0
 
     for subroutine, reentryPoints in recursivePoints.items():
-        slots = list(sorted(slot for slot in localSlots[subroutine]))
+        allSlots = list(sorted(slot for slot in localSlots[subroutine]))
         numArgs = subroutine.argumentCount()
 
-        if len(reentryPoints) == 0 or len(slots) == 0:
+        if len(reentryPoints) == 0 or len(allSlots) == 0:
             # no need to spill slots
             continue
 
         ops = subroutineMapping[subroutine]
         newOps: List[TealComponent] = []
 
-        for stmt in ops:
+        liveOut = findLiveSlots(ops) if useLiveness else None
+        labelIndex = nextLabelIndex(ops)
+
+        for i, stmt in enumerate(ops):
             before: List[TealComponent] = []
             after: List[TealComponent] = []
 
-            if len(reentryPoints.intersection(stmt.getSubroutines())) != 0:
+            slots = allSlots
+            if liveOut is not None:
+                slots = [slot for slot in allSlots if slot in liveOut[i]]
+                if len(reentryPoints.intersection(stmt.getSubroutines())) != 0:
+                    skippedSpills += len(allSlots) - len(slots)
+
+            if (
+                len(reentryPoints.intersection(stmt.getSubroutines())) != 0
+                and len(slots) != 0
+            ):
                 # A subroutine is being called which may reenter the current subroutine, so insert
                 # ops to spill local slots to the stack before calling the subroutine and also to
                 # restore the local slots after returning from the subroutine. This prevents a
@@ -124,15 +226,37 @@ def spillLocalSlotsDuringRecursion(
                     else:
                         uncoverArgs = True
 
-                for slot in slots:
-                    # spill local slots to the stack
-                    before.append(TealOp(None, Op.load, slot))
+                # the ops which restore each run of spilled slots, in the order they are spilled
+                restoreRuns: List[List[TealComponent]] = []
+
+                for run in groupConsecutiveSlots(slots):
+                    if (
+                        spillLoopsAvailable
+                        and not coverSpilledSlots
+                        and len(run) >= SPILL_LOOP_MIN_SLOTS
+                    ):
+                        # spill the run with a loop, which uses fewer bytes but more opcode budget
+                        spillLoop, restoreLoop = createSpillLoops(
+                            run[0], run[-1], labelIndex
+                        )
+                        labelIndex += 2
+                        before += spillLoop
+                        restoreRuns.append(restoreLoop)
+                        continue
+
+                    restoreRuns.append(
+                        [TealOp(None, Op.store, slot) for slot in run[::-1]]
+                    )
+
+                    for slot in run:
+                        # spill local slots to the stack
+                        before.append(TealOp(None, Op.load, slot))
 
-                    if coverSpilledSlots:
-                        # numArgs is guaranteed to be at least 2 here (since numArgs > len(slots)
-                        # and len(slots) must be at least 1 for the code to get this far), so no
-                        # need to replace this with swap if numArgs is 1
-                        before.append(TealOp(None, Op.cover, numArgs))
+                        if coverSpilledSlots:
+                            # numArgs is guaranteed to be at least 2 here (since numArgs >
+                            # len(slots) and len(slots) must be at least 1 for the code to get
+                            # this far), so no need to replace this with swap if numArgs is 1
+                            before.append(TealOp(None, Op.cover, numArgs))
 
                 for _ in range(numArgs):
                     # pull the subroutine arguments to the top of the stack, above the just spilled
@@ -172,18 +296,24 @@ def spillLocalSlotsDuringRecursion(
                         hideReturnValueInFirstSlot = True
                         after.append(TealOp(None, Op.store, slots[0]))
 
-                for slot in slots[::-1]:
+                for restoreRun in restoreRuns[::-1]:
                     # restore slots, iterating in reverse because slots[-1] is at the top of the stack
-                    if hideReturnValueInFirstSlot and slot is slots[0]:
-                        # time to restore the return value to the top of the stack
-
-                        # slots[0] is being used to store the return value, so load it again
-                        after.append(TealOp(None, Op.load, slot))
-
-                        # swap the return value with the actual value of slot[0] on the stack
-                        after.append(TealOp(None, Op.swap))
+                    for restoreOp in restoreRun:
+                        if (
+                            hideReturnValueInFirstSlot
+                            and isinstance(restoreOp, TealOp)
+                            and restoreOp.getOp() == Op.store
+                            and restoreOp.args[0] == slots[0]
+                        ):
+                            # time to restore the return value to the top of the stack
+
+                            # slots[0] is being used to store the return value, so load it again
+                            after.append(TealOp(None, Op.load, slots[0]))
+
+                            # swap the return value with the actual value of slot[0] on the stack
+                            after.append(TealOp(None, Op.swap))
 
-                    after.append(TealOp(None, Op.store, slot))
+                        after.append(restoreOp)
 
                 if digArgs:
                     for _ in range(numArgs):
@@ -203,6 +333,8 @@ def spillLocalSlotsDuringRecursion(
 
         subroutineMapping[subroutine] = newOps
 
+    return skippedSpills
+
 
 def resolveSubroutines(
     subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]]
@@ -1277,6 +1277,206 @@ def test_spillLocalSlotsDuringRecursion_recursive_more_slots_than_args_v5():
     }
 
 
+def test_spillLocalSlotsDuringRecursion_only_live_slots():
+    def subImpl(a1):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    subroutineOps = [
+        TealOp(None, Op.store, 0),
+        TealOp(None, Op.load, 0),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.store, 1),
+        TealOp(None, Op.load, 1),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.load, 0),
+        TealOp(None, Op.add),
+        TealOp(None, Op.retsub),
+    ]
+
+    mainOps = [
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.return_),
+    ]
+
+    subroutineMapping = {None: mainOps, subroutine: subroutineOps}
+
+    subroutineGraph = {subroutine: {subroutine}}
+
+    localSlots = {None: set(), subroutine: {0, 1}}
+
+    # slot 1 is never loaded after the call, so it is not spilled
+    skipped = spillLocalSlotsDuringRecursion(
+        5, subroutineMapping, subroutineGraph, localSlots, onlyLiveSlots=True
+    )
+    assert skipped == 1
+
+    assert subroutineMapping == {
+        None: [
+            TealOp(None, Op.int, 10),
+            TealOp(None, Op.callsub, subroutine),
+            TealOp(None, Op.return_),
+        ],
+        subroutine: [
+            TealOp(None, Op.store, 0),
+            TealOp(None, Op.load, 0),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.minus),
+            TealOp(None, Op.store, 1),
+            TealOp(None, Op.load, 1),
+            TealOp(None, Op.load, 0),
+            TealOp(None, Op.swap),
+            TealOp(None, Op.callsub, subroutine),
+            TealOp(None, Op.swap),
+            TealOp(None, Op.store, 0),
+            TealOp(None, Op.load, 0),
+            TealOp(None, Op.add),
+            TealOp(None, Op.retsub),
+        ],
+    }
+
+
+def test_spillLocalSlotsDuringRecursion_only_live_slots_none_live():
+    def subImpl(a1):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    subroutineOps = [
+        TealOp(None, Op.store, 0),
+        TealOp(None, Op.load, 0),
+        TealOp(None, Op.int, 1),
+        TealOp(None, Op.minus),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.retsub),
+    ]
+
+    mainOps = [
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.return_),
+    ]
+
+    subroutineMapping = {None: mainOps, subroutine: list(subroutineOps)}
+
+    subroutineGraph = {subroutine: {subroutine}}
+
+    localSlots = {None: set(), subroutine: {0}}
+
+    skipped = spillLocalSlotsDuringRecursion(
+        4, subroutineMapping, subroutineGraph, localSlots, onlyLiveSlots=True
+    )
+    assert skipped == 1
+    assert subroutineMapping == {None: mainOps, subroutine: subroutineOps}
+
+
+def test_spillLocalSlotsDuringRecursion_spill_loops():
+    def subImpl(a1):
+        return None
+
+    subroutine = SubroutineDefinition(subImpl, TealType.uint64)
+
+    numSlots = 16
+    subroutineL0Label = LabelReference("l0")
+    subroutineOps = (
+        [
+            TealOp(None, Op.store, 0),
+            TealOp(None, Op.load, 0),
+            TealOp(None, Op.bz, subroutineL0Label),
+        ]
+        + [
+            stmt
+            for i in range(1, numSlots + 1)
+            for stmt in (TealOp(None, Op.load, 0), TealOp(None, Op.store, i))
+        ]
+        + [TealOp(None, Op.load, 0), TealOp(None, Op.int, 1), TealOp(None, Op.minus)]
+        + [TealOp(None, Op.callsub, subroutine)]
+        + [TealOp(None, Op.load, i) for i in range(1, numSlots + 1)]
+        + [TealOp(None, Op.add)] * numSlots
+        + [TealOp(None, Op.retsub), TealLabel(None, subroutineL0Label)]
+        + [TealOp(None, Op.int, 0), TealOp(None, Op.retsub)]
+    )
+    mainOps = [
+        TealOp(None, Op.int, 10),
+        TealOp(None, Op.callsub, subroutine),
+        TealOp(None, Op.return_),
+    ]
+
+    localSlots = {None: set(), subroutine: set(range(numSlots + 1))}
+
+    callIndex = 3 + 2 * numSlots + 3
+
+    # slot 0 is not live after the call, and slots 1 to 16 are spilled with loops
+    subroutineMapping = {None: mainOps, subroutine: list(subroutineOps)}
+    skipped = spillLocalSlotsDuringRecursion(
+        5,
+        subroutineMapping,
+        subroutineGraph={subroutine: {subroutine}},
+        localSlots=localSlots,
+        onlyLiveSlots=True,
+    )
+    assert skipped == 1
+
+    spillLabel = LabelReference("l1")
+    restoreLabel = LabelReference("l2")
+    assert subroutineMapping == {
+        None: mainOps,
+        subroutine: subroutineOps[:callIndex]
+        + [
+            TealOp(None, Op.int, 1),
+            TealLabel(None, spillLabel),
+            TealOp(None, Op.dup),
+            TealOp(None, Op.loads),
+            TealOp(None, Op.swap),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.add),
+            TealOp(None, Op.dup),
+            TealOp(None, Op.int, numSlots + 1),
+            TealOp(None, Op.lt),
+            TealOp(None, Op.bnz, spillLabel),
+            TealOp(None, Op.pop),
+            TealOp(None, Op.uncover, numSlots),
+            TealOp(None, Op.callsub, subroutine),
+            TealOp(None, Op.cover, numSlots),
+            TealOp(None, Op.int, numSlots + 1),
+            TealLabel(None, restoreLabel),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.minus),
+            TealOp(None, Op.dup),
+            TealOp(None, Op.uncover, 2),
+            TealOp(None, Op.stores),
+            TealOp(None, Op.dup),
+            TealOp(None, Op.int, 1),
+            TealOp(None, Op.gt),
+            TealOp(None, Op.bnz, restoreLabel),
+            TealOp(None, Op.pop),
+        ]
+        + subroutineOps[callIndex + 1 :],
+    }
+
+    # loads and stores are not available in TEAL version 4
+    subroutineMapping = {None: mainOps, subroutine: list(subroutineOps)}
+    spillLocalSlotsDuringRecursion(
+        4,
+        subroutineMapping,
+        subroutineGraph={subroutine: {subroutine}},
+        localSlots=localSlots,
+        onlyLiveSlots=True,
+    )
+    newOps = subroutineMapping[subroutine]
+    assert not any(
+        isinstance(stmt, TealOp) and stmt.getOp() in (Op.loads, Op.stores)
+        for stmt in newOps
+    )
+    assert (
+        sum(1 for stmt in newOps if isinstance(stmt, TealOp) and stmt.getOp() == Op.dig)
+        == 1
+    )
+
+
 def test_resolveSubroutines():
     def sub1Impl(a1):
         return None
@@ -0,0 +1,111 @@
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+from pyteal import Expr, Mode, OptimizeOptions, compileTeal
+
+from examples.signature.basic import bank_for_account
+from examples.signature.atomic_swap import htlc
+from examples.signature.periodic_payment import periodic_payment
+from examples.signature.split import split
+from examples.signature.dutch_auction import dutch_auction
+from examples.signature.recurring_swap import recurring_swap
+from examples.application import asset, security_token, vote
+
+# The example programs to compile, along with the mode they run in
+programs: List[Tuple[str, Callable[[], Expr], Mode]] = [
+    (
+        "signature/basic",
+        lambda: bank_for_account(
+            "ZZAF5ARA4MEC5PVDOP64JM5O5MQST63Q2KOY2FLYFLXXD3PFSNJJBYAFZM"
+        ),
+        Mode.Signature,
+    ),
+    ("signature/atomic_swap", htlc, Mode.Signature),
+    ("signature/periodic_payment", periodic_payment, Mode.Signature),
+    ("signature/split", split, Mode.Signature),
+    ("signature/dutch_auction", dutch_auction, Mode.Signature),
+    ("signature/recurring_swap", recurring_swap, Mode.Signature),
+    ("application/asset", asset.approval_program, Mode.Application),
+    ("application/security_token", security_token.approval_program, Mode.Application),
+    ("application/vote", vote.approval_program, Mode.Application),
+]
+
+
+def measure(teal: str) -> Dict[str, int]:
+    """Measure the size of a compiled TEAL program."""
+    ops = [
+        line.split()
+        for line in teal.splitlines()
+        if line != ""
+        and not line.startswith("#")
+        and not line.startswith("//")
+        and not line.endswith(":")
+    ]
+    return {
+        "ops": len(ops),
+        "jumps": sum(1 for op in ops if op[0] in ("b", "bz", "bnz")),
+    }
+
+
+def optimizationNames() -> List[str]:
+    return [
+        name for name, value in vars(OptimizeOptions()).items() if type(value) is bool
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report how much each optimization reduces the size of the example programs"
+    )
+    parser.add_argument(
+        "--version", type=int, default=5, help="TEAL version to compile"
+    )
+    parser.add_argument(
+        "--optimization",
+        action="append",
+        choices=optimizationNames(),
+        help="Only report these optimizations (may be repeated)",
+    )
+    args = parser.parse_args()
+
+    names = args.optimization if args.optimization else optimizationNames()
+
+    # constants are assembled when possible, so that constantPacking has an effect
+    assembleConstants = args.version >= 3
+
+    for name in names:
+        print("{}:".format(name))
+        for programName, program, mode in programs:
+            before = measure(
+                compileTeal(
+                    program(),
+                    mode,
+                    version=args.version,
+                    assembleConstants=assembleConstants,
+                )
+            )
+            options = OptimizeOptions(**{name: True})
+            after = measure(
+                compileTeal(
+                    program(),
+                    mode,
+                    version=args.version,
+                    assembleConstants=assembleConstants,
+                    optimize=options,
+                )
+            )
+            print(
+                "  {:30} {}".format(
+                    programName,
+                    ", ".join(
+                        [
+                            "{} {} -> {}".format(metric, before[metric], after[metric])
+                            for metric in before
+                        ]
+                        + [
+                            "{} {}".format(metric, count)
+                            for metric, count in options.report.counts.items()
+                        ]
+                    ),
+                )
+            )